@@ -0,0 +1,116 @@
+# *************************************************************************************************************
+#
+#    bench_characterLookup.py - Compares looking up the character main group in a scene by scanning the scene
+#                               assemblies (as MRT_UI.getMRTcharacter() did before), with the character
+#                               registry, mrt_moduleRegistry.MRTCharacterRegistry.
+#
+#    Runs with mayapy (maya standalone), on scenes with a character main group and synthetic transforms (as
+#    scene assemblies, and under a group), with 2,000 and 20,000 transforms (by default). The time is measured
+#    for repeated lookups, and for the check in MRT_UI.importSelectedCharTemplate(), which looked up the
+#    character once for each transform in the scene (it's measured for the first 200 transforms). Usage:
+#
+#        mayapy bench_characterLookup.py [numberOfTransforms ...]
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+import os, sys, time
+
+import maya.standalone
+maya.standalone.initialize(name='python')
+
+import maya.cmds as cmds
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'main', 'MRT'))
+
+import mrt_moduleRegistry as mreg
+
+# Number of times each lookup is run.
+REPEAT_COUNT = 100
+
+# Number of transforms for the per-transform lookup loop in importSelectedCharTemplate().
+LOOP_COUNT = 200
+
+
+def createSyntheticScene(numberOfTransforms):
+    '''
+    Creates a character main group, and transforms, with a tenth of them as scene assemblies.
+    '''
+    mainGrp = cmds.group(empty=True, name='MRT_character')
+    cmds.addAttr(mainGrp, attributeType='float', longName='mrtCharacterVersion', defaultValue=1.0)
+    cmds.addAttr(mainGrp, dataType='string', longName='collectionFileID')
+    cmds.setAttr(mainGrp+'.collectionFileID', 'bench', type='string')
+
+    parentGrp = cmds.group(empty=True, name='bench_grp')
+    for n in range(numberOfTransforms):
+        if n % 10:
+            cmds.group(empty=True, name='bench_transform_%s' % n, parent=parentGrp)
+        else:
+            cmds.group(empty=True, name='bench_transform_%s' % n)
+
+
+def lookupWithScan():
+    '''
+    Looks up the character main group by scanning the scene assemblies, as getMRTcharacter() did.
+    '''
+    characterGrp = []
+    for transform in cmds.ls(assemblies=True):
+        if cmds.attributeQuery('mrtCharacterVersion', node=transform, exists=True):
+            characterGrp.append(transform)
+
+    return characterGrp[0], cmds.getAttr(characterGrp[0]+'.collectionFileID')
+
+
+def lookupWithRegistry():
+    '''
+    Looks up the character main group from the character registry.
+    '''
+    characterRegistry = mreg.returnCharacterRegistry()
+    characterGrp = characterRegistry.returnCharacterGroups()
+
+    return characterGrp[0], characterRegistry.returnCollectionFileID(characterGrp[0])
+
+
+def main():
+    transformCounts = [int(arg) for arg in sys.argv[1:]] or [2000, 20000]
+
+    print('%12s %16s %16s %20s %20s %8s' % ('transforms', 'scan (ms)', 'registry (ms)', 'scan loop (ms)',
+                                                                                'registry loop (ms)', 'match'))
+
+    for numberOfTransforms in transformCounts:
+        cmds.file(new=True, force=True)
+        createSyntheticScene(numberOfTransforms)
+
+        start = time.time()
+        for i in range(REPEAT_COUNT):
+            scanResult = lookupWithScan()
+        scanTime = (time.time() - start) / REPEAT_COUNT
+
+        start = time.time()
+        for i in range(REPEAT_COUNT):
+            registryResult = lookupWithRegistry()
+        registryTime = (time.time() - start) / REPEAT_COUNT
+
+        # The lookup for each transform (for the first transforms), as in importSelectedCharTemplate().
+        transforms = cmds.ls(type='transform')[:LOOP_COUNT]
+
+        start = time.time()
+        for transform in transforms:
+            lookupWithScan()
+        scanLoopTime = time.time() - start
+
+        start = time.time()
+        for transform in transforms:
+            lookupWithRegistry()
+        registryLoopTime = time.time() - start
+
+        print('%12s %16.3f %16.3f %20.2f %20.2f %8s' % (numberOfTransforms, scanTime * 1000, registryTime * 1000,
+                                                        scanLoopTime * 1000, registryLoopTime * 1000,
+                                                        scanResult == registryResult))
+
+    mreg.removeModuleRegistry()
+
+
+if __name__ == '__main__':
+    main()
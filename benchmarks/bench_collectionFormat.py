@@ -0,0 +1,150 @@
+# *************************************************************************************************************
+#
+#    bench_collectionFormat.py - Compares the legacy module collection file format (a pickled dict with
+#                                one key per mayaAscii line) with the current container format (header +
+#                                zlib compressed payload), for file size, save time and install time.
+#
+#    Runs without maya, on a synthetic mayaAscii scene with 200 modules (by default). Usage:
+#
+#        python bench_collectionFormat.py [numberOfModules]
+#
+#    The install time only includes reading the collection file and writing the temporary maya scene file
+#    for import, which is the part that depends on the file format. The partial install time is for a single
+#    module from the collection.
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+import os, sys, time, shutil, tempfile
+
+try:
+    import cPickle
+except ImportError:
+    import pickle as cPickle
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'main', 'MRT'))
+
+import mrt_fileFormat as mfile
+
+
+def writeSyntheticSceneFile(filePath, numberOfModules):
+    '''
+    Writes a mayaAscii file with node and attribute data similar to an exported module collection.
+    '''
+    sceneFile = open(filePath, 'w')
+    sceneFile.write('//Maya ASCII 2013 scene\n//Name: collection.ma\nrequires maya "2013";\n')
+
+    for m in range(numberOfModules):
+        namespace = 'MRT_JointNode__module%s' % m
+        sceneFile.write('createNode transform -n "%s:moduleGrp";\n' % namespace)
+        sceneFile.write('\taddAttr -ci true -sn "numberOfNodes" -ln "numberOfNodes" -at "short";\n')
+        sceneFile.write('\tsetAttr ".numberOfNodes" 4;\n')
+        sceneFile.write('\tsetAttr ".moduleParent" -type "string" "None";\n')
+
+        for n in range(4):
+            node = '%s:root_node_%s' % (namespace, n)
+            sceneFile.write('createNode joint -n "%s_transform" -p "%s:moduleJointsGrp";\n' % (node, namespace))
+            sceneFile.write('\tsetAttr ".t" -type "double3" %s %s %s ;\n' % (m * 0.5, n * 2.0, 0.0))
+            sceneFile.write('createNode mesh -n "%s_proxy_geoShape" -p "%s_proxy_geo";\n' % (node, node))
+            sceneFile.write('\tsetAttr -k off ".v";\n\tsetAttr -s 26 ".vt[0:25]"')
+            for v in range(26):
+                sceneFile.write(' %.6f %.6f %.6f' % (v * 0.013 + m, n * 0.37, v * 0.029))
+            sceneFile.write(';\n\tsetAttr -s 48 ".ed[0:47]"')
+            for e in range(48):
+                sceneFile.write('  %s %s 0' % (e % 26, (e + 1) % 26))
+            sceneFile.write(';\n')
+            sceneFile.write('connectAttr "%s_transform.t" "%s_handle.t";\n' % (node, node))
+
+    sceneFile.close()
+
+
+def saveLegacyFile(filePath, sceneFilePath):
+    '''
+    Saves a module collection file in the legacy format.
+    '''
+    collectionData = {'collectionDescrp': 'benchmark collection'}
+    sceneFile = open(sceneFilePath)
+    for i, line in enumerate(sceneFile):
+        collectionData['collectionData_line_'+str(i+1)] = line
+    sceneFile.close()
+
+    collectionFile = open(filePath, 'wb')
+    cPickle.dump(collectionData, collectionFile, cPickle.HIGHEST_PROTOCOL)
+    collectionFile.close()
+
+
+def installLegacyFile(filePath, outFilePath):
+    '''
+    Writes the maya scene file from a legacy module collection file.
+    '''
+    collectionFile = open(filePath, 'rb')
+    collectionData = cPickle.load(collectionFile)
+    collectionFile.close()
+
+    outFile = open(outFilePath, 'w')
+    for i in range(1, len(collectionData)):
+        outFile.write(collectionData['collectionData_line_'+str(i)])
+    outFile.close()
+
+
+def saveContainerFile(filePath, sceneFilePath, payloadEncoding):
+    '''
+    Saves a module collection file in the container format.
+    '''
+    mfile.writeFile(filePath, 'collection', 'benchmark collection', sceneFilePath, 1.0,
+                                                                payloadEncoding=payloadEncoding)
+
+
+def installContainerModule(filePath, outFilePath):
+    '''
+    Writes the maya scene file for the first module in a module collection file in the container format.
+    '''
+    mfile.extractPayloadToFile(filePath, outFilePath, moduleNamespaces=['MRT_JointNode__module0'])
+
+
+def timeRuns(function, args, runs=5):
+    '''
+    Returns the best time in seconds for a number of runs of a function.
+    '''
+    times = []
+    for i in range(runs):
+        start = time.time()
+        function(*args)
+        times.append(time.time() - start)
+    return min(times)
+
+
+def main():
+    numberOfModules = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    tempDir = tempfile.mkdtemp()
+    try:
+        sceneFilePath = os.path.join(tempDir, 'collection.ma')
+        outFilePath = os.path.join(tempDir, 'collection_temp.ma')
+        writeSyntheticSceneFile(sceneFilePath, numberOfModules)
+
+        print('Modules: %s, scene size: %.1f KB' % (numberOfModules, os.path.getsize(sceneFilePath) / 1024.0))
+        print('%-20s %12s %12s %12s %12s' % ('format', 'size (KB)', 'save (ms)', 'install (ms)', 'partial (ms)'))
+
+        formats = [('legacy pickle', saveLegacyFile, (), installLegacyFile, None),
+                   ('container, none', saveContainerFile, ('none',), mfile.extractPayloadToFile, installContainerModule),
+                   ('container, zlib', saveContainerFile, ('zlib',), mfile.extractPayloadToFile, installContainerModule)]
+
+        for name, saveFunction, saveArgs, installFunction, partialInstallFunction in formats:
+            filePath = os.path.join(tempDir, 'collection.mrtmc')
+            saveTime = timeRuns(saveFunction, (filePath, sceneFilePath) + saveArgs)
+            installTime = timeRuns(installFunction, (filePath, outFilePath))
+            if partialInstallFunction:
+                partialInstallTime = '%12.1f' % (timeRuns(partialInstallFunction, (filePath, outFilePath)) * 1000)
+            else:
+                partialInstallTime = '%12s' % '-'
+            print('%-20s %12.1f %12.1f %12.1f %s' % (name, os.path.getsize(filePath) / 1024.0,
+                                                    saveTime * 1000, installTime * 1000, partialInstallTime))
+            os.remove(filePath)
+    finally:
+        shutil.rmtree(tempDir)
+
+
+if __name__ == '__main__':
+    main()
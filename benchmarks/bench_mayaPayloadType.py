@@ -0,0 +1,149 @@
+# *************************************************************************************************************
+#
+#    bench_mayaPayloadType.py - Compares mayaAscii and mayaBinary payloads for module collections and
+#                               character templates, for file size, export time and import time.
+#
+#    Runs with mayapy (maya standalone), on synthetic scenes with module-like and character-like node
+#    hierarchies for 10, 100 and 500 modules (by default). Usage:
+#
+#        mayapy bench_mayaPayloadType.py [numberOfModules ...]
+#
+#    The export time includes exporting the maya scene and writing the module collection / character template
+#    file with it as its payload. The import time includes extracting the payload and importing it into a new
+#    scene.
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+import os, sys, time, shutil, tempfile
+
+import maya.standalone
+maya.standalone.initialize(name='python')
+
+import maya.cmds as cmds
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'main', 'MRT'))
+
+import mrt_fileFormat as mfile
+
+
+def createSyntheticModules(numberOfModules):
+    '''
+    Creates module-like node hierarchies in the scene, each in a module namespace with a container, a module
+    group, four joints with proxy geometry, and constraints. Returns the objects to be exported.
+    '''
+    exportObjects = []
+
+    for m in range(numberOfModules):
+        namespace = 'MRT_JointNode__module%s' % m
+        cmds.namespace(addNamespace=namespace)
+        cmds.namespace(setNamespace=namespace)
+
+        moduleGrp = cmds.group(empty=True, name='moduleGrp')
+        cmds.addAttr(moduleGrp, attributeType='short', longName='numberOfNodes', defaultValue=4)
+        cmds.addAttr(moduleGrp, dataType='string', longName='moduleParent')
+        cmds.setAttr(moduleGrp+'.moduleParent', 'None', type='string')
+        proxyGeometryGrp = cmds.group(empty=True, name='proxyGeometryGrp')
+
+        cmds.select(clear=True)
+        moduleNodes = [moduleGrp, proxyGeometryGrp]
+        for n in range(4):
+            joint = cmds.joint(name='root_node_%s_transform' % n, position=(m * 0.5, n * 2.0, 0.0))
+            proxyGeo = cmds.polyCylinder(name='root_node_%s_proxy_geo' % n, subdivisionsAxis=12)[0]
+            cmds.parent(proxyGeo, proxyGeometryGrp)
+            moduleNodes.append(cmds.parentConstraint(joint, proxyGeo, maintainOffset=True)[0])
+            cmds.select(joint, replace=True)
+        cmds.parent(namespace+':root_node_0_transform', moduleGrp)
+
+        container = cmds.container(name='module_container', addNode=moduleNodes, includeHierarchyBelow=True)
+        exportObjects.extend([container, namespace+':proxyGeometryGrp'])
+
+        cmds.namespace(setNamespace=':')
+
+    return exportObjects
+
+
+def createSyntheticCharacter(numberOfModules):
+    '''
+    Creates a character-like joint hierarchy with proxy geometry, with four joints for each module.
+    Returns the objects to be exported.
+    '''
+    characterGrp = cmds.group(empty=True, name='MRT_character__bench')
+    cmds.addAttr(characterGrp, dataType='string', longName='skinJointList')
+    jointsGrp = cmds.group(empty=True, name='MRT_character__bench_jointsGrp', parent=characterGrp)
+    geoGrp = cmds.group(empty=True, name='MRT_character__bench_proxyGeoGrp', parent=characterGrp)
+
+    joints = []
+    for m in range(numberOfModules):
+        cmds.select(jointsGrp, replace=True)
+        for n in range(4):
+            joint = cmds.joint(name='MRT_character__module%s_root_node_%s' % (m, n), position=(m * 0.5, n * 2.0, 0.0))
+            proxyGeo = cmds.polyCylinder(name=joint+'_proxy_geo', subdivisionsAxis=12)[0]
+            cmds.parent(proxyGeo, geoGrp)
+            cmds.parentConstraint(joint, proxyGeo, maintainOffset=True)
+            cmds.select(joint, replace=True)
+            joints.append(joint)
+
+    cmds.setAttr(characterGrp+'.skinJointList', ','.join(joints), type='string')
+
+    return [characterGrp]
+
+
+def exportFile(filePath, fileType, exportObjects, payloadType):
+    '''
+    Exports the objects to a maya scene and writes a module collection / character template file with it.
+    '''
+    tempFilePath = filePath+'_temp'+mfile.PAYLOAD_TYPES[payloadType]
+    cmds.select(exportObjects, replace=True, noExpand=True)
+    cmds.file(tempFilePath, force=True, options='v=1', type=payloadType, exportSelected=True, pr=True)
+
+    # A mayaBinary payload needs a manifest. Its content doesn't affect the timing here.
+    manifest = None if payloadType == 'mayaAscii' else {'modules': [], 'joints': []}
+    mfile.writeFile(filePath, fileType, 'benchmark', tempFilePath, 1.0, manifest, payloadType=payloadType)
+    os.remove(tempFilePath)
+
+
+def importFile(filePath, payloadType):
+    '''
+    Extracts the payload from a module collection / character template file and imports it into a new scene.
+    '''
+    cmds.file(new=True, force=True)
+    tempFilePath = filePath+'_temp'+mfile.PAYLOAD_TYPES[payloadType]
+    mfile.extractPayloadToFile(filePath, tempFilePath)
+    cmds.file(tempFilePath, i=True, type=payloadType, prompt=False, ignoreVersion=True)
+    os.remove(tempFilePath)
+
+
+def main():
+    moduleCounts = [int(arg) for arg in sys.argv[1:]] or [10, 100, 500]
+
+    tempDir = tempfile.mkdtemp()
+    try:
+        print('%-10s %8s %-12s %12s %12s %12s' % ('type', 'modules', 'payload', 'size (KB)', 'export (ms)',
+                                                                                                'import (ms)'))
+        for fileType, extension, createFunction in (('collection', '.mrtmc', createSyntheticModules),
+                                                    ('template', '.mrtct', createSyntheticCharacter)):
+            for numberOfModules in moduleCounts:
+                for payloadType in ('mayaAscii', 'mayaBinary'):
+                    cmds.file(new=True, force=True)
+                    exportObjects = createFunction(numberOfModules)
+                    filePath = os.path.join(tempDir, 'bench'+extension)
+
+                    start = time.time()
+                    exportFile(filePath, fileType, exportObjects, payloadType)
+                    exportTime = time.time() - start
+
+                    start = time.time()
+                    importFile(filePath, payloadType)
+                    importTime = time.time() - start
+
+                    print('%-10s %8s %-12s %12.1f %12.1f %12.1f' % (fileType, numberOfModules, payloadType,
+                                                os.path.getsize(filePath) / 1024.0, exportTime * 1000, importTime * 1000))
+                    os.remove(filePath)
+    finally:
+        shutil.rmtree(tempDir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+# *************************************************************************************************************
+#
+#    bench_moduleAttrs.py - Compares reading the module node values for returnModuleAttrsFromScene() with
+#                           separate getAttr / xform calls for each value (as before), and with the maya python
+#                           API 2.0 reader, mrt_functions.returnTransformValuesFromScene().
+#
+#    Runs with mayapy (maya standalone), on synthetic joint node modules (a joint chain under a module
+#    nodes group, with a module transform with a handle size attribute for each node) with 10 and 50 nodes
+#    (by default). Usage:
+#
+#        mayapy bench_moduleAttrs.py [numberOfNodes ...]
+#
+#    The values read are compared between the two methods.
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+import os, sys, time
+
+import maya.standalone
+maya.standalone.initialize(name='python')
+
+import maya.cmds as cmds
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'main', 'MRT'))
+
+import mrt_functions as mfunc
+
+# Number of times each method is run for a module.
+REPEAT_COUNT = 20
+
+
+def createSyntheticModule(numberOfNodes):
+    '''
+    Creates a joint node module-like hierarchy in a module namespace, and returns the namespace.
+    '''
+    namespace = 'MRT_JointNode__bench%s' % numberOfNodes
+    cmds.namespace(addNamespace=namespace)
+    cmds.namespace(setNamespace=namespace)
+
+    moduleTransform = cmds.group(empty=True, name='module_transform')
+    cmds.setAttr(moduleTransform+'.rotate', 10.0, 25.0, 5.0)
+    nodesGrp = cmds.group(empty=True, name='moduleNodesGrp', parent=moduleTransform)
+
+    cmds.select(nodesGrp, replace=True)
+    for n in range(numberOfNodes):
+        if n == 0:
+            name = 'root_node_transform'
+        elif n == numberOfNodes - 1:
+            name = 'end_node_transform'
+        else:
+            name = 'node_%s_transform' % n
+        joint = cmds.joint(name=name, position=(n * 1.5, n * 0.25, 0.0), orientation=(0.0, n * 3.0, n * 7.0))
+        cmds.setAttr(joint+'.rotateOrder', n % 6)
+        cmds.addAttr(moduleTransform, attributeType='float', longName=name+'_handle_size', defaultValue=n * 0.1)
+        cmds.select(joint, replace=True)
+
+    cmds.namespace(setNamespace=':')
+
+    return namespace
+
+
+def readValuesWithCommands(namespace):
+    '''
+    Reads the module node values with separate getAttr / xform calls, as returnModuleAttrsFromScene() did.
+    '''
+    node_translations = []
+    node_world_translations = []
+    node_world_orientations = []
+    node_rotationOrders = []
+    node_handle_sizes = []
+
+    for transform in cmds.listRelatives(namespace+':moduleNodesGrp', allDescendents=True, type='joint'):
+        transformName = mfunc.stripMRTNamespace(transform)[1]
+        node_translations.append((transformName, cmds.getAttr(transform+'.translate')[0]))
+        node_world_translations.append((transformName, cmds.xform(transform, query=True, worldSpace=True, translation=True)))
+        node_world_orientations.append((transformName, cmds.xform(transform, query=True, worldSpace=True, rotation=True)))
+        node_rotationOrders.append((transformName, cmds.getAttr(transform+'.rotateOrder')))
+        node_handle_sizes.append((transformName, cmds.getAttr(namespace+':module_transform.'+transformName+'_handle_size')))
+
+    return node_translations, node_world_translations, node_world_orientations, node_rotationOrders, node_handle_sizes
+
+
+def readValuesWithAPI(namespace):
+    '''
+    Reads the module node values with mrt_functions.returnTransformValuesFromScene().
+    '''
+    transforms = cmds.listRelatives(namespace+':moduleNodesGrp', allDescendents=True, type='joint')
+    transformValues = mfunc.returnTransformValuesFromScene(transforms, namespace+':module_transform')
+
+    return ([(values['name'], values['translation']) for values in transformValues],
+            [(values['name'], values['worldTranslation']) for values in transformValues],
+            [(values['name'], values['worldRotation']) for values in transformValues],
+            [(values['name'], values['rotateOrder']) for values in transformValues],
+            [(values['name'], values['handleSize']) for values in transformValues])
+
+
+def compareValues(commandValues, apiValues):
+    '''
+    Checks if the values read by both methods are the same (within a tolerance for the float values).
+    '''
+    for commandList, apiList in zip(commandValues, apiValues):
+        for (commandName, commandValue), (apiName, apiValue) in zip(commandList, apiList):
+            if commandName != apiName:
+                return False
+            if not isinstance(commandValue, (tuple, list)):
+                commandValue, apiValue = [commandValue], [apiValue]
+            for a, b in zip(commandValue, apiValue):
+                if abs(a - b) > 1e-4:
+                    return False
+    return True
+
+
+def main():
+    nodeCounts = [int(arg) for arg in sys.argv[1:]] or [10, 50]
+
+    print('%8s %16s %16s %10s %8s' % ('nodes', 'commands (ms)', 'API 2.0 (ms)', 'speedup', 'match'))
+
+    for numberOfNodes in nodeCounts:
+        cmds.file(new=True, force=True)
+        namespace = createSyntheticModule(numberOfNodes)
+
+        start = time.time()
+        for i in range(REPEAT_COUNT):
+            commandValues = readValuesWithCommands(namespace)
+        commandTime = (time.time() - start) / REPEAT_COUNT
+
+        start = time.time()
+        for i in range(REPEAT_COUNT):
+            apiValues = readValuesWithAPI(namespace)
+        apiTime = (time.time() - start) / REPEAT_COUNT
+
+        print('%8s %16.2f %16.2f %10.1f %8s' % (numberOfNodes, commandTime * 1000, apiTime * 1000,
+                                                commandTime / apiTime, compareValues(commandValues, apiValues)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# *************************************************************************************************************
+#
+#    bench_nameAllocator.py - Compares finding new module namespaces for the modules from a module collection
+#                             with name conflicts with the scene modules, by searching all the user specified
+#                             names for the highest numerical suffix for each conflict (as
+#                             mrt_manifest.returnNamespaceRemapping() did before), with the name allocator,
+#                             mrt_names.MRTNameAllocator.
+#
+#    It doesn't need maya. All the modules for the module collection have a conflict, for the module collections
+#    with 10, 100, 1,000 and 5,000 modules (by default), with as many scene modules. Usage:
+#
+#        python bench_nameAllocator.py [numberOfModules ...]
+#
+#    The new namespaces for the two are compared.
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+import os, re, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'main', 'MRT'))
+
+import mrt_manifest as mman
+
+
+def returnSyntheticNamespaces(numberOfModules):
+    '''
+    Returns the module namespaces for a module collection (and the scene, with the same namespaces).
+    '''
+    return ['MRT_%sNode__%s_%s' % (['Joint', 'Spline', 'Hinge'][n % 3], ['arm', 'leg', 'spine', 'finger'][n % 4], n) \
+                                                                                        for n in range(numberOfModules)]
+
+
+def findHighestNumSuffix(baseName, names):
+    '''
+    Returns the max numerical suffix separated by underscore(s) for names with a given base name, as
+    mrt_functions.findHighestNumSuffix().
+    '''
+    highestValue = 1
+
+    for name in names:
+        if re.match('^%s_*\d+$' % baseName, name):
+            numSuffix = int(re.split('_+', name)[-1])
+            if numSuffix > highestValue:
+                highestValue = numSuffix
+
+    return highestValue
+
+
+def remapWithSearch(namespaces, sceneNamespaces):
+    '''
+    Returns the new module namespaces, searching the names for each conflict, as returnNamespaceRemapping() did.
+    '''
+    remapping = {}
+
+    sceneUserSpecNames = set([namespace.rpartition('__')[2] for namespace in sceneNamespaces])
+    allUserSpecNames = sceneUserSpecNames.union([namespace.rpartition('__')[2] for namespace in namespaces])
+
+    for namespace in namespaces:
+        moduleTypespace, userSpecName = namespace.rpartition('__')[::2]
+
+        if userSpecName not in sceneUserSpecNames:
+            continue
+
+        underscore_search = '_'
+        userSpecNameBase = userSpecName
+        if re.match(r'^\w+_[0-9]*$', userSpecName):
+            underscore_search = [item for item in re.findall('_+', userSpecName)][-1]
+            userSpecNameBase = userSpecName.rpartition(underscore_search)[0]
+
+        suffix = findHighestNumSuffix(userSpecNameBase, allUserSpecNames)
+        newUserSpecName = '%s%s%s' % (userSpecNameBase, underscore_search, suffix+1)
+
+        remapping[namespace] = '%s__%s' % (moduleTypespace, newUserSpecName)
+        allUserSpecNames.add(newUserSpecName)
+
+    return remapping
+
+
+def main():
+    moduleCounts = [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000, 5000]
+
+    print('%10s %16s %16s %10s %8s' % ('modules', 'search (ms)', 'allocator (ms)', 'speedup', 'match'))
+
+    for numberOfModules in moduleCounts:
+        namespaces = returnSyntheticNamespaces(numberOfModules)
+
+        start = time.time()
+        searchRemapping = remapWithSearch(namespaces, namespaces)
+        searchTime = time.time() - start
+
+        start = time.time()
+        allocatorRemapping = mman.returnNamespaceRemapping(namespaces, namespaces)
+        allocatorTime = time.time() - start
+
+        print('%10s %16.2f %16.2f %10.1f %8s' % (numberOfModules, searchTime * 1000, allocatorTime * 1000,
+                                                searchTime / max(allocatorTime, 1e-9),
+                                                searchRemapping == allocatorRemapping))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+# *************************************************************************************************************
+#
+#    bench_nameParser.py - Compares parsing the names for the MRT module objects and character joints with the
+#                          regular expressions compiled (and matched one by one) for each call, as in
+#                          mrt_functions and MRT_UI before, with the shared parser in mrt_names.
+#
+#    It doesn't need maya. The names are parsed in batches with 1, 10, 100 and 1,000 names (by default), as
+#    for a selection, and each batch is parsed repeatedly, as by the selection callbacks. Usage:
+#
+#        python bench_nameParser.py [batchSize ...]
+#
+#    The results for the two are compared for each batch.
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+import os, re, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'main', 'MRT'))
+
+import mrt_names as mnames
+
+# Number of times each batch is parsed.
+REPEAT_COUNT = 50
+
+# Object names in a module namespace, for the synthetic names.
+NODE_NAMES = ['module_transform', 'root_node_transform', 'end_node_transform', 'node_%s_transform',
+              'spline_%s_adjustCurve_transform', 'splineStartHandleTransform', 'root_node_transform_control',
+              'single_orient_repr_transform', 'root_node_transform_orient_repr_transform', 'moduleGrp',
+              'node_%s_proxy_bone_geo']
+
+# Character joint names, for the synthetic names.
+JOINT_NAMES = ['%s_root_node_joint', '%s_node_%s_joint', '%s_end_node_joint']
+
+
+def returnSyntheticNames(batchSize):
+    '''
+    Returns module object names, character joint names and other names, for a batch.
+    '''
+    names = []
+    for n in range(batchSize):
+        userName = 'module%s' % (n // 20) + ('_mirror' if n % 7 == 0 else '')
+        if n % 3 == 0:
+            name = JOINT_NAMES[n % len(JOINT_NAMES)]
+            names.append(name % ((userName, n % 9) if name.count('%s') == 2 else userName))
+        elif n % 11 == 0:
+            names.append('pCube%s' % n)
+        else:
+            name = NODE_NAMES[n % len(NODE_NAMES)]
+            names.append('MRT_%sNode__%s:%s' % (['Joint', 'Spline', 'Hinge'][n % 3], userName,
+                                                                        name % (n % 9) if '%s' in name else name))
+    return names
+
+
+def parseWithRegex(name):
+    '''
+    Parses a name with the regular expressions as used before, with stripMRTNamespace(),
+    returnValidSelectionFlagForModuleTransformObjects() and MRT_UI.returnValidFlagForCharacterJoint().
+    '''
+    if re.match('^MRT_\D+__\w+:\w+$', name):
+        namespaceInfo = str(name).partition(':')
+        moduleType = namespaceInfo[0].partition('__')[0].partition('_')[2]
+        userName = namespaceInfo[0].rpartition('__')[2]
+
+        matchObjects = [re.compile('^MRT_\D+__\w+:module_transform$'),
+                        re.compile('^MRT_\D+__\w+:root_node_transform$'),
+                        re.compile('^MRT_\D+__\w+:end_node_transform$'),
+                        re.compile('^MRT_\D+__\w+:node_\d+_transform$'),
+                        re.compile('^MRT_\D+__\w+:spline_\d+_adjustCurve_transform$'),
+                        re.compile('^MRT_\D+__\w+:splineStartHandleTransform$'),
+                        re.compile('^MRT_\D+__\w+:splineEndHandleTransform$'),
+                        re.compile('^MRT_\D+__\w+:root_node_transform_control$'),
+                        re.compile('^MRT_\D+__\w+:end_node_transform_control$'),
+                        re.compile('^MRT_\D+__\w+:node_1_transform_control$'),
+                        re.compile('^MRT_\D+__\w+:single_orient_repr_transform$'),
+                        re.compile('^MRT_\D+__\w+:[_0-9a-z]*transform_orient_repr_transform$')]
+
+        isModuleTransform = False
+        for matchObject in matchObjects:
+            if matchObject.match(name):
+                isModuleTransform = True
+                break
+
+        return namespaceInfo[0], moduleType, userName, isModuleTransform, 0
+
+    matchObjects = [re.compile('^\w+_node_\d+_joint$'),
+                    re.compile('^\w+_root_node_joint$'),
+                    re.compile('^\w+_end_node_joint$')]
+
+    for i, matchObject in enumerate(matchObjects):
+        if matchObject.match(name):
+            return None, None, None, False, i+1
+
+    return None
+
+
+def parseWithParser(name):
+    '''
+    Parses a name with mrt_names, with the same result as parseWithRegex().
+    '''
+    parsedName = mnames.parseName(name)
+
+    if not parsedName:
+        return None
+
+    if parsedName.namespace:
+        return parsedName.namespace, parsedName.moduleType, parsedName.userName, \
+                                                    parsedName.nodeRole in mnames.MODULE_TRANSFORM_ROLES, 0
+
+    return None, None, None, False, mnames.CHARACTER_JOINT_ROLES[parsedName.nodeRole]
+
+
+def main():
+    batchSizes = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100, 1000]
+
+    print('%10s %16s %16s %16s %10s %8s' % ('names', 'regex (ms)', 'parser (ms)', 'uncached (ms)', 'speedup', 'match'))
+
+    for batchSize in batchSizes:
+        names = returnSyntheticNames(batchSize)
+
+        start = time.time()
+        for i in range(REPEAT_COUNT):
+            regexResults = [parseWithRegex(name) for name in names]
+        regexTime = (time.time() - start) / REPEAT_COUNT
+
+        mnames.clearCache()
+        start = time.time()
+        for i in range(REPEAT_COUNT):
+            parserResults = [parseWithParser(name) for name in names]
+        parserTime = (time.time() - start) / REPEAT_COUNT
+
+        # The first parse for the batch, without the cached names.
+        mnames.clearCache()
+        start = time.time()
+        for name in names:
+            parseWithParser(name)
+        uncachedTime = time.time() - start
+
+        print('%10s %16.3f %16.3f %16.3f %10.1f %8s' % (batchSize, regexTime * 1000, parserTime * 1000,
+                                                       uncachedTime * 1000, regexTime / max(parserTime, 1e-9),
+                                                       regexResults == parserResults))
+
+
+if __name__ == '__main__':
+    main()
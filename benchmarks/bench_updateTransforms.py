@@ -0,0 +1,140 @@
+# *************************************************************************************************************
+#
+#    bench_updateTransforms.py - Compares updating the MRT transforms by selecting each of them with the move
+#                                tool (as mrt_functions.updateAllTransforms() did before), with pulling the
+#                                world matrices for only the MRT transforms added or made dirty since the
+#                                last update (see mrt_moduleRegistry.MRTTransformTracker).
+#
+#    Runs with mayapy (maya standalone), on scenes with synthetic module-like transform hierarchies (with
+#    MRT transform names), with 10 and 150 modules (by default). For each scene, the time is measured for
+#    updating after one more module is created, as when a module is created in a scene, and after an existing
+#    module is moved before one more module is created (so that its transforms are dirty). The number of
+#    transforms pulled for the update is checked, only the transforms for the new and the moved module. Usage:
+#
+#        mayapy bench_updateTransforms.py [numberOfModules ...]
+#
+#    The world translations for the transforms are compared after the two updates.
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+import os, re, sys, time
+
+import maya.standalone
+maya.standalone.initialize(name='python')
+
+import maya.cmds as cmds
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'main', 'MRT'))
+
+import mrt_functions as mfunc
+import mrt_moduleRegistry as mreg
+
+# Number of transforms for a module.
+NODES_PER_MODULE = 32
+
+
+def createSyntheticModule(index):
+    '''
+    Creates a module-like chain of transforms in a module namespace.
+    '''
+    namespace = 'MRT_JointNode__bench%s' % index
+    cmds.namespace(addNamespace=namespace)
+    cmds.namespace(setNamespace=namespace)
+
+    parent = cmds.group(empty=True, name='module_transform')
+    cmds.setAttr(parent+'.translate', index * 2.0, 0.0, 0.0)
+    for n in range(NODES_PER_MODULE - 1):
+        node = cmds.group(empty=True, name='node_%s_control' % n, parent=parent)
+        cmds.setAttr(node+'.translate', 0.0, 1.0, 0.25)
+        cmds.setAttr(node+'.rotate', 0.0, 5.0, 10.0)
+        parent = node
+
+    cmds.namespace(setNamespace=':')
+
+
+def updateWithSelection():
+    '''
+    Updates all MRT transforms by selecting them with the move tool, as updateAllTransforms() did.
+    '''
+    cmds.setToolTo('moveSuperContext')
+
+    nodes = [node for node in cmds.ls(type='dagNode') if \
+            re.match('^MRT_[a-zA-Z0-9_:]*(handle|transform|control){1}$', node)]
+
+    for node in nodes:
+        cmds.select(node, replace=True)
+
+    cmds.select(clear=True)
+    cmds.setToolTo('selectSuperContext')
+
+
+def returnWorldTranslations():
+    '''
+    Returns the world translations for the MRT transforms, by name.
+    '''
+    return dict([(node, cmds.xform(node, query=True, worldSpace=True, translation=True)) \
+                  for node in cmds.ls('MRT_*:*', type='transform')])
+
+
+def compareTranslations(translationsA, translationsB):
+    '''
+    Checks if the world translations are the same (within a tolerance).
+    '''
+    if sorted(translationsA) != sorted(translationsB):
+        return False
+    for node in translationsA:
+        for a, b in zip(translationsA[node], translationsB[node]):
+            if abs(a - b) > 1e-4:
+                return False
+    return True
+
+
+def main():
+    moduleCounts = [int(arg) for arg in sys.argv[1:]] or [10, 150]
+
+    print('%8s %10s %8s %8s %16s %16s %10s %8s' % ('modules', 'nodes', 'moved', 'pulled', 'selection (ms)',
+                                                                        'tracked (ms)', 'speedup', 'match'))
+
+    for numberOfModules in moduleCounts:
+        for moveModule in (False, True):
+            cmds.file(new=True, force=True)
+            for index in range(numberOfModules):
+                createSyntheticModule(index)
+
+            # Update the scene once, so that the transforms are tracked.
+            mfunc.updateAllTransforms()
+
+            # Move an existing module, so that its transforms are dirty for the update.
+            if moveModule:
+                cmds.setAttr('MRT_JointNode__bench0:module_transform.translate', 0.0, 3.0, -1.5)
+
+            createSyntheticModule(numberOfModules)
+            start = time.time()
+            dagPaths = mreg.returnTransformTracker().returnChangedTransforms()
+            mfunc.updateTransformMatrices(dagPaths)
+            trackedTime = time.time() - start
+            trackedTranslations = returnWorldTranslations()
+
+            # Only the transforms for the new module (and the moved module) are pulled.
+            assert len(dagPaths) == NODES_PER_MODULE * (2 if moveModule else 1), len(dagPaths)
+
+            # The selection update doesn't depend on the transforms changed, it selects all MRT transforms.
+            start = time.time()
+            updateWithSelection()
+            selectionTime = time.time() - start
+            selectionTranslations = returnWorldTranslations()
+
+            print('%8s %10s %8s %8s %16.2f %16.2f %10.1f %8s' % (numberOfModules + 1,
+                                                            (numberOfModules + 1) * NODES_PER_MODULE, moveModule,
+                                                            len(dagPaths), selectionTime * 1000, trackedTime * 1000,
+                                                            selectionTime / max(trackedTime, 1e-6),
+                                                            compareTranslations(selectionTranslations,
+                                                                                trackedTranslations)))
+
+    mreg.removeModuleRegistry()
+
+
+if __name__ == '__main__':
+    main()
@@ -14,16 +14,26 @@ __moduleName__ = 'mrt_UI'
 
 import maya.cmds as cmds
 import maya.mel as mel
+import maya.utils
 
 import mrt_module
 import mrt_objects as objects
 import mrt_functions as mfunc
 import mrt_controlRig
+import mrt_fileFormat as mfile
+import mrt_catalog as mcat
+import mrt_manifest as mman
+import mrt_autoCollections as mauto
+import mrt_preferences as mprefs
+import mrt_extractionCache as mcache
+import mrt_moduleRegistry as mreg
+import mrt_characterMetadata as mchar
+import mrt_names as mnames
 from mrt_functions import runProgressWindow
 
 from maya.OpenMaya import MGlobal; Error = MGlobal.displayError
 
-import time, math, re, os, fnmatch, cPickle, copy, sys, random, webbrowser
+import time, math, re, os, fnmatch, copy, sys, webbrowser
 from pprint import pprint # for debug only
 from functools import partial
 
@@ -184,6 +194,9 @@ class MRT_UI(object):
         self.module_collectionList = {}
         self.charTemplateList = {}
 
+        # To store the scanner for module collection files being loaded from a directory.
+        self.collectionScanner = None
+
         # To store the selected module items in the scene modules treeView list.
         self.treeViewSelection_list = {}
 
@@ -261,9 +274,13 @@ class MRT_UI(object):
         cmds.menuItem(label='Save selected module(s) as a collection', command=lambda *args: self.makeCollectionFromSceneTreeViewModulesUI())
         cmds.menuItem(label='Save all modules as a collection',
                                   command=lambda *args: self.makeCollectionFromSceneTreeViewModulesUI(allModules=True, auto=None))
+        self.uiVars['collectionPayloadType_check'] = cmds.menuItem(label='Save module collections as mayaBinary',
+                                  checkBox=False, command=partial(self.setPayloadTypeForSavedFiles, 'collectionPayloadType'))
         cmds.menuItem(divider=True)
         cmds.menuItem(label='Load saved character template(s)', command=self.loadSavedCharTemplates)
         cmds.menuItem(optionBox=True, command=self.changeLoadSettingsForCharTemplates)
+        self.uiVars['charTemplatePayloadType_check'] = cmds.menuItem(label='Save character templates as mayaBinary',
+                                  checkBox=False, command=partial(self.setPayloadTypeForSavedFiles, 'charTemplatePayloadType'))
         cmds.menuItem(divider=True)
         cmds.menuItem(label='Exit', command=partial(self.closeWindow, self.uiVars['window']))
 
@@ -281,6 +298,11 @@ class MRT_UI(object):
         cmds.menuItem(label='Delete all proxy geometry for selected module', command=self.deleteAllProxyGeoForModule)
         cmds.menuItem(label='Delete history on all proxy geometry', command=self.deleteHistoryAllProxyGeo)
         cmds.menuItem(label='Purge auto-collection files on disk', command=self.purgeAutoCollections)
+        cmds.menuItem(optionBox=True, command=partial(self.changeFileStoreLimits, 'autoCollectionStore',
+                                                                                    'Auto-collection file limits'))
+        cmds.menuItem(label='Purge extraction cache on disk', command=self.purgeExtractionCache)
+        cmds.menuItem(optionBox=True, command=partial(self.changeFileStoreLimits, 'extractionCache',
+                                                                                    'Extraction cache limits'))
         cmds.menuItem(label='Create parent switch group for selected control handle',
                                 command=self.createParentSwitchGroupforControlHandle)
         cmds.menuItem(divider=True)
@@ -339,88 +361,84 @@ class MRT_UI(object):
         self.ui_preferences_path = cmds.internalVar(userScriptDir=True)+'MRT/mrt_uiPrefs'
         self.module_collectionList_path = cmds.internalVar(userScriptDir=True)+'MRT/mrt_collectionList'
         self.charTemplateList_path = cmds.internalVar(userScriptDir=True)+'MRT/mrt_charTemplateList'
-
-        # Load the preferences for loading module collections and character templates
-        try:
-            ui_preferences_file = open(self.ui_preferences_path, 'rb')
-            ui_preferences = cPickle.load(ui_preferences_file)
-            ui_preferences_file.close()
-
-        except IOError:
-            ui_preferences_file = open(self.ui_preferences_path, 'wb')
-            ui_preferences = {}
-            ui_preferences['startDirectoryForCollectionSave'] = \
-                                    cmds.internalVar(userScriptDir=True)+'MRT/module_collections/user_collections'
-            ui_preferences['defaultStartDirectoryForCollectionSave'] = \
-                                    cmds.internalVar(userScriptDir=True)+'MRT/module_collections/user_collections'
-            ui_preferences['directoryForAutoLoadingCollections'] = \
-                                    cmds.internalVar(userScriptDir=True)+'MRT/module_collections/user_collections'
-            ui_preferences['defaultDirectoryForAutoLoadingCollections'] = \
-                                    cmds.internalVar(userScriptDir=True)+'MRT/module_collections/user_collections'
-            ui_preferences['lastDirectoryForLoadingCollections'] = \
-                                    cmds.internalVar(userScriptDir=True)+'MRT/module_collections/user_collections'
-            ui_preferences['defaultLastDirectoryForLoadingCollections'] = \
-                                    cmds.internalVar(userScriptDir=True)+'MRT/module_collections/user_collections'
-            ui_preferences['directoryForSavingCharacterTemplates'] = \
-                                    cmds.internalVar(userScriptDir=True)+'MRT/character_templates'
-            ui_preferences['defaultDirectoryForSavingCharacterTemplates'] = \
-                                    cmds.internalVar(userScriptDir=True)+'MRT/character_templates'
-            ui_preferences['directoryForCharacterTemplates'] = cmds.internalVar(userScriptDir=True)+'MRT/character_templates'
-            ui_preferences['defaultDirectoryForCharacterTemplates'] = \
-                                    cmds.internalVar(userScriptDir=True)+'MRT/character_templates'
-            ui_preferences['loadCharTemplateClearModeStatus'] = True
-            ui_preferences['loadNewCharTemplatesToCurrentList'] = True
-            ui_preferences['autoLoadPreviousCharTemplateListAtStartupStatus'] = True
-            ui_preferences['autoLoadPreviousCollectionListAtStartupStatus'] = True
-            ui_preferences['autoLoadNewSavedModuleCollectionToListStatus'] = True
-            ui_preferences['loadCollectionDirectoryClearModeStatus'] = True
-            ui_preferences['loadCollectionClearModeStatus'] = True
-            cPickle.dump(ui_preferences, ui_preferences_file, cPickle.HIGHEST_PROTOCOL)
-            ui_preferences_file.close()
-
-        # Load the module collections using the preferences
-        try:
-            module_collectionList_file = open(self.module_collectionList_path, 'rb')
-            module_collectionList = cPickle.load(module_collectionList_file)
-            module_collectionList_file.close()
-            if len(module_collectionList):
-                if ui_preferences['autoLoadPreviousCollectionListAtStartupStatus']:
-                    for (key, value) in module_collectionList.items():
-                        if os.path.exists(value):
-                            self.loadModuleCollectionsForUI([value])
-                        else:
-                            module_collectionList.pop(key)
-            module_collectionList_file = open(self.module_collectionList_path, 'wb')
-            cPickle.dump(module_collectionList, module_collectionList_file, cPickle.HIGHEST_PROTOCOL)
-            module_collectionList_file.close()
-
-        except IOError:
-            module_collectionList = {}
-            module_collectionList_file = open(self.module_collectionList_path, 'wb')
-            cPickle.dump(module_collectionList, module_collectionList_file, cPickle.HIGHEST_PROTOCOL)
-            module_collectionList_file.close()
-
-        # Load the character templates using the preferences
-        try:
-            charTemplateList_file = open(self.charTemplateList_path, 'rb')
-            charTemplateList = cPickle.load(charTemplateList_file)
-            charTemplateList_file.close()
-            if len(charTemplateList):
-                if ui_preferences['autoLoadPreviousCharTemplateListAtStartupStatus']:
-                    for (key, value) in charTemplateList.items():
-                        if os.path.exists(value):
-                            self.loadCharTemplatesForUI([value])
-                        else:
-                            charTemplateList.pop(key)
-            charTemplateList_file = open(self.charTemplateList_path, 'wb')
-            cPickle.dump(charTemplateList, charTemplateList_file, cPickle.HIGHEST_PROTOCOL)
-            charTemplateList_file.close()
-
-        except IOError:
-            charTemplateList = {}
-            charTemplateList_file = open(self.charTemplateList_path, 'wb')
-            cPickle.dump(charTemplateList, charTemplateList_file, cPickle.HIGHEST_PROTOCOL)
-            charTemplateList_file.close()
+        self.extractionCache_path = cmds.internalVar(userScriptDir=True)+'MRT/extraction_cache'
+
+        # Load the catalog for module collection and character template files.
+        self.fileCatalog = mcat.MRTFileCatalog(cmds.internalVar(userScriptDir=True)+'MRT/mrt_fileCatalog')
+
+        # Load the preferences for loading module collections and character templates. The preference stores
+        # are read from memory, and the modified values are written back with a deferred call (see mrt_preferences).
+        ui_preferences = {}
+        ui_preferences['startDirectoryForCollectionSave'] = \
+                                cmds.internalVar(userScriptDir=True)+'MRT/module_collections/user_collections'
+        ui_preferences['defaultStartDirectoryForCollectionSave'] = \
+                                cmds.internalVar(userScriptDir=True)+'MRT/module_collections/user_collections'
+        ui_preferences['directoryForAutoLoadingCollections'] = \
+                                cmds.internalVar(userScriptDir=True)+'MRT/module_collections/user_collections'
+        ui_preferences['defaultDirectoryForAutoLoadingCollections'] = \
+                                cmds.internalVar(userScriptDir=True)+'MRT/module_collections/user_collections'
+        ui_preferences['lastDirectoryForLoadingCollections'] = \
+                                cmds.internalVar(userScriptDir=True)+'MRT/module_collections/user_collections'
+        ui_preferences['defaultLastDirectoryForLoadingCollections'] = \
+                                cmds.internalVar(userScriptDir=True)+'MRT/module_collections/user_collections'
+        ui_preferences['directoryForSavingCharacterTemplates'] = \
+                                cmds.internalVar(userScriptDir=True)+'MRT/character_templates'
+        ui_preferences['defaultDirectoryForSavingCharacterTemplates'] = \
+                                cmds.internalVar(userScriptDir=True)+'MRT/character_templates'
+        ui_preferences['directoryForCharacterTemplates'] = cmds.internalVar(userScriptDir=True)+'MRT/character_templates'
+        ui_preferences['defaultDirectoryForCharacterTemplates'] = \
+                                cmds.internalVar(userScriptDir=True)+'MRT/character_templates'
+        ui_preferences['loadCharTemplateClearModeStatus'] = True
+        ui_preferences['loadNewCharTemplatesToCurrentList'] = True
+        ui_preferences['autoLoadPreviousCharTemplateListAtStartupStatus'] = True
+        ui_preferences['autoLoadPreviousCollectionListAtStartupStatus'] = True
+        ui_preferences['autoLoadNewSavedModuleCollectionToListStatus'] = True
+        ui_preferences['loadCollectionDirectoryClearModeStatus'] = True
+        ui_preferences['loadCollectionClearModeStatus'] = True
+        ui_preferences['autoCollectionStoreMaxSizeMB'] = mauto.DEFAULT_MAX_SIZE_MB
+        ui_preferences['autoCollectionStoreMaxCount'] = mauto.DEFAULT_MAX_COUNT
+        ui_preferences['extractionCacheMaxSizeMB'] = mcache.DEFAULT_MAX_SIZE_MB
+        ui_preferences['extractionCacheMaxCount'] = mcache.DEFAULT_MAX_COUNT
+        ui_preferences['collectionPayloadType'] = 'mayaAscii'
+        ui_preferences['charTemplatePayloadType'] = 'mayaAscii'
+
+        self.ui_preferences = mprefs.MRTPreferences(self.ui_preferences_path, ui_preferences, maya.utils.executeDeferred)
+        self.saved_collectionList = mprefs.MRTPreferences(self.module_collectionList_path, {}, maya.utils.executeDeferred)
+        self.saved_charTemplateList = mprefs.MRTPreferences(self.charTemplateList_path, {}, maya.utils.executeDeferred)
+
+        # Add the preferences added with a newer MRT version, to an existing preferences file.
+        for key in ('autoCollectionStoreMaxSizeMB', 'autoCollectionStoreMaxCount', 'collectionPayloadType',
+                            'charTemplatePayloadType', 'extractionCacheMaxSizeMB', 'extractionCacheMaxCount'):
+            self.ui_preferences.setDefault(key, ui_preferences[key])
+
+        # Set the menu items for the payload type preferences for saving module collections and character templates.
+        for key in ('collectionPayloadType', 'charTemplatePayloadType'):
+            cmds.menuItem(self.uiVars[key+'_check'], edit=True, checkBox=self.ui_preferences[key] == 'mayaBinary')
+
+        # Create the store for auto module collection files, with its limits from the preferences.
+        self.autoCollectionStore = mauto.MRTAutoCollectionStore(self.autoCollections_path,
+                                                            self.ui_preferences['autoCollectionStoreMaxSizeMB'],
+                                                            self.ui_preferences['autoCollectionStoreMaxCount'])
+
+        # Auto module collection file names for the characters in the scene, by their file ids (see getMRTcharacter()).
+        self.autoCollectionFiles = {}
+
+        # Create the cache for the maya scene files extracted from module collection and character template files
+        # for import, with its limits from the preferences (see mrt_extractionCache).
+        self.extractionCache = mcache.MRTExtractionCache(self.extractionCache_path,
+                                                            self.ui_preferences['extractionCacheMaxSizeMB'],
+                                                            self.ui_preferences['extractionCacheMaxCount'])
+
+        # Load the module collections using the preferences. The previous list is loaded in a single pass.
+        # The files aren't checked on disk here, a missing file is removed from the list when it's selected.
+        if len(self.saved_collectionList):
+            if self.ui_preferences['autoLoadPreviousCollectionListAtStartupStatus']:
+                self.loadModuleCollectionsForUI(self.saved_collectionList.returnData().values())
+
+        # Load the character templates using the preferences.
+        if len(self.saved_charTemplateList):
+            if self.ui_preferences['autoLoadPreviousCharTemplateListAtStartupStatus']:
+                self.loadCharTemplatesForUI(self.saved_charTemplateList.returnData().values())
         
         # Flag to store the script job number for checking scene imports.
         # The script job is used to check if a maya scene import is done by the user or MRT, when MRT UI is running.
@@ -441,6 +459,10 @@ class MRT_UI(object):
         # Turn on undo
         cmds.undoInfo(stateWithoutFlush=True)
 
+        # Migrate the characters in the current scene. The character metadata is created with its callbacks, which
+        # migrate the characters in the scenes opened or imported after this (see mrt_characterMetadata).
+        mchar.returnCharacterMetadata().migrateScene()
+
     # -------------------------------------------------------------------------------------------------------------
     #
     #   TOP MENU ITEM METHODS
@@ -457,9 +479,7 @@ class MRT_UI(object):
         def setAutoLoadSettingsValues(*args):
             # I'm defining a local function here since it'll be used only within
             # the scope of "autoLoadSettingsUIforCollections".
-            ui_preferences_file = open(self.ui_preferences_path, 'rb')
-            ui_preferences = cPickle.load(ui_preferences_file)
-            ui_preferences_file.close()
+            ui_preferences = self.ui_preferences
 
             loadAtStartup = \
             cmds.checkBox(self.uiVars['autoLoadPreviousCollectionListAtStartup_checkBox'], query=True, value=True)
@@ -469,9 +489,6 @@ class MRT_UI(object):
 
             ui_preferences['autoLoadPreviousCollectionListAtStartupStatus'] = loadAtStartup
             ui_preferences['autoLoadNewSavedModuleCollectionToListStatus'] = loadNewCollections
-            ui_preferences_file = open(self.ui_preferences_path, 'wb')
-            cPickle.dump(ui_preferences, ui_preferences_file, cPickle.HIGHEST_PROTOCOL)
-            ui_preferences_file.close()
 
         # Close the preferences window if open
         try: cmds.deleteUI('mrt_autoLoadSettingsUI_window')
@@ -491,9 +508,7 @@ class MRT_UI(object):
         cmds.text(label='')
 
         # Get the default preferences
-        ui_preferences_file = open(self.ui_preferences_path, 'rb')
-        ui_preferences = cPickle.load(ui_preferences_file)
-        ui_preferences_file.close()
+        ui_preferences = self.ui_preferences
         loadAtStartup = ui_preferences['autoLoadPreviousCollectionListAtStartupStatus']
         loadNewCollections = ui_preferences['autoLoadNewSavedModuleCollectionToListStatus']
 
@@ -527,9 +542,7 @@ class MRT_UI(object):
         is selected. This loads module collection(s) from a directory on the disk.
         '''
         # Get the previous directory path which was used to load module collections
-        ui_preferences_file = open(self.ui_preferences_path, 'rb')
-        ui_preferences = cPickle.load(ui_preferences_file)
-        ui_preferences_file.close()
+        ui_preferences = self.ui_preferences
         startDir = ui_preferences['directoryForAutoLoadingCollections']
 
         # If the previous directory path doesn't exist, use the default "user_collections" path under MRT
@@ -553,12 +566,12 @@ class MRT_UI(object):
             for file in os.listdir(directoryPath[0]):
                 if fnmatch.fnmatch(file, '*mrtmc'):
                     mrtmc_files.append('%s/%s'%(directoryPath[0], file))
-            self.loadModuleCollectionsForUI(mrtmc_files, value)
 
-        # Save the directory preference
-        ui_preferences_file = open(self.ui_preferences_path, 'wb')
-        cPickle.dump(ui_preferences, ui_preferences_file, cPickle.HIGHEST_PROTOCOL)
-        ui_preferences_file.close()
+            # Scan the module collection files in the background, and load them when done
+            if mrtmc_files:
+                self.scanModuleCollectionFilesForUI(mrtmc_files, value)
+            else:
+                self.loadModuleCollectionsForUI(mrtmc_files, value)
 
 
     def loadSavedModuleCollections(self, *args):
@@ -567,9 +580,7 @@ class MRT_UI(object):
         is selected. This loads selected module collection file(s) from the disk.
         '''
         # Get the last directory accessed for selecting module collection files(s)
-        ui_preferences_file = open(self.ui_preferences_path, 'rb')
-        ui_preferences = cPickle.load(ui_preferences_file)
-        ui_preferences_file.close()
+        ui_preferences = self.ui_preferences
         startDir = ui_preferences['lastDirectoryForLoadingCollections']
 
         # If the previous directory path doesn't exist, use the default "user_collections" path under MRT
@@ -588,9 +599,6 @@ class MRT_UI(object):
         # Save the current directory used to access module collection files(s)
         directory = mrtmc_files[0].rpartition('/')[0]
         ui_preferences['lastDirectoryForLoadingCollections'] = directory
-        ui_preferences_file = open(self.ui_preferences_path, 'wb')
-        cPickle.dump(ui_preferences, ui_preferences_file, cPickle.HIGHEST_PROTOCOL)
-        ui_preferences_file.close()
 
 
     def changeLoadCollectionListClearMode(self, *args):
@@ -609,13 +617,8 @@ class MRT_UI(object):
         def setLoadCollectionClearModeValue(*args):
             # Saves the current preference set for clearing the current module collection(s) before loading.
             value = cmds.checkBox(self.uiVars['loadCollectionClearMode_checkBox'], query=True, value=True)
-            ui_preferences_file = open(self.ui_preferences_path, 'rb')
-            ui_preferences = cPickle.load(ui_preferences_file)
-            ui_preferences_file.close()
+            ui_preferences = self.ui_preferences
             ui_preferences['loadCollectionClearModeStatus'] = value
-            ui_preferences_file = open(self.ui_preferences_path, 'wb')
-            cPickle.dump(ui_preferences, ui_preferences_file, cPickle.HIGHEST_PROTOCOL)
-            ui_preferences_file.close()
 
         # Close the preferences window if open
         try: cmds.deleteUI('mrt_loadCollectionClearMode_setting_UI_window')
@@ -640,9 +643,7 @@ class MRT_UI(object):
         cmds.rowLayout(numberOfColumns=1, columnAttach=([1, 'left', 55]), rowAttach=([1, 'top', 0]))
 
         # Get the default preferences
-        ui_preferences_file = open(self.ui_preferences_path, 'rb')
-        ui_preferences = cPickle.load(ui_preferences_file)
-        ui_preferences_file.close()
+        ui_preferences = self.ui_preferences
         value = ui_preferences['loadCollectionClearModeStatus']
 
         # Create the checkbox for setting the preference for clearing current module collection list before loading
@@ -681,13 +682,8 @@ class MRT_UI(object):
             # Saves the current preference set for clearing the current module collection(s) before loading
             # module collections(s) from a directory.
             value = cmds.checkBox(self.uiVars['loadCollectionDirectoryClearMode_checkBox'], query=True, value=True)
-            ui_preferences_file = open(self.ui_preferences_path, 'rb')
-            ui_preferences = cPickle.load(ui_preferences_file)
+            ui_preferences = self.ui_preferences
             ui_preferences['loadCollectionDirectoryClearModeStatus'] = value
-            ui_preferences_file.close()
-            ui_preferences_file = open(self.ui_preferences_path, 'wb')
-            cPickle.dump(ui_preferences, ui_preferences_file, cPickle.HIGHEST_PROTOCOL)
-            ui_preferences_file.close()
 
         # Close the preferences window if open
         try: cmds.deleteUI('mrt_loadCollectionDirectoryClearMode_setting_UI_window')
@@ -712,10 +708,8 @@ class MRT_UI(object):
         cmds.rowLayout(numberOfColumns=1, columnAttach=([1, 'left', 62]), rowAttach=([1, 'top', 0]))
 
         # Get the default preferences
-        ui_preferences_file = open(self.ui_preferences_path, 'rb')
-        ui_preferences = cPickle.load(ui_preferences_file)
+        ui_preferences = self.ui_preferences
         value = ui_preferences['loadCollectionDirectoryClearModeStatus']
-        ui_preferences_file.close()
 
         # Create the checkbox for setting the preference for clearing current module collection list before loading
         # new module collection(s) from a directory to the list.
@@ -742,9 +736,7 @@ class MRT_UI(object):
         Performs selective loading of character template files on disk into the MRT UI.
         '''
         # Get the previous directory accessed, saved as a preference
-        ui_preferences_file = open(self.ui_preferences_path, 'rb')
-        ui_preferences = cPickle.load(ui_preferences_file)
-        ui_preferences_file.close()
+        ui_preferences = self.ui_preferences
         startDir = ui_preferences['directoryForCharacterTemplates']
 
         # If the saved directory doesn't exist on the disk, use the default directory under MRT/character_templates
@@ -766,9 +758,14 @@ class MRT_UI(object):
 
         # Get the directory used for selecting character template files, save it as a preference
         ui_preferences['directoryForCharacterTemplates'] = mrtct_files[0].rpartition('/')[0]
-        ui_preferences_file = open(self.ui_preferences_path, 'wb')
-        cPickle.dump(ui_preferences, ui_preferences_file, cPickle.HIGHEST_PROTOCOL)
-        ui_preferences_file.close()
+
+
+    def setPayloadTypeForSavedFiles(self, preferenceKey, binary, *args):
+        '''
+        Called by the menu items for saving module collections / character templates as mayaBinary. Saves the
+        maya scene type for the payload in the new files (see mrt_fileFormat), for the passed-in preference.
+        '''
+        self.ui_preferences[preferenceKey] = 'mayaBinary' if binary else 'mayaAscii'
 
 
     def changeLoadSettingsForCharTemplates(self, *args):
@@ -777,9 +774,7 @@ class MRT_UI(object):
         '''
         def setCharTemplateLoadSettingsValues(*args):
             # Load the preferences
-            ui_preferences_file = open(self.ui_preferences_path, 'rb')
-            ui_preferences = cPickle.load(ui_preferences_file)
-            ui_preferences_file.close()
+            ui_preferences = self.ui_preferences
 
             # Get the current preferences
             clearListStatus = cmds.checkBox(self.uiVars['clearCharTemplateListOnLoad_checkBox'], query=True, value=True)
@@ -794,11 +789,6 @@ class MRT_UI(object):
             # Set the current preference for loading new templates to list
             ui_preferences['loadNewCharTemplatesToCurrentList'] = loadNewTemplatesToList
 
-            # Save these preferences
-            ui_preferences_file = open(self.ui_preferences_path, 'wb')
-            cPickle.dump(ui_preferences, ui_preferences_file, cPickle.HIGHEST_PROTOCOL)
-            ui_preferences_file.close()
-
         def loadTemplatesFromSettingsWindow(*args):
             # Load the templates
             try: cmds.deleteUI('mrt_charTemplateLoadSettingsUI_window')
@@ -823,9 +813,7 @@ class MRT_UI(object):
         cmds.text(label='')
 
         # Get the saved preferences
-        ui_preferences_file = open(self.ui_preferences_path, 'rb')
-        ui_preferences = cPickle.load(ui_preferences_file)
-        ui_preferences_file.close()
+        ui_preferences = self.ui_preferences
 
         # Preference to clear current template list for loading new character templates
         clearListStatus = ui_preferences['loadCharTemplateClearModeStatus']
@@ -1046,19 +1034,115 @@ class MRT_UI(object):
         Removes all auto module collection files auto generated by MRT. An auto collection file
         is used by MRT to revert a character back to scene modules.
         '''
-        # Get all files
-        autoCollectionFiles = filter(lambda fileName:re.match('^character__[0-9]*\.mrtmc$', fileName),
-                                                                os.listdir(self.autoCollections_path))
-        # Remove them.
-        if len(autoCollectionFiles):
-            for item in autoCollectionFiles:
-                itemPath = self.autoCollections_path + '/' + item
-                os.remove(itemPath)
-            sys.stderr.write('%s file(s) were removed.\n'%(len(autoCollectionFiles)))
+        # Remove all files, except the ones used by the character(s) in the current scene.
+        removedFileIds = self.autoCollectionStore.purgeFiles(self.returnSceneCollectionFileIDs())
+        self.autoCollectionFiles = {}
+
+        if len(removedFileIds):
+            sys.stderr.write('%s file(s) were removed.\n'%(len(removedFileIds)))
         else:
             Error('No auto-collection file(s) found.')
 
 
+    def purgeExtractionCache(self, *args):
+        '''
+        Removes all the maya scene files in the extraction cache, which are extracted from module collection
+        and character template files for import (see mrt_extractionCache).
+        '''
+        removedFileIds = self.extractionCache.purgeFiles()
+
+        if len(removedFileIds):
+            sys.stderr.write('%s file(s) were removed.\n'%(len(removedFileIds)))
+        else:
+            Error('No extraction cache file(s) found.')
+
+
+    def changeFileStoreLimits(self, storeName, windowTitle, *args):
+        '''
+        This function is called when a user selects the option box for "Purge auto-collection files on disk"
+        or "Purge extraction cache on disk" from the "Misc" menu, with "autoCollectionStore" or "extractionCache"
+        as "storeName". It sets the preferences for the maximum total size and the number of files kept on disk
+        for the store (see mrt_fileStore). The least recently used files are removed over these limits.
+        '''
+        fileStore = getattr(self, storeName)
+
+        def setFileStoreLimits(*args):
+            # Saves the current limits as preferences, and removes files over the limits.
+            maxSizeMB = cmds.intField(self.uiVars[storeName+'MaxSize_intField'], query=True, value=True)
+            maxCount = cmds.intField(self.uiVars[storeName+'MaxCount_intField'], query=True, value=True)
+            ui_preferences = self.ui_preferences
+            ui_preferences[storeName+'MaxSizeMB'] = maxSizeMB
+            ui_preferences[storeName+'MaxCount'] = maxCount
+
+            fileStore.maxSizeMB = maxSizeMB
+            fileStore.maxCount = maxCount
+
+            # The auto collection files used by the character(s) in the current scene are kept.
+            if storeName == 'autoCollectionStore':
+                fileStore.evictFiles(self.returnSceneCollectionFileIDs())
+                self.autoCollectionFiles = {}
+            else:
+                fileStore.evictFiles()
+
+        windowName = 'mrt_%sLimits_setting_UI_window' % storeName
+
+        # Close the preferences window if open
+        try: cmds.deleteUI(windowName)
+        except: pass
+
+        # Create the preferences window
+        self.uiVars[storeName+'LimitsWindow'] = cmds.window(windowName, title=windowTitle,
+                                                                    height=50, maximizeButton=False, sizeable=False)
+
+        try: cmds.windowPref(windowName, remove=True)
+        except: pass
+
+        # Main window column
+        self.uiVars[storeName+'LimitsWindowColumn'] = cmds.columnLayout(adjustableColumn=True)
+
+        cmds.text(label='')
+
+        cmds.frameLayout(visible=True, borderVisible=False, collapsable=False, labelVisible=False, height=60, width=330,
+                                                                                             marginWidth=5, marginHeight=5)
+        cmds.columnLayout(adjustableColumn=True, rowSpacing=4)
+
+        # Create the fields for the limits, with their current values.
+        cmds.rowLayout(numberOfColumns=2, columnAttach=([1, 'left', 40], [2, 'left', 10]))
+        cmds.text(label='Maximum total size (MB):', width=170, align='right')
+        self.uiVars[storeName+'MaxSize_intField'] = \
+            cmds.intField(value=fileStore.maxSizeMB, minValue=1, width=70, changeCommand=setFileStoreLimits)
+        cmds.setParent('..')
+        cmds.rowLayout(numberOfColumns=2, columnAttach=([1, 'left', 40], [2, 'left', 10]))
+        cmds.text(label='Maximum number of files:', width=170, align='right')
+        self.uiVars[storeName+'MaxCount_intField'] = \
+            cmds.intField(value=fileStore.maxCount, minValue=1, width=70, changeCommand=setFileStoreLimits)
+        cmds.setParent(self.uiVars[storeName+'LimitsWindowColumn'])
+
+        # Create button to close window
+        cmds.rowLayout(numberOfColumns=1, columnAttach=([1, 'left', 120]))
+        cmds.button(label='Close', width=90, command=partial(self.closeWindow, self.uiVars[storeName+'LimitsWindow']))
+        cmds.setParent(self.uiVars[storeName+'LimitsWindowColumn'])
+
+        cmds.text(label='')
+
+        # Show the window
+        cmds.showWindow(self.uiVars[storeName+'LimitsWindow'])
+
+
+    def returnSceneCollectionFileIDs(self):
+        '''
+        Returns the auto module collection file ids ("collectionFileID" attribute values) for all the
+        characters in the current scene.
+        '''
+        fileIds = []
+        for attribute in cmds.ls('*.collectionFileID', recursive=True) or []:
+            fileId = cmds.getAttr(attribute)
+            if fileId:
+                fileIds.append(fileId)
+
+        return fileIds
+
+
     def openWebPage(self, urlString, *args):
         '''
         Just like it says.
@@ -1434,6 +1518,14 @@ class MRT_UI(object):
         self.uiVars['loadedCollections_button_install'] = cmds.button(label='Install selected module collection into the scene',
                                                             enable=False, command=lambda *args: self.installSelectedModuleCollectionToScene())
 
+        self.uiVars['loadedCollections_button_installModules'] = cmds.button(label='Install modules from selected module collection',
+                                                                   enable=False,
+                                                                   command=self.installModulesFromSelectedModuleCollectionUI)
+
+        self.uiVars['loadedCollections_button_installMultiple'] = cmds.button(label='Install multiple module collections',
+                                                                   enable=False,
+                                                                   command=self.installMultipleModuleCollectionsUI)
+
         self.uiVars['loadedCollections_button_edit'] = cmds.button(label='Edit description for selected module collection',
                                                                    enable=False,
                                                                    command=self.editSelectedModuleCollectionDescriptionFromUI)
@@ -1923,7 +2015,7 @@ class MRT_UI(object):
                 cmds.button(self.uiVars['moduleRename_button'], edit=True, enable=True)
                 cmds.button(self.uiVars['moduleDelete_button'], edit=True, enable=True)
                 cmds.button(self.uiVars['moduleDuplicate_button'], edit=True, enable=True)
-                text = namespaceInfo[0].rpartition('__')[2]
+                text = mnames.parseName(lastSelection).userName
                 cmds.textField(self.uiVars['moduleRename_textField'], edit=True, text=text)
 
                 return
@@ -1942,50 +2034,31 @@ class MRT_UI(object):
         Checks for a character in the current scene. If found, it returns the name
         of main character group and the auto module collection file generated while creating the character.
         '''
-        # Get the current namespace, set to root.
-        namespace = cmds.namespaceInfo(currentNamespace=True)
-        cmds.namespace(setNamespace=':')
-
-        # Look for character main groups. Normally, there should only be one.
-        transforms = cmds.ls(assemblies=True)
-        characterGrp = []
-        for transform in transforms:
-            if cmds.attributeQuery('mrtCharacterVersion', node=transform, exists=True):
-                characterGrp.append(transform)
+        # Look for character main groups, from the character registry (see mrt_moduleRegistry). Normally,
+        # there should only be one.
+        characterRegistry = mreg.returnCharacterRegistry()
+        characterGrp = characterRegistry.returnCharacterGroups()
 
         # If found more than one character main group.
         if len(characterGrp) > 1:
             Error('MRT: More than one character exists in the scene.')
             return None
 
-        # If a character group is found in the scene.
-        if len(characterGrp) == 1:
-            characterGrp = characterGrp[0]
-
         # If no character main group is found in the scene.
         if len(characterGrp) == 0:
-            characterGrp = None
-
-        autoCollectionFile = ''
-
-        if characterGrp:
+            return None
 
-            # Get the stored auto-module collection file id
-            fileId = cmds.getAttr(characterGrp+'.collectionFileID')
+        characterGrp = characterGrp[0]
 
-            # Look for the target auto module collection file under "MRT/module_collections/auto-generated_character_collections"
-            collectionFile = 'character__%s' % (fileId)
-            autoCollectionFiles = [item for item in os.listdir(self.autoCollections_path) if re.match('^.*mrtmc$', item)]
-            if len(autoCollectionFiles):
-                for item in autoCollectionFiles:
-                    if item.partition('.')[0] == collectionFile:
-                        autoCollectionFile = collectionFile
-                        break
-        else:
-            return None 
+        # Get the stored auto-module collection file id
+        fileId = characterRegistry.returnCollectionFileID(characterGrp)
 
-        # Reset namespace.
-        cmds.namespace(setNamespace=namespace)
+        # Look for the target auto module collection file in the auto-collection store. The result is cached
+        # for the file id, since the file for a character in the scene isn't removed from the store.
+        if fileId not in self.autoCollectionFiles:
+            self.autoCollectionFiles[fileId] = 'character__%s' % (fileId) \
+                                                    if fileId and self.autoCollectionStore.hasFile(fileId) else ''
+        autoCollectionFile = self.autoCollectionFiles[fileId]
 
         return characterGrp, autoCollectionFile
 
@@ -2213,32 +2286,10 @@ class MRT_UI(object):
         moduleNamespaces = mfunc.returnMRT_Namespaces()
         cmds.namespace(setNamespace=currentNamespace)
 
-        # If module namespaces exist, get their respective user specified names.
+        # If module namespaces exist, get a unique name with a numerical suffix, if the name is used by a
+        # scene module (see mrt_names.MRTNameAllocator).
         if moduleNamespaces:
-            userSpecifiedNames = mfunc.returnModuleUserSpecNames(moduleNamespaces)[1]
-
-            # Get the highest trailing number suffix for the namespaces with default 'module' name.
-            if userSpecifiedName in userSpecifiedNames:
-                underscore_search = '_'
-
-                if re.match('^\w+_[0-9]*$', userSpecifiedName):
-                    underscore_search = re.findall('_*', userSpecifiedName)
-                    underscore_search.reverse()
-                    for item in underscore_search:
-                        if '_' in item:
-                            underscore_search = item
-                            break
-
-                    userSpecNameBase = userSpecifiedName.rpartition(underscore_search)[0]
-
-                else:
-                    userSpecNameBase = userSpecifiedName
-
-                suffix = mfunc.findHighestNumSuffix(userSpecNameBase, userSpecifiedNames)
-                text = '{0}{1}{2}'.format(userSpecifiedName, underscore_search, suffix+1)
-
-            else:
-                text = userSpecifiedName
+            text = mreg.returnModuleRegistry().returnNameAllocator().returnUniqueName(userSpecifiedName)
 
             # Update the text field.
             cmds.textField(self.uiVars['userSpecName_textField'], edit=True, text=text)
@@ -2419,6 +2470,7 @@ class MRT_UI(object):
             if len(namespacesToBeRemoved) > 0:
                 for namespace in namespacesToBeRemoved:
                     cmds.namespace(removeNamespace=namespace)
+                mreg.returnModuleRegistry().invalidate()
 
             mfunc.cleanSceneState()
 
@@ -2464,23 +2516,26 @@ class MRT_UI(object):
 
         # If module collection list is passed-in, re-build the module collection scroll list.
         if len(moduleCollectionFileList):
+
+            # Collection files currently in the list, and the allocator for unique collection names.
+            currentCollectionFiles = set(self.module_collectionList.values())
+            collectionNames = mnames.MRTListNameAllocator(self.module_collectionList)
+
             for collection in moduleCollectionFileList:
 
                 # Get the collection name suitable for the list from the collection file name.
                 collectionName = re.split(r'\/|\\', collection)[-1].rpartition('.')[0]
 
                 # Skip if a collection file exists.
-                if collection in self.module_collectionList.values():
+                if collection in currentCollectionFiles:
                     continue
+                currentCollectionFiles.add(collection)
 
                 # If the collection name exist in the list, add a numerical suffix to it
                 # Example:
                 # collectionName
                 # collectionName (2)
-                if collectionName in self.module_collectionList:
-                    suffix = mfunc.findHighestCommonTextScrollListNameSuffix(collectionName, self.module_collectionList.keys())
-                    suffix = suffix + 1
-                    collectionName = '%s (%s)'%(collectionName, suffix)
+                collectionName = collectionNames.allocate(collectionName)
 
                 # Save the collection name as a key with its collection file as value
                 self.module_collectionList[collectionName] = collection
@@ -2493,9 +2548,8 @@ class MRT_UI(object):
                 scrollHeight = 40
 
             # Add the module collection names to the module collection scroll list
-            for collectionName in sorted(self.module_collectionList):
-                cmds.textScrollList(self.uiVars['moduleCollection_txScList'], edit=True, enable=True,
-                                                    height=scrollHeight, append=collectionName, font='plainLabelFont',
+            cmds.textScrollList(self.uiVars['moduleCollection_txScList'], edit=True, enable=True,
+                                height=scrollHeight, append=sorted(self.module_collectionList), font='plainLabelFont',
                                                                                 selectCommand=self.printCollectionInfoForUI)
             # Select the first item
             cmds.textScrollList(self.uiVars['moduleCollection_txScList'], edit=True, selectIndexedItem=1)
@@ -2504,18 +2558,13 @@ class MRT_UI(object):
         # If module collection list is valid, save it, and enable UI buttons for installing, editing,
         # and deletion of module collection(s) from the UI scroll list.
         if len(self.module_collectionList):
-            module_collectionList_file = open(self.module_collectionList_path, 'rb')
-            module_collectionList = cPickle.load(module_collectionList_file)
-            module_collectionList_file.close()
-            for key in copy.copy(module_collectionList):
-                module_collectionList.pop(key)
-            for (key, value) in enumerate(self.module_collectionList.values()):
-                module_collectionList[str(key)] = value
-            module_collectionList_file = open(self.module_collectionList_path, 'wb')
-            cPickle.dump(module_collectionList, module_collectionList_file, cPickle.HIGHEST_PROTOCOL)
-            module_collectionList_file.close()
+            # The saved list is keyed by the module collection files, so that a file removed in another maya
+            # session only removes the same file from the list (see mrt_preferences).
+            self.saved_collectionList.replace(dict([(value, value) for value in self.module_collectionList.values()]))
             # Enable buttons
             cmds.button(self.uiVars['loadedCollections_button_install'], edit=True, enable=True)
+            cmds.button(self.uiVars['loadedCollections_button_installModules'], edit=True, enable=True)
+            cmds.button(self.uiVars['loadedCollections_button_installMultiple'], edit=True, enable=True)
             cmds.button(self.uiVars['loadedCollections_button_edit'], edit=True, enable=True)
             cmds.button(self.uiVars['loadedCollections_button_delete'], edit=True, enable=True)
 
@@ -2523,9 +2572,7 @@ class MRT_UI(object):
         if not len(self.module_collectionList):
 
             # Clear the saved module collection data
-            module_collectionList_file = open(self.module_collectionList_path, 'wb')
-            cPickle.dump({}, module_collectionList_file, cPickle.HIGHEST_PROTOCOL)
-            module_collectionList_file.close()
+            self.saved_collectionList.replace({})
 
             # Clear the module collection scroll list
             cmds.textScrollList(self.uiVars['moduleCollection_txScList'], edit=True, enable=False, height=32,
@@ -2537,10 +2584,85 @@ class MRT_UI(object):
                                                                                                         height=32)
             # Disable buttons for installing, editing and deletion of module collection(s)
             cmds.button(self.uiVars['loadedCollections_button_install'], edit=True, enable=False)
+            cmds.button(self.uiVars['loadedCollections_button_installModules'], edit=True, enable=False)
+            cmds.button(self.uiVars['loadedCollections_button_installMultiple'], edit=True, enable=False)
             cmds.button(self.uiVars['loadedCollections_button_edit'], edit=True, enable=False)
             cmds.button(self.uiVars['loadedCollections_button_delete'], edit=True, enable=False)
 
 
+    def scanModuleCollectionFilesForUI(self, moduleCollectionFileList, clearCurrentList=False):
+        '''
+        Reads the headers for the passed-in module collection files on worker threads (only for files not
+        in the catalog, or modified since) and loads the valid module collections into the MRT UI when
+        done. A window shows the progress, with an option to cancel; the collections scanned until then
+        are loaded.
+        '''
+        def mergeScannedModuleCollections(results, finished):
+            # Called on the main thread with the results from the scanner.
+
+            # Skip if the scan has been replaced by a new scan.
+            if self.collectionScanner is not scanner:
+                return
+
+            for (collectionFile, collectionEntry) in results:
+                if collectionEntry and collectionEntry['valid']:
+                    scannedCollectionFiles.append(collectionFile)
+                else:
+                    skippedCollectionFiles.append(collectionFile)
+
+            # Update the progress.
+            if cmds.window('mrt_collectionScan_UI_window', exists=True):
+                cmds.progressBar(self.uiVars['collectionScan_progressBar'], edit=True, step=len(results))
+                cmds.text(self.uiVars['collectionScan_status'], edit=True, label='Scanned %s of %s module collection files'
+                                                % (len(scannedCollectionFiles)+len(skippedCollectionFiles), scanner.fileCount))
+            if not finished:
+                return
+
+            # Close the progress window and save the catalog.
+            try: cmds.deleteUI('mrt_collectionScan_UI_window')
+            except: pass
+            self.fileCatalog.save()
+            self.collectionScanner = None
+
+            if skippedCollectionFiles:
+                MGlobal.displayWarning('MRT: Skipped %s invalid or missing module collection file(s).' % \
+                                                                                            len(skippedCollectionFiles))
+
+            # Load the scanned module collections, if the MRT UI is still open.
+            if scannedCollectionFiles and cmds.textScrollList(self.uiVars['moduleCollection_txScList'], exists=True):
+                self.loadModuleCollectionsForUI(scannedCollectionFiles, clearCurrentList)
+
+        # Cancel a previous scan, if it's running.
+        if self.collectionScanner:
+            self.collectionScanner.cancel()
+
+        scannedCollectionFiles = []
+        skippedCollectionFiles = []
+
+        scanner = mcat.MRTCatalogScanner(self.fileCatalog, moduleCollectionFileList, mergeScannedModuleCollections,
+                                                                                            maya.utils.executeDeferred)
+        self.collectionScanner = scanner
+
+        # Create the progress window, with a button to cancel the scan.
+        try: cmds.deleteUI('mrt_collectionScan_UI_window')
+        except: pass
+
+        self.uiVars['collectionScanWindow'] = cmds.window('mrt_collectionScan_UI_window', title='Loading module collections',
+                                                                                    maximizeButton=False, sizeable=False)
+        try: cmds.windowPref('mrt_collectionScan_UI_window', remove=True)
+        except: pass
+
+        cmds.columnLayout(adjustableColumn=True, rowSpacing=8, columnAttach=('both', 20), width=320)
+        cmds.text(label='')
+        self.uiVars['collectionScan_status'] = cmds.text(label='Scanning %s module collection files' % scanner.fileCount)
+        self.uiVars['collectionScan_progressBar'] = cmds.progressBar(height=20, progress=0, maxValue=scanner.fileCount)
+        cmds.button(label='Cancel', command=lambda *args: scanner.cancel())
+        cmds.text(label='')
+        cmds.showWindow(self.uiVars['collectionScanWindow'])
+
+        scanner.start()
+
+
     def printCollectionInfoForUI(self):
         '''
         Prints the module collection info for a selected item in the module collection scroll list
@@ -2552,13 +2674,23 @@ class MRT_UI(object):
         # Get its module collection file
         collectionFile = self.module_collectionList[selectedItem]
 
-        # Get the module collection description from the module collection file
-        if os.path.exists(collectionFile):
-            # Get the module collection data
-            collectionFileObj_file = open(collectionFile, 'rb')
-            collectionFileObj = cPickle.load(collectionFileObj_file)
-            collectionFileObj_file.close()
-            collectionDescrp = collectionFileObj['collectionDescrp']    # Module collection description
+        # Get the catalog entry for the module collection file. The file is read only if it's new or
+        # has changed since it was cataloged. If the file is missing, its entry is removed.
+        collectionEntry = self.fileCatalog.returnEntry(collectionFile)
+        self.fileCatalog.save()
+
+        # Check if the module collection file can be read.
+        if collectionEntry and not collectionEntry['valid']:
+            Error('MRT: Module collection error. The selected module collection file, "%s" is invalid ' \
+                                                                                    'or cannot be read.' % (collectionFile))
+            cmds.scrollField(self.uiVars['collectionDescrp_scrollField'], edit=True,
+                                      text='< invalid module collection file >', font='obliqueLabelFont', editable=False,
+                                                                                                            height=32)
+            return False
+
+        # Get the module collection description from the catalog entry
+        if collectionEntry:
+            collectionDescrp = collectionEntry['description']
 
             # If description is valid, print it in the module collection description field
             infoScrollheight = 32
@@ -2594,16 +2726,8 @@ class MRT_UI(object):
             self.module_collectionList.pop(selectedItem)
 
             # Remove it from saved module collection list data
-            module_collectionList_file = open(self.module_collectionList_path, 'rb')
-            module_collectionList = cPickle.load(module_collectionList_file)
-            module_collectionList_file.close()
-            for key in copy.copy(module_collectionList):
-                if module_collectionList[key] == collectionFile:
-                    module_collectionList.pop(key)
-                    break
-            module_collectionList_file = open(self.module_collectionList_path, 'wb')
-            cPickle.dump(module_collectionList, module_collectionList_file, cPickle.HIGHEST_PROTOCOL)
-            module_collectionList_file.close()
+            if collectionFile in self.saved_collectionList:
+                del self.saved_collectionList[collectionFile]
 
             # Reset the module collection description field
             cmds.scrollField(self.uiVars['collectionDescrp_scrollField'], edit=True, text='< no collection info >',
@@ -2617,6 +2741,8 @@ class MRT_UI(object):
                                                                                                     font='boldLabelFont')
             # Disable buttons for installing, editing and deletion of module collection(s)
             cmds.button(self.uiVars['loadedCollections_button_install'], edit=True, enable=False)
+            cmds.button(self.uiVars['loadedCollections_button_installModules'], edit=True, enable=False)
+            cmds.button(self.uiVars['loadedCollections_button_installMultiple'], edit=True, enable=False)
             cmds.button(self.uiVars['loadedCollections_button_edit'], edit=True, enable=False)
             cmds.button(self.uiVars['loadedCollections_button_delete'], edit=True, enable=False)
 
@@ -2644,20 +2770,14 @@ class MRT_UI(object):
             self.module_collectionList.pop(selectedItem)
 
             # Remove it from saved module collection list data, save the new list
-            module_collectionList_file = open(self.module_collectionList_path, 'rb')
-            module_collectionList = cPickle.load(module_collectionList_file)
-            module_collectionList_file.close()
-            for key in copy.copy(module_collectionList):
-                if module_collectionList[key] == collectionFile:
-                    module_collectionList.pop(key)
-                    break
-            module_collectionList_file = open(self.module_collectionList_path, 'wb')
-            cPickle.dump(module_collectionList, module_collectionList_file, cPickle.HIGHEST_PROTOCOL)
-            module_collectionList_file.close()
+            if collectionFile in self.saved_collectionList:
+                del self.saved_collectionList[collectionFile]
 
             # Remove the module collection from disk if specified
             if deleteFromDisk:
                 os.remove(collectionFile)
+                self.fileCatalog.removeEntry(collectionFile)
+                self.fileCatalog.save()
 
             # After removing the module collection name from the UI, check for item(s) in the module
             # collection scroll list
@@ -2684,6 +2804,8 @@ class MRT_UI(object):
                                                                                 font='obliqueLabelFont', editable=False,
                                                                                                                 height=32)
                 cmds.button(self.uiVars['loadedCollections_button_install'], edit=True, enable=False)
+                cmds.button(self.uiVars['loadedCollections_button_installModules'], edit=True, enable=False)
+                cmds.button(self.uiVars['loadedCollections_button_installMultiple'], edit=True, enable=False)
                 cmds.button(self.uiVars['loadedCollections_button_edit'], edit=True, enable=False)
                 cmds.button(self.uiVars['loadedCollections_button_delete'], edit=True, enable=False)
 
@@ -2720,7 +2842,8 @@ class MRT_UI(object):
         Performs installation of a selected module collection from the module collection scroll list
         into the maya scene. It also accepts an auto-collection file, which is auto generated by MRT
         while creating a character from scene modules (It's used by MRT to revert a character back
-        to its scene modules).
+        to its scene modules). If a list of module namespaces is passed-in as "moduleNamespaces", only
+        these modules are installed from the module collection, with their mirror and parent modules.
         '''
         # If an auto-install module collection file is passed, use it.
         if 'autoInstallFile' in kwargs:
@@ -2734,166 +2857,305 @@ class MRT_UI(object):
             selectedItem = cmds.textScrollList(self.uiVars['moduleCollection_txScList'], query=True, selectItem=True)[0]
             collectionFile = self.module_collectionList[selectedItem]
 
-        # Create and set a temporary namespace to work with module installations from collection file.
-        currentNamespace = cmds.namespaceInfo(currentNamespace=True)    # Save current namespace
-        cmds.namespace(setNamespace=':')
-        cmds.namespace(addNamespace='MRT_temp__namespaceForImport')
-        cmds.namespace(setNamespace='MRT_temp__namespaceForImport')
+        self.installModuleCollectionsToScene([(collectionFile, kwargs.get('moduleNamespaces'))])
+
+
+    def installModuleCollectionsToScene(self, collections):
+        '''
+        Installs module collection(s) into the maya scene, from a list of (module collection file, module
+        namespaces) tuples. The module namespaces are None to install all the modules from a module collection,
+        or a list of module namespaces to install only these modules, with their mirror and parent modules.
+
+        The module name conflicts are resolved for all the module collections together, in order, as they'd be
+        resolved for installing them one after the other. The module collections are then imported together,
+        from a single maya scene file where possible (see below).
+        '''
+        # Get the module namespaces for each module collection from its manifest (see mrt_manifest), and find new
+        # namespaces for the modules with name conflicts with the scene modules and the modules from the previous
+        # module collections. The modules are renamed in the maya scene data while it's copied from the extraction
+        # cache for import, so they're imported with their final names (see mrt_extractionCache).
+        nameAllocator = mreg.returnModuleRegistry().returnNameAllocator().copy()
+        collectionInstalls = []
+
+        for (collectionFile, moduleNamespaces) in collections:
+            collectionEntry = self.fileCatalog.returnEntry(collectionFile)
+            if not collectionEntry:
+                Error('MRT: Module collection error. The module collection file, "%s" cannot be found on disk.' \
+                                                                                                    % (collectionFile))
+                continue
+            if not collectionEntry['valid']:
+                Error('MRT: Module collection error. The module collection file, "%s" is invalid or cannot be read.' \
+                                                                                                    % (collectionFile))
+                continue
+            payloadType = collectionEntry['payloadType']
+            if moduleNamespaces:
+                if payloadType != 'mayaAscii':
+                    Error('MRT: Module collection error. Modules can only be installed from a mayaAscii module '\
+                                                                                                        'collection.')
+                    continue
+                # Only the chunks for the modules to be installed are read from the module collection file.
+                moduleNamespaces = mman.returnRequiredModuleNamespaces(collectionEntry['manifest'], moduleNamespaces)
+                collectionNamespaces = sorted(moduleNamespaces)
+            else:
+                moduleNamespaces = None
+                collectionNamespaces = [module['namespace'] for module in collectionEntry['manifest']['modules']]
 
-        # Read the module collection file data.
-        mrtmc_fObject_file = open(collectionFile, 'rb')
-        mrtmc_fObject = cPickle.load(mrtmc_fObject_file)
-        mrtmc_fObject_file.close()
+            namespaceRemapping = mman.returnNamespaceRemapping(collectionNamespaces, nameAllocator=nameAllocator)
+            collectionInstalls.append((collectionFile, payloadType, namespaceRemapping, moduleNamespaces,
+                                                                                collectionEntry['payloadChecksum']))
 
-        # Write a temporary maya scene file which will be used to import scene modules.
-        tempFilePath = collectionFile.rpartition('.mrtmc')[0]+'_temp.ma'
-        tempFile_fObject = open(tempFilePath, 'w')
+        self.fileCatalog.save()
 
-        # Write content to the maya scene file with the data from the module collection file.
-        for i in range(1, len(mrtmc_fObject)):
-            tempFile_fObject.write(mrtmc_fObject['collectionData_line_'+str(i)])
-        tempFile_fObject.close()
+        if not collectionInstalls:
+            return
+
+        # Group the module collections to be imported together. The mayaAscii module collections are written to a
+        # single maya scene file for import, unless a module collection has nodes outside the module namespaces
+        # with the same names as in a previous one (these would be renamed on import, as for separate imports).
+        # A mayaBinary module collection is imported by itself.
+        collectionImports = []
+        importNodeNames = None
+        for collectionInstall in collectionInstalls:
+            if len(collectionInstalls) == 1 or collectionInstall[1] != 'mayaAscii':
+                collectionImports.append([collectionInstall])
+                importNodeNames = None
+                continue
+            nodeNames = mfile.returnCommonNodeNames(collectionInstall[0])
+            if importNodeNames is None or importNodeNames.intersection(nodeNames):
+                collectionImports.append([])
+                importNodeNames = set()
+            collectionImports[-1].append(collectionInstall)
+            importNodeNames.update(nodeNames)
+
+        # Set the root namespace for importing the modules.
+        currentNamespace = cmds.namespaceInfo(currentNamespace=True)    # Save current namespace
+        cmds.namespace(setNamespace=':')
 
-        # Remove reference to the module collection file object (for garbage collection)
-        del mrtmc_fObject
-        
         # Kill the scene import check script job.
         self.warningScriptJobForDirectSceneModuleImport(kill=True)
 
-        # Import the scene module from the temporary maya scene file
-        cmds.file(tempFilePath, i=True, type="mayaAscii", prompt=False, ignoreVersion=True)
-        os.remove(tempFilePath) # Delete the maya scene file after import
+        for collectionImport in collectionImports:
+            collectionFile, payloadType, namespaceRemapping, moduleNamespaces, payloadChecksum = collectionImport[0]
+
+            # Get the maya scene file with the data from the module collection file(s), which will be used to
+            # import scene modules. The scene data for each module collection is extracted to the local cache,
+            # unless it's already extracted for a previous install (see mrt_extractionCache). The maya scene type
+            # is detected from the file header.
+            if payloadType == 'mayaAscii':
+                # The cached scene data for the module collection(s) is copied to a single file for import, with
+                # the module namespaces renamed for each, so the modules are imported at the root namespace with
+                # their final names.
+                sceneFilePath = self.extractionCache.returnImportFile(
+                                    [(collectionInstall[0], collectionInstall[2], collectionInstall[3]) \
+                                                                for collectionInstall in collectionImport],
+                                    [collectionInstall[4] for collectionInstall in collectionImport])
+                try:
+                    cmds.file(sceneFilePath, i=True, type=payloadType, prompt=False, ignoreVersion=True)
+                finally:
+                    self.extractionCache.removeImportFile()
+                continue
+
+            sceneFilePath = self.extractionCache.returnExtractedFile([(collectionFile, None)], [payloadChecksum],
+                                                                                                        payloadType)
+
+            # Import the scene modules from the maya scene file. The module namespaces in a mayaBinary
+            # scene can't be renamed before import, so the modules are imported under a temporary namespace,
+            # and renamed after import.
+            if not namespaceRemapping:
+                cmds.file(sceneFilePath, i=True, type=payloadType, prompt=False, ignoreVersion=True)
+            else:
+                cmds.file(sceneFilePath, i=True, type=payloadType, prompt=False, ignoreVersion=True,
+                                                                            namespace='MRT_temp__namespaceForImport')
+                self.renameModuleNamespacesAfterImport('MRT_temp__namespaceForImport', namespaceRemapping)
         
         # Run the scene import check script job.
         self.warningScriptJobForDirectSceneModuleImport()
-        
-        # Get the MRT module names in the current temporary namespace.
-        namesInTemp = mfunc.returnMRT_Namespaces('MRT_temp__namespaceForImport')
 
-        # Filter the module names from the temporary namespace.
-        namespacesInTemp = []
-        for name in namesInTemp:
-            namespacesInTemp.append(name.partition(':')[2])
+        # Set the saved namespace
+        cmds.namespace(setNamespace=currentNamespace)
 
-        # Get the module names in the root namespace, if any.
-        cmds.namespace(setNamespace=':')
-        moduleNamespaces = mfunc.returnMRT_Namespaces()
+        # Update UI fields
+        self.clearParentModuleField()
+        self.clearChildModuleField()
 
-        if moduleNamespaces:
 
-            # Get the user specified names of the module names, if any.
-            userSpecNamesForSceneModules = mfunc.returnModuleUserSpecNames(moduleNamespaces)[1]
+    def installMultipleModuleCollectionsUI(self, *args):
+        '''
+        Creates a window for selecting multiple module collections from the module collection scroll list,
+        to install them into the maya scene together (see installModuleCollectionsToScene()).
+        '''
+        def installSelectedModuleCollections(*args):
+            # Install the module collections selected in the window, in the order they're listed.
+            selectedItems = cmds.textScrollList(self.uiVars['installMultipleCollections_txScList'], query=True,
+                                                                                                selectItem=True)
+            if not selectedItems:
+                Error('MRT: Module collection error. No module collection(s) selected for installation.')
+                return
 
-            # Get the user specified names of the modules in the temporary namespace.
-            userSpecNamesInTemp = mfunc.returnModuleUserSpecNames(namespacesInTemp)
-            cmds.namespace(setNamespace='MRT_temp__namespaceForImport')
-            allUserSpecNames = set(userSpecNamesInTemp[1] + userSpecNamesForSceneModules)
+            # Close the window
+            cmds.deleteUI(self.uiVars['installMultipleCollectionsWindow'])
 
+            self.installModuleCollectionsToScene([(self.module_collectionList[selectedItem], None) \
+                                                                    for selectedItem in selectedItems])
 
-            # If there're existing modules in the scene, check and rename module(s) in the temporary namespace
-            # to resolve name conflicts.
-            
-            # To store the old and new namespace, for modifying module parent info.
-            modifiedNamespaces = {}
-            # To store an updated list of namespaces under temporary namespace, 'MRT_temp__namespaceForImport'.
-            updated_namespace_in_temp = []
-            
-            for (name, userSpecName) in zip(userSpecNamesInTemp[0], userSpecNamesInTemp[1]):
-                if userSpecName in userSpecNamesForSceneModules:
-                    underscore_search = '_'
-                    if re.match('^\w+_[0-9]*$', userSpecName):
-                        underscore_search = re.findall('_*', userSpecName)
-                        underscore_search.reverse()
-                        for item in underscore_search:
-                            if '_' in item:
-                                underscore_search = item
-                                break
-                        userSpecNameBase = userSpecName.rpartition(underscore_search)[0]
-                    else:
-                        userSpecNameBase = userSpecName
+        if not self.module_collectionList:
+            Error('MRT: Module collection error. No module collection(s) loaded.')
+            return
 
-                    suffix = mfunc.findHighestNumSuffix(userSpecNameBase, list(allUserSpecNames))
-                    newUserSpecName = '{0}{1}{2}'.format(userSpecName, underscore_search, suffix+1)
-                    namespace = '%s__%s' % (name, userSpecName)
-                    newNamespace = '%s__%s' % (name, newUserSpecName)
-                    cmds.namespace(addNamespace=newNamespace)
-                    
-                    modifiedNamespaces[namespace] = newNamespace
-                    updated_namespace_in_temp.append(newNamespace)
+        # Close the window if open
+        try: cmds.deleteUI('mrt_installMultipleCollections_UI_window')
+        except: pass
 
-                    # Rename the module with the temporary namespace, and remove the old namespace.
-                    cmds.namespace(moveNamespace=[':MRT_temp__namespaceForImport:'+namespace,
-                                                                            ':MRT_temp__namespaceForImport:'+newNamespace])
-                    cmds.namespace(removeNamespace=namespace)
-                    allUserSpecNames.add(newUserSpecName)
+        # Create the window
+        self.uiVars['installMultipleCollectionsWindow'] = cmds.window('mrt_installMultipleCollections_UI_window',
+                                                title='Install module collections', maximizeButton=False, sizeable=False)
+        # Remove the window from UI preference
+        try: cmds.windowPref('mrt_installMultipleCollections_UI_window', remove=True)
+        except: pass
+
+        # Main column
+        self.uiVars['installMultipleCollectionsWindowColumn'] = cmds.columnLayout(adjustableColumn=True)
+
+        cmds.text(label='')
+        cmds.text('Select module collection(s) to install', align='center', font='boldLabelFont')
 
-                    # If its mirror module exists, rename it as well.
-                    if cmds.attributeQuery('mirrorModuleNamespace',
-                                            node=':MRT_temp__namespaceForImport:'+newNamespace+':moduleGrp', exists=True):
+        cmds.frameLayout(visible=True, borderVisible=False, collapsable=False, labelVisible=False,
+                                                                            width=320, marginWidth=5, marginHeight=10)
 
-                        mirrorModuleNamespace = \
-                            cmds.getAttr(':MRT_temp__namespaceForImport:'+newNamespace+':moduleGrp.mirrorModuleNamespace')
+        # Create the list of loaded module collections
+        self.uiVars['installMultipleCollections_txScList'] = cmds.textScrollList(allowMultiSelection=True,
+                                                        height=min(max(len(self.module_collectionList), 2), 12) * 20,
+                                                        append=sorted(self.module_collectionList), font='plainLabelFont')
 
-                        cmds.lockNode(':MRT_temp__namespaceForImport:'+mirrorModuleNamespace+':module_container',
-                                                                                        lock=False, lockUnpublished=False)
+        # Create the layout and its buttons for installing the selected module collections
+        cmds.setParent(self.uiVars['installMultipleCollectionsWindowColumn'])
+        cmds.rowLayout(numberOfColumns=2, columnAttach=([1, 'left', 34], [2, 'left', 26]))
+        cmds.button(label='Install collections', width=130, command=installSelectedModuleCollections)
+        cmds.button(label='Cancel', width=90, command=partial(self.closeWindow,
+                                                                self.uiVars['installMultipleCollectionsWindow']))
 
-                        cmds.setAttr(':MRT_temp__namespaceForImport:'+mirrorModuleNamespace+':moduleGrp.mirrorModuleNamespace',
-                                                                                            newNamespace, type='string')
-                        cmds.lockNode(':MRT_temp__namespaceForImport:'+mirrorModuleNamespace+':module_container', lock=True,
-                                                                                                    lockUnpublished=True)
-                else:
-                    updated_namespace_in_temp.append('%s__%s' % (name, userSpecName))
-                        
+        # Set to the main UI column
+        cmds.setParent(self.uiVars['installMultipleCollectionsWindowColumn'])
+        cmds.text(label='')
 
-            # Modify the module parent infos for modules with modified namespaces under 
-            # temporary namespace, 'MRT_temp__namespaceForImport'.
-            for namespace in updated_namespace_in_temp:
-                
-                # Get the "moduleParent" attribute value, which stores parenting info for the parent module node.
-                moduleParentAttr = ':MRT_temp__namespaceForImport:%s:moduleGrp.moduleParent' % namespace
-                moduleParentInfo = cmds.getAttr(moduleParentAttr)
-                
-                # If a parent module node exists for the current module.
-                if moduleParentInfo != 'None':
-                    
-                    # Get the module parent info, i.e, "<parent module node>,<module parent type>".
-                    moduleParentInfo = moduleParentInfo.split(',')
-                    moduleParentNode = moduleParentInfo[0]
-                    moduleParentNamespace = moduleParentNode.split(':')[0]
-                    moduleParentNodeName = moduleParentNode.split(':')[1]
-
-                    # If the namespace for the parent module node has been renamed, modify it for the 
-                    # "moduleParent" attribute value.
-                    if moduleParentNamespace in modifiedNamespaces:
-                        
-                        # Get the new modified namespace for the parent module.
-                        newModuleParentNamespace = modifiedNamespaces[moduleParentNamespace]
-                        
-                        # Create a new value for the "moduleParent" attribute.
-                        newModuleParentInfo = '%s:%s,%s' % (newModuleParentNamespace, moduleParentNodeName, moduleParentInfo[1])
-                        
-                        # Get the module container for the current module, 
-                        # and set the new "moduleParent" value.
-                        module_container = ':MRT_temp__namespaceForImport:%s:module_container' % namespace
-                        cmds.lockNode(module_container, lock=False, lockUnpublished=False)
-                        cmds.setAttr(moduleParentAttr, newModuleParentInfo, type='string')
-                        cmds.lockNode(module_container, lock=True, lockUnpublished=True)
-                
-                
-        # After renaming the new module for the current scene, move them from the
-        # temporary namespace into the root namespace.
+        # Show the window
+        cmds.showWindow(self.uiVars['installMultipleCollectionsWindow'])
+
+
+    def renameModuleNamespacesAfterImport(self, importNamespace, namespaceRemapping):
+        '''
+        Renames the module namespaces for the modules imported under a temporary namespace, with a namespace
+        remapping dict (see mrt_manifest.returnNamespaceRemapping()), and moves the modules to the root namespace.
+        It's used for a mayaBinary module collection, whose module namespaces can't be renamed in its scene data.
+        '''
+        remapLine = mman.returnNamespaceRemapFunction(namespaceRemapping)
+
+        # Rename the module namespaces under the temporary namespace.
+        cmds.namespace(setNamespace=':'+importNamespace)
+        for (namespace, newNamespace) in namespaceRemapping.items():
+            cmds.namespace(addNamespace=newNamespace)
+            cmds.namespace(moveNamespace=[':%s:%s' % (importNamespace, namespace),
+                                          ':%s:%s' % (importNamespace, newNamespace)])
+            cmds.namespace(removeNamespace=':%s:%s' % (importNamespace, namespace))
+        mreg.returnModuleRegistry().invalidate()
+
+        # Rename the module namespaces in the module attributes, for the module parent and the mirror module.
+        for namespace in mfunc.returnMRT_Namespaces(importNamespace) or []:
+            for attribute in ('moduleParent', 'mirrorModuleNamespace'):
+                moduleAttr = ':%s:moduleGrp.%s' % (namespace, attribute)
+                if not cmds.objExists(moduleAttr):
+                    continue
+                value = cmds.getAttr(moduleAttr)
+                newValue = remapLine(value.encode('utf-8')).decode('utf-8') if value else value
+                if newValue != value:
+                    module_container = ':%s:module_container' % namespace
+                    cmds.lockNode(module_container, lock=False, lockUnpublished=False)
+                    cmds.setAttr(moduleAttr, newValue, type='string')
+                    cmds.lockNode(module_container, lock=True, lockUnpublished=True)
+
+        # Move the modules from the temporary namespace into the root namespace, and remove it.
         cmds.namespace(setNamespace=':')
-        cmds.namespace(moveNamespace=['MRT_temp__namespaceForImport', ':'], force=True)
+        cmds.namespace(moveNamespace=[importNamespace, ':'], force=True)
+        cmds.namespace(removeNamespace=importNamespace)
+        mreg.returnModuleRegistry().invalidate()
 
-        # Remove the temporary namespace
-        cmds.namespace(removeNamespace='MRT_temp__namespaceForImport')
 
-        # Set the saved namespace
-        cmds.namespace(setNamespace=currentNamespace)
+    def installModulesFromSelectedModuleCollectionUI(self, *args):
+        '''
+        Creates a window for selecting module(s) from a selected module collection in the module collection
+        scroll list, to install only these modules into the maya scene. Their mirror modules and parent
+        modules are installed with them.
+        '''
+        def installSelectedModules(*args):
+            # Install the modules selected in the window
+            selectedModules = cmds.textScrollList(self.uiVars['installCollectionModules_txScList'], query=True,
+                                                                                                    selectItem=True)
+            if not selectedModules:
+                Error('MRT: Module collection error. No module(s) selected for installation.')
+                return
 
-        # Update UI fields
-        self.clearParentModuleField()
-        self.clearChildModuleField()
+            # Close the window
+            cmds.deleteUI(self.uiVars['installCollectionModulesWindow'])
+
+            self.installSelectedModuleCollectionToScene(moduleNamespaces=selectedModules)
+
+        # Check if the selected module collection is valid.
+        validItem = self.printCollectionInfoForUI()
+        if not validItem:
+            return
+
+        # Get the modules in the module collection from its manifest.
+        selectedItem = cmds.textScrollList(self.uiVars['moduleCollection_txScList'], query=True, selectItem=True)[0]
+        collectionFile = self.module_collectionList[selectedItem]
+        collectionEntry = self.fileCatalog.returnEntry(collectionFile)
+        if collectionEntry['payloadType'] != 'mayaAscii':
+            Error('MRT: Module collection error. Modules can only be installed from a mayaAscii module collection.')
+            return
+        collectionNamespaces = [module['namespace'] for module in collectionEntry['manifest']['modules']]
+        if not collectionNamespaces:
+            Error('MRT: Module collection error. No modules found in the selected module collection.')
+            return
+
+        # Close the window if open
+        try: cmds.deleteUI('mrt_installCollectionModules_UI_window')
+        except: pass
+
+        # Create the window
+        self.uiVars['installCollectionModulesWindow'] = cmds.window('mrt_installCollectionModules_UI_window',
+                                            title='Install modules from module collection', maximizeButton=False,
+                                                                                                    sizeable=False)
+        # Remove the window from UI preference
+        try: cmds.windowPref('mrt_installCollectionModules_UI_window', remove=True)
+        except: pass
+
+        # Main column
+        self.uiVars['installCollectionModulesWindowColumn'] = cmds.columnLayout(adjustableColumn=True)
+
+        cmds.text(label='')
+        cmds.text('Select module(s) to install from "%s"' % selectedItem, align='center', font='boldLabelFont')
+        cmds.text('(their mirror and parent modules are installed with them)', align='center')
+
+        cmds.frameLayout(visible=True, borderVisible=False, collapsable=False, labelVisible=False,
+                                                                            width=320, marginWidth=5, marginHeight=10)
+
+        # Create the list of modules in the module collection
+        self.uiVars['installCollectionModules_txScList'] = cmds.textScrollList(allowMultiSelection=True,
+                                                                height=min(max(len(collectionNamespaces), 2), 12) * 20,
+                                                                append=collectionNamespaces, font='plainLabelFont')
+
+        # Create the layout and its buttons for installing the selected modules
+        cmds.setParent(self.uiVars['installCollectionModulesWindowColumn'])
+        cmds.rowLayout(numberOfColumns=2, columnAttach=([1, 'left', 34], [2, 'left', 26]))
+        cmds.button(label='Install modules', width=130, command=installSelectedModules)
+        cmds.button(label='Cancel', width=90, command=partial(self.closeWindow,
+                                                                    self.uiVars['installCollectionModulesWindow']))
+
+        # Set to the main UI column
+        cmds.setParent(self.uiVars['installCollectionModulesWindowColumn'])
+        cmds.text(label='')
+
+        # Show the window
+        cmds.showWindow(self.uiVars['installCollectionModulesWindow'])
 
 
     def editSelectedModuleCollectionDescriptionFromUI(self, *args):
@@ -2914,16 +3176,10 @@ class MRT_UI(object):
             # Get the corresponding module collection file
             collectionFile = self.module_collectionList[selectedItem]
 
-            # Get module collection data from the file
-            collectionFileObj_file = open(collectionFile, 'rb')
-            collectionFileObj = cPickle.load(collectionFileObj_file)
-            collectionFileObj_file.close()
-
-            # Update the module collection description for the data wnd write it
-            collectionFileObj['collectionDescrp'] = collectionDescription
-            collectionFileObj_file = open(collectionFile, 'wb')
-            cPickle.dump(collectionFileObj, collectionFileObj_file, cPickle.HIGHEST_PROTOCOL)
-            collectionFileObj_file.close()
+            # Update the module collection description in the file, and remove its catalog entry so that
+            # it's read again
+            mfile.updateFileDescription(collectionFile, collectionDescription)
+            self.fileCatalog.removeEntry(collectionFile)
 
             # Update the UI
             self.printCollectionInfoForUI()
@@ -2997,10 +3253,7 @@ class MRT_UI(object):
         # Get the current module collection description from its file
         selectedItem = cmds.textScrollList(self.uiVars['moduleCollection_txScList'], query=True, selectItem=True)[0]
         collectionFile = self.module_collectionList[selectedItem]
-        collectionFileObj_file = open(collectionFile, 'rb')
-        collectionFileObj = cPickle.load(collectionFileObj_file)
-        currentDescriptionText = collectionFileObj['collectionDescrp']
-        collectionFileObj_file.close()
+        currentDescriptionText = self.fileCatalog.returnEntry(collectionFile)['description']
 
         # Create the field for module collection description and set its value with the current description
         self.uiVars['editCollectionDescpWindowScrollField'] = cmds.scrollField(preventOverride=True, wordWrap=True,
@@ -3146,11 +3399,10 @@ class MRT_UI(object):
             # For every scene module
             for name in MRT_namespaces:
 
-                # Get the user specified name
-                userSpecifiedName = name.partition('__')[2]
-
-                # Get the module type from its name
-                moduleType = name.partition('__')[0].partition('_')[2].partition('Node')[0]
+                # Get the user specified name, and the module type from its name
+                parsedNamespace = mnames.parseNamespace(name)
+                userSpecifiedName = parsedNamespace.userName
+                moduleType = parsedNamespace.moduleType.partition('Node')[0]
 
                 # Get the mirrored module (if it's a mirrored module pair)
                 if cmds.attributeQuery('mirrorModuleNamespace', node=name+':moduleGrp', exists=True):
@@ -3524,9 +3776,7 @@ class MRT_UI(object):
 
             # Get the last directory for module collection save. If error, get the default directory.
             fileFilter = 'MRT Module Collection Files (*.mrtmc)'
-            ui_preferences_file = open(self.ui_preferences_path, 'rb')
-            ui_preferences = cPickle.load(ui_preferences_file)
-            ui_preferences_file.close()
+            ui_preferences = self.ui_preferences
             startDir = ui_preferences['startDirectoryForCollectionSave']
             if not os.path.exists(startDir):
                 startDir = ui_preferences['defaultStartDirectoryForCollectionSave']
@@ -3540,9 +3790,6 @@ class MRT_UI(object):
                 if fileReturn == None:
                     return
                 ui_preferences['startDirectoryForCollectionSave'] = fileReturn[0].rpartition('/')[0]
-                ui_preferences_file = open(self.ui_preferences_path, 'wb')
-                cPickle.dump(ui_preferences, ui_preferences_file, cPickle.HIGHEST_PROTOCOL)
-                ui_preferences_file.close()
 
             # If an auto module collection is being by created internally by MRT.
             if auto:
@@ -3557,6 +3804,9 @@ class MRT_UI(object):
             # Get the first pass of modules to be collected for saving a collection
             modulesToBeCollected = treeViewSelection[:]
 
+            # Get the module hierarchy for the scene modules, for collecting parent / children modules.
+            moduleGraph = mreg.MRTModuleGraph()
+
             # Get the status for collecting parent modules for current selected modules (and their mirror modules)
             parentCollectStatus = cmds.radioCollection(self.uiVars['moduleSaveColl_options_parentsCheckRadioCollection'],
                                                                                                     query=True, select=True)
@@ -3576,14 +3826,8 @@ class MRT_UI(object):
             if parentCollectStatus == 'All_Parents':
                 # Go through each module.
                 for module in treeViewSelection:
-                    # Find all parent modules for the module.
-                    allParentsModuleList = mfunc.traverseParentModules(module)[0]
-                    # Collect all the parent module names in a linear list. The 'modulesToBeCollected' is mutable
-                    # and is used by the following method as a storage. The existing content for
-                    # 'modulesToBeCollected' is not affected.
-                    if len(allParentsModuleList):
-                        modulesToBeCollected = \
-                                mfunc.concatenateCommonNamesFromHierarchyData(allParentsModuleList, modulesToBeCollected)
+                    # Find and add all parent modules for the module.
+                    modulesToBeCollected += moduleGraph.returnAncestors(module)
 
             # Get the status for collecting child modules for current selected modules (and their mirror modules)
             childrenCollectStatus = cmds.radioCollection(self.uiVars['moduleSaveColl_options_childrenCheckRadioCollection'],
@@ -3592,22 +3836,15 @@ class MRT_UI(object):
             if childrenCollectStatus == 'Direct_Children':
                 # Go through each module.
                 for module in treeViewSelection:
-                    # Get the children module(s), if they exist.
-                    childrenModuleDict = mfunc.traverseChildrenModules(module)
-                    if childrenModuleDict:
-                        # Collect the child module(s) by their namespaces
-                        modulesToBeCollected += [module for module in childrenModuleDict]
+                    # Collect the child module(s) by their namespaces, if they exist.
+                    modulesToBeCollected += moduleGraph.returnChildren(module)
 
             # If all descendent modules are to be collected for current modules, find and add them.
             if childrenCollectStatus == 'All_Children':
                 # Go through each module.
                 for module in treeViewSelection:
-                    # Find all descendent module(s) for the module.
-                    allChildrenModuleDict = mfunc.traverseChildrenModules(module, allChildren=True)
-                    if allChildrenModuleDict:
-                        # Collect all children module(s) in a linear list and add it to 'modulesToBeCollected'.
-                        modulesToBeCollected = mfunc.concatenateCommonNamesFromHierarchyData(allChildrenModuleDict,
-                                                                                                    modulesToBeCollected)
+                    # Find and add all descendent module(s) for the module.
+                    modulesToBeCollected += moduleGraph.returnDescendants(module)
             # Collect the mirror module(s) for the new module(s) that are added.
             for module in copy.copy(modulesToBeCollected):
                 if cmds.attributeQuery('mirrorModuleNamespace', node=module+':moduleGrp', exists=True):
@@ -3659,48 +3896,41 @@ class MRT_UI(object):
             if os.path.exists(fileReturn[0]):
                 os.remove(fileReturn[0])
 
-            # Create a dict object, to contain the module collection data (by key) to be saved.
-            mrtmc_fObject = {}
-
-            # Save the module collection description.
-            mrtmc_fObject['collectionDescrp'] = collectionDescription
-            
             # Turn off mirroring script jobs.
             mfunc.forceToggleUtilScriptJobs(False)
 
             # Disable / remove module mirror move connections.
             mfunc.deleteMirrorMoveConnections()
 
+            # Get the maya scene type for the module collection payload from the preferences. An auto module
+            # collection is always saved as mayaAscii, so that it can be matched by its content (see mrt_autoCollections).
+            payloadType = 'mayaAscii' if auto else self.ui_preferences['collectionPayloadType']
+
+            # For a mayaBinary payload, get the module manifest for the file header from the scene modules.
+            # For a mayaAscii payload, it's computed from the maya scene.
+            manifest = None
+            if payloadType == 'mayaBinary':
+                manifest = mfunc.returnManifestForSceneModules(modulesToBeCollected)
+
             # Select the module containers and module proxy geometry (see above) to be included in the collection.
             cmds.select(moduleObjectsToBeCollected, replace=True)
 
             # Create a temporary maya scene to export module collection data.
-            tempFilePath = fileReturn[0].rpartition('.mrtmc')[0]+'_temp.ma'
-            cmds.file(tempFilePath, force=True, options='v=1', type='mayaAscii', exportSelected=True, pr=True)
+            tempFilePath = fileReturn[0].rpartition('.mrtmc')[0]+'_temp'+mfile.PAYLOAD_TYPES[payloadType]
+            cmds.file(tempFilePath, force=True, options='v=1', type=payloadType, exportSelected=True, pr=True)
 
-            # Read the contents of the maya scene and use it to construct module collection file.
-            tempFile_fObject = open(tempFilePath)
-            for i, line in enumerate(tempFile_fObject):
-                mrtmc_fObject['collectionData_line_'+str(i+1)] = line
-            tempFile_fObject.close()
+            # Now, write/save the module collection file with the maya scene as its payload.
+            mfile.writeFile(fileReturn[0], 'collection', collectionDescription, tempFilePath, _mrt_version, manifest,
+                                                                                            payloadType=payloadType)
+            self.fileCatalog.removeEntry(fileReturn[0])
 
             # Remove the temporary maya scene file.
             os.remove(tempFilePath)
 
-            # Now, write/save the module collection file.
-            mrtmc_fObject_file = open(fileReturn[0], 'wb')
-            cPickle.dump(mrtmc_fObject, mrtmc_fObject_file, cPickle.HIGHEST_PROTOCOL)
-            mrtmc_fObject_file.close()
-
-            # Remove the reference to module collection file object (for garbage collection).
-            del mrtmc_fObject
-
             # If module collection is being saved by the user, get the UI preference to load the
             # new module collection into the UI module collection list.
             if not auto:
-                ui_preferences_file = open(self.ui_preferences_path, 'rb')
-                ui_preferences = cPickle.load(ui_preferences_file)
-                ui_preferences_file.close()
+                ui_preferences = self.ui_preferences
                 loadNewCollections = ui_preferences['autoLoadNewSavedModuleCollectionToListStatus']
                 # If preference set to load new collections, load/add the new saved collection to the list.
                 if loadNewCollections:
@@ -3904,19 +4134,11 @@ class MRT_UI(object):
         if newNamespace == currentNamespaceForSelectedModule:
             return
 
-        # Get all module namespaces in the scene.
-        sceneNamespaces = mfunc.returnMRT_Namespaces()
-
-        currentModuleUserNames = []
-
         # Check if the new module namespace exists in the scene, return if true.
-        if sceneNamespaces:
-            for namespace in sceneNamespaces:
-                userSpecifiedName = namespace.partition('__')[2]
-                if newUserSpecifiedName == userSpecifiedName:
-                    Error('MRT: Namespace conflict. The module name "%s" already ' \
-                                                                    'exists in the scene.' % newUserSpecifiedName)
-                    return
+        if mreg.returnModuleRegistry().returnNameAllocator().hasName(newUserSpecifiedName):
+            Error('MRT: Namespace conflict. The module name "%s" already ' \
+                                                            'exists in the scene.' % newUserSpecifiedName)
+            return
 
         # Now, that there are no namespace conflicts with existing modules, module re-naming can proceed.
 
@@ -3954,6 +4176,7 @@ class MRT_UI(object):
 
         # Remove the old module namespace.
         cmds.namespace(removeNamespace=currentNamespaceForSelectedModule)
+        mreg.returnModuleRegistry().invalidate()
 
         # If a mirror module exists (if the module is part of a mirror module pair),
         # change the "mirrorModuleNamespace" attribute on the mirror module to match the new namespace.
@@ -3963,6 +4186,7 @@ class MRT_UI(object):
             cmds.lockNode(mirrorModuleNamespace+':module_container', lock=False, lockUnpublished=False)
             cmds.setAttr(mirrorModuleNamespace+':moduleGrp.mirrorModuleNamespace', newNamespace, type='string')
             cmds.lockNode(mirrorModuleNamespace+':module_container', lock=True, lockUnpublished=True)
+            mreg.returnModuleRegistry().invalidate()
         
         # Lock the module container after re-naming.
         cmds.lockNode(newNamespace+':module_container', lock=True, lockUnpublished=True)
@@ -4425,6 +4649,7 @@ class MRT_UI(object):
         # Remove the module namespaces.
         for namespace in modulesToBeRemoved:
             cmds.namespace(removeNamespace=namespace)
+        mreg.returnModuleRegistry().invalidate()
 
         # Reset current namespace.
         if cmds.namespace(exists=currentNamespace):
@@ -4485,6 +4710,7 @@ class MRT_UI(object):
         if namespacesToBeRemoved:
             for namespace in namespacesToBeRemoved:
                 cmds.namespace(removeNamespace=namespace)
+            mreg.returnModuleRegistry().invalidate()
 
         # Reset current namespace.
         if cmds.namespace(exists=currentNamespace):
@@ -4631,9 +4857,9 @@ class MRT_UI(object):
             if namespaceInfo != None:
 
                 # Check the module node based on its type, before inserting it.
-                moduleType = namespaceInfo[0].partition('__')[0]
+                moduleType = mnames.parseName(lastSelection).moduleType
 
-                if moduleType == 'MRT_JointNode' or moduleType == 'MRT_SplineNode':
+                if moduleType == 'JointNode' or moduleType == 'SplineNode':
                     if cmds.nodeType(lastSelection) == 'joint':
                         cmds.textField(self.uiVars['selectedParent_textField'], edit=True, text=lastSelection, font='plainLabelFont')
                         cmds.button(self.uiVars['moduleParent_button'], edit=True, enable=True)
@@ -5009,19 +5235,21 @@ class MRT_UI(object):
 
         cmds.select(clear=True)
 
-        # Get a random name for the auto module collection file to be saved. This file is used by MRT to revert
-        # back to scene modules from a character.
-        fileId = reduce(lambda x,y:x+y, (random.random(), random.random(), random.random()))
-        fileId = str(fileId).partition('.')[2]
+        # Now, save an auto module collection file from scene modules. This file is used by MRT to revert
+        # back to scene modules from a character. It's added to the auto-collection store by the hash for its
+        # content, which is used as its file id (an existing file with the same content is re-used).
+        autoCharacterFile = self.autoCollectionStore.returnNewFilePath()
+        self.makeCollectionFromSceneTreeViewModulesUI(allModules=True, auto=autoCharacterFile)
+        fileId = self.autoCollectionStore.addFile(autoCharacterFile)
 
         # Set the collection file id for the auto module collection file.
         cmds.setAttr(mainGrp+'.collectionFileID', fileId, type='string', lock=True)
 
-        # Get the path for the auto module collection file.
-        autoCharacterFile = self.autoCollections_path + '/character__%s.mrtmc'%(fileId)
+        # Find the new character for the next lookup.
+        mreg.returnCharacterRegistry().invalidate()
 
-        # Now, save an auto module collection file from scene modules.
-        self.makeCollectionFromSceneTreeViewModulesUI(allModules=True, auto=autoCharacterFile)
+        # Remove the least recently used auto module collection files over the store limits.
+        self.autoCollectionStore.evictFiles(self.returnSceneCollectionFileIDs())
 
         characterJointSet = []
         
@@ -5100,9 +5328,8 @@ class MRT_UI(object):
                 if parent == None:
                     cmds.parent(joint, jointsGrp)            
 
-        # Set the string list attribute for storing character joints
-        characterJointsAttr = ','.join(characterJoints)
-        cmds.setAttr(mainGrp+'.skinJointList', characterJointsAttr, type='string', lock=True)
+        # Store the character joints (see mrt_characterMetadata).
+        mchar.returnCharacterMetadata().setSkinJoints(characterName, characterJoints)
 
         # If the character has no proxy geometry, delete the proxy geo main group.
         proxyGrpChildren = cmds.listRelatives(proxyMainGrp, allDescendents=True)
@@ -5163,12 +5390,11 @@ class MRT_UI(object):
         # Update progress.
         runProgressWindow(message='Preparing rig layers...', progress=95)          
 
-        # Add the "rigLayers" attribute to all root joints for all character joint hierachies.
-        # This attribute is used for parent/space switching operations.
+        # Add the rig layer attributes to all root joints for all character joint hierachies.
+        # These attributes are used for parent/space switching operations.
         for joint in characterJoints:
             if re.search('_root_node_joint', joint):
-                cmds.addAttr(joint, dataType='string', longName='rigLayers', keyable=False)
-                cmds.setAttr(joint+'.rigLayers', 'None', type='string', lock=True)
+                mchar.returnCharacterMetadata().initRigLayers(joint)
 
         # Add the "skinGeometryGrp" to the "skin_geometry" display layer.
         cmds.editDisplayLayerMembers(skinGeoLayerName, skinGeoGrp)
@@ -5273,8 +5499,9 @@ class MRT_UI(object):
                 if ctrl_containers:
                     cmds.delete(ctrl_containers)
     
-                # Get the auto module collection file path for the character.
+                # Get the auto module collection file path for the character, and record its use.
                 autoFile = self.autoCollections_path + '/' + status[1] + '.mrtmc'
+                self.autoCollectionStore.touchFile(status[1].partition('__')[2])
     
                 # Install scene module(s) from the module collection file.
                 self.installSelectedModuleCollectionToScene(autoInstallFile=autoFile)
@@ -5296,23 +5523,26 @@ class MRT_UI(object):
 
         # If character template list is passed-in, re-build the character template scroll list.
         if len(charTemplatesFileList):
+
+            # Template files currently in the list, and the allocator for unique template names.
+            currentTemplateFiles = set(self.charTemplateList.values())
+            templateNames = mnames.MRTListNameAllocator(self.charTemplateList)
+
             for template in charTemplatesFileList:
 
                 # Get the character template name suitable for the list from the template file name.
                 templateName = re.split(r'\/|\\', template)[-1].rpartition('.')[0]
 
                 # Skip if a template file exists in the list values.
-                if template in self.charTemplateList.values():
+                if template in currentTemplateFiles:
                     continue
+                currentTemplateFiles.add(template)
 
                 # If the template name exist in the list, add a numerical suffix to it
                 # Example:
                 # templateName
                 # templateName (2)
-                if templateName in self.charTemplateList:
-                    suffix = mfunc.findHighestCommonTextScrollListNameSuffix(templateName, self.charTemplateList.keys())
-                    suffix = suffix + 1
-                    templateName = '%s (%s)'%(templateName, suffix)
+                templateName = templateNames.allocate(templateName)
 
                 # Save the template name as a key with its template file as value
                 self.charTemplateList[templateName] = template
@@ -5325,10 +5555,9 @@ class MRT_UI(object):
                 scrollHeight = 40
 
             # Add the character template names to the module collection scroll list
-            for templateName in sorted(self.charTemplateList):
-                cmds.textScrollList(self.uiVars['charTemplates_txScList'], edit=True, enable=True,
-                                    height=scrollHeight, append=templateName, font='plainLabelFont',
-                                    selectCommand=self.printCharTemplateInfoForUI)
+            cmds.textScrollList(self.uiVars['charTemplates_txScList'], edit=True, enable=True,
+                                height=scrollHeight, append=sorted(self.charTemplateList), font='plainLabelFont',
+                                selectCommand=self.printCharTemplateInfoForUI)
 
             # Select the first item
             cmds.textScrollList(self.uiVars['charTemplates_txScList'], edit=True, selectIndexedItem=1)
@@ -5337,16 +5566,8 @@ class MRT_UI(object):
         # If character template list is valid, save it, and enable UI buttons for importing, editing,
         # and deletion of character template(s) from the UI scroll list.
         if len(self.charTemplateList):
-            charTemplateList_file = open(self.charTemplateList_path, 'rb')
-            charTemplateList = cPickle.load(charTemplateList_file)
-            charTemplateList_file.close()
-            for key in copy.copy(charTemplateList):
-                charTemplateList.pop(key)
-            for (key, value) in enumerate(self.charTemplateList.values()):
-                charTemplateList[str(key)] = value
-            charTemplateList_file = open(self.charTemplateList_path, 'wb')
-            cPickle.dump(charTemplateList, charTemplateList_file, cPickle.HIGHEST_PROTOCOL)
-            charTemplateList_file.close()
+            # The saved list is keyed by the character template files (see the module collection list above).
+            self.saved_charTemplateList.replace(dict([(value, value) for value in self.charTemplateList.values()]))
             # Enable buttons
             cmds.button(self.uiVars['charTemplate_button_import'], edit=True, enable=True)
             cmds.button(self.uiVars['charTemplate_button_edit'], edit=True, enable=True)
@@ -5356,9 +5577,7 @@ class MRT_UI(object):
         if not len(self.charTemplateList):
 
             # Clear the saved character template data
-            charTemplateList_file = open(self.charTemplateList_path, 'wb')
-            cPickle.dump({}, charTemplateList_file, cPickle.HIGHEST_PROTOCOL)
-            charTemplateList_file.close()
+            self.saved_charTemplateList.replace({})
 
             # Clear the character template scroll list
             cmds.textScrollList(self.uiVars['charTemplates_txScList'], edit=True, enable=False,
@@ -5386,13 +5605,23 @@ class MRT_UI(object):
         # Get its template file
         templateFile = self.charTemplateList[selectedItem]
 
-        # Get the character template description from its template file
-        if os.path.exists(templateFile):
-            # Get the character template data
-            templateFileObj = open(templateFile, 'rb')
-            templateFileData = cPickle.load(templateFileObj)
-            templateFileObj.close()
-            templateDescrp = templateFileData['templateDescription']    # Character template description
+        # Get the catalog entry for the character template file. The file is read only if it's new or
+        # has changed since it was cataloged. If the file is missing, its entry is removed.
+        templateEntry = self.fileCatalog.returnEntry(templateFile)
+        self.fileCatalog.save()
+
+        # Check if the character template file can be read.
+        if templateEntry and not templateEntry['valid']:
+            Error('MRT: Character template error. The selected character template file, "%s" is invalid ' \
+                                                                                        'or cannot be read.' % (templateFile))
+            cmds.scrollField(self.uiVars['charTemplateDescrp_scrollField'], edit=True,
+                                    text='< invalid character template file >', font='obliqueLabelFont', editable=False,
+                                                                                                            height=32)
+            return False
+
+        # Get the character template description from the catalog entry
+        if templateEntry:
+            templateDescrp = templateEntry['description']
 
             # If description is valid, print it in the character template description field
             infoScrollheight = 32
@@ -5427,16 +5656,8 @@ class MRT_UI(object):
             self.charTemplateList.pop(selectedItem)
 
             # Remove it from saved character template list data
-            charTemplateList_file = open(self.charTemplateList_path, 'rb')
-            charTemplateList = cPickle.load(charTemplateList_file)
-            charTemplateList_file.close()
-            for key in copy.copy(charTemplateList):
-                if charTemplateList[key] == templateFile:
-                    charTemplateList.pop(key)
-                    break
-            charTemplateList_file = open(self.charTemplateList_path, 'wb')
-            cPickle.dump(charTemplateList, charTemplateList_file, cPickle.HIGHEST_PROTOCOL)
-            charTemplateList_file.close()
+            if templateFile in self.saved_charTemplateList:
+                del self.saved_charTemplateList[templateFile]
 
             # Reset the character template description field
             cmds.scrollField(self.uiVars['charTemplateDescrp_scrollField'], edit=True, text='< no template info >',
@@ -5467,12 +5688,10 @@ class MRT_UI(object):
         cmds.namespace(setNamespace=':')
 
         # Check if a character exists in the current scene, skip importing if true.
-        transforms = cmds.ls(type='transform')
-        for transform in transforms:
-            status = self.getMRTcharacter()
-            if status:
-                Error('MRT: Unable to import a template.')
-                return
+        status = self.getMRTcharacter()
+        if status:
+            Error('MRT: Unable to import a template.')
+            return
 
         # Skip importing if module(s) exist in the scene.
         moduleContainers = [item for item in cmds.ls(type='container') if mfunc.stripMRTNamespace(item)]
@@ -5484,36 +5703,35 @@ class MRT_UI(object):
         # Get the selected character template
         selectedItem = cmds.textScrollList(self.uiVars['charTemplates_txScList'], query=True, selectItem=True)[0]
 
-        # Get the associated character template, read its data.
+        # Get the associated character template.
         templateFile = self.charTemplateList[selectedItem]
-        templateFileObj = open(templateFile, 'rb')
-        templateFileData = cPickle.load(templateFileObj)
-        templateFileObj.close()
-
-        # Write a temporary maya scene file which will be used to import the character template.
-        tempFilePath = templateFile.rpartition('.mrtct')[0]+'_temp.ma'
-        tempFileObj = open(tempFilePath, 'w')
 
-        # Write content to the maya scene file with the data from the character template file.
-        for i in range(1, len(templateFileData)):
-            tempFileObj.write(templateFileData['templateData_line_'+str(i)])
-        tempFileObj.close()
-
-        # Remove reference to the character template file object (for garbage collection)
-        del templateFileData
+        # Get the maya scene file with the data from the character template file, which will be used to import
+        # the character template. It's extracted to the local cache, unless it's already extracted for a previous
+        # import (see mrt_extractionCache). The maya scene type is detected from the file header.
+        templateEntry = self.fileCatalog.returnEntry(templateFile)
+        self.fileCatalog.save()
+        if not templateEntry:
+            Error('MRT: Character template error. The selected character template file, "%s" cannot be found ' \
+                                                                                            'on disk.' % (templateFile))
+            return
+        if not templateEntry['valid']:
+            Error('MRT: Character template error. The selected character template file, "%s" is invalid ' \
+                                                                                        'or cannot be read.' % (templateFile))
+            return
+        payloadType = templateEntry['payloadType']
+        sceneFilePath = self.extractionCache.returnExtractedFile([(templateFile, None)],
+                                                                    [templateEntry['payloadChecksum']], payloadType)
         
         # Kill the scene import check script job.
         self.warningScriptJobForDirectSceneModuleImport(kill=True)        
 
-        # Import the character template from the temporary maya scene file
-        cmds.file(tempFilePath, i=True, type='mayaAscii', prompt=False, ignoreVersion=True)
+        # Import the character template from the maya scene file
+        cmds.file(sceneFilePath, i=True, type=payloadType, prompt=False, ignoreVersion=True)
         
         # Run the scene import check script job.
         self.warningScriptJobForDirectSceneModuleImport()        
 
-        # Delete the maya scene file after import
-        os.remove(tempFilePath)
-
 
     def editSelectedCharTemplateDescriptionFromUI(self, *args):
         '''
@@ -5533,16 +5751,10 @@ class MRT_UI(object):
             # Get the corresponding character template file
             templateFile = self.charTemplateList[selectedItem]
 
-            # Get character template data from the file
-            templateFileObj = open(templateFile, 'rb')
-            templateFileData = cPickle.load(templateFileObj)
-            templateFileObj.close()
-
-            # Update the character template description for the data wnd write it
-            templateFileData['templateDescription'] = templateDescription
-            templateFileObj = open(templateFile, 'wb')
-            cPickle.dump(templateFileData, templateFileObj, cPickle.HIGHEST_PROTOCOL)
-            templateFileObj.close()
+            # Update the character template description in the file, and remove its catalog entry so that
+            # it's read again
+            mfile.updateFileDescription(templateFile, templateDescription)
+            self.fileCatalog.removeEntry(templateFile)
 
             # Update the UI
             self.printCharTemplateInfoForUI()
@@ -5616,10 +5828,7 @@ class MRT_UI(object):
         # Get the current character template description from its file
         selectedItem = cmds.textScrollList(self.uiVars['charTemplates_txScList'], query=True, selectItem=True)[0]
         templateFile = self.charTemplateList[selectedItem]
-        templateFileObj = open(templateFile, 'rb')
-        templateFileData = cPickle.load(templateFileObj)
-        currentDescriptionText = templateFileData['templateDescription']
-        templateFileObj.close()
+        currentDescriptionText = self.fileCatalog.returnEntry(templateFile)['description']
 
         # Create the field for character template description and set its value with the current description
         self.uiVars['editCharTemplateDescrpWindowScrollField'] = cmds.scrollField(preventOverride=True, wordWrap=True,
@@ -5660,20 +5869,14 @@ class MRT_UI(object):
             self.charTemplateList.pop(selectedItem)
 
             # Remove it from saved character template list data, save the new list
-            charTemplateList_file = open(self.charTemplateList_path, 'rb')
-            charTemplateList = cPickle.load(charTemplateList_file)
-            charTemplateList_file.close()
-            for key in copy.copy(charTemplateList):
-                if charTemplateList[key] == templateFile:
-                    charTemplateList.pop(key)
-                    break
-            charTemplateList_file = open(self.charTemplateList_path, 'wb')
-            cPickle.dump(charTemplateList, charTemplateList_file, cPickle.HIGHEST_PROTOCOL)
-            charTemplateList_file.close()
+            if templateFile in self.saved_charTemplateList:
+                del self.saved_charTemplateList[templateFile]
 
             # Remove the character template from disk if specified
             if deleteFromDisk:
                 os.remove(templateFile)
+                self.fileCatalog.removeEntry(templateFile)
+                self.fileCatalog.save()
 
             # After removing the character template name from the UI, check for item(s) in the module
             # collection scroll list
@@ -5804,9 +6007,7 @@ class MRT_UI(object):
                 return
                 
             # Get the last directory accessed to save character template (saved as a preference)
-            ui_preferences_file = open(self.ui_preferences_path, 'rb')
-            ui_preferences = cPickle.load(ui_preferences_file)
-            ui_preferences_file.close()
+            ui_preferences = self.ui_preferences
             startDirectory = ui_preferences['directoryForSavingCharacterTemplates']
             
             # If the directory doesn't exist, get the default directory
@@ -5823,18 +6024,11 @@ class MRT_UI(object):
                 
             # Save the directory for saving character template file as a preference.
             ui_preferences['directoryForSavingCharacterTemplates'] = fileReturn[0].rpartition('/')[0]
-            ui_preferences_file = open(self.ui_preferences_path, 'wb')
-            cPickle.dump(ui_preferences, ui_preferences_file, cPickle.HIGHEST_PROTOCOL)
-            ui_preferences_file.close()
             
             # If the character template file exists, remove it (for overwriting).
             if os.path.exists(fileReturn[0]):
                 os.remove(fileReturn[0])
 
-            # Get the description for the template file object.
-            mrtct_fObject = {}
-            mrtct_fObject['templateDescription'] = templateDescription
-            
             # Now collect objects from the scene for the character template file.
             
             # Collect the character main group (returned by getMRTcharacter)
@@ -5850,32 +6044,33 @@ class MRT_UI(object):
             skinJointSet = 'MRT_'+characterName+'_skinJointSet'
             templateObjects.append(skinJointSet)
             
+            # Get the maya scene type for the character template payload from the preferences. For a mayaBinary
+            # payload, get the manifest (with the character joints) for the file header from the character.
+            # For a mayaAscii payload, it's computed from the maya scene.
+            payloadType = self.ui_preferences['charTemplatePayloadType']
+            manifest = None
+            if payloadType == 'mayaBinary':
+                manifest = mfunc.returnManifestForSceneModules([], status[0])
+            
             # Select the collected objects.
             cmds.select(templateObjects, replace=True, noExpand=True)
             
             # Save them temporarily in a maya scene.
-            tempFilePath = fileReturn[0].rpartition('.mrtct')[0]+'_temp.ma'
-            cmds.file(tempFilePath, force=True, options='v=1', type='mayaAscii', exportSelected=True, pr=True)
+            tempFilePath = fileReturn[0].rpartition('.mrtct')[0]+'_temp'+mfile.PAYLOAD_TYPES[payloadType]
+            cmds.file(tempFilePath, force=True, options='v=1', type=payloadType, exportSelected=True, pr=True)
             
-            # Add the maya scene contents to the template file object.
-            tempFile_fObject = open(tempFilePath)
-            for i, line in enumerate(tempFile_fObject):
-                mrtct_fObject['templateData_line_'+str(i+1)] = line
-            tempFile_fObject.close()
+            # Now save the character template file with the maya scene as its payload. A mayaBinary payload is
+            # stored uncompressed, so that it's copied from the memory-mapped file for import (see mrt_fileFormat).
+            payloadEncoding = 'none' if payloadType == 'mayaBinary' else None
+            mfile.writeFile(fileReturn[0], 'template', templateDescription, tempFilePath, _mrt_version, manifest,
+                                                                payloadEncoding=payloadEncoding, payloadType=payloadType)
+            self.fileCatalog.removeEntry(fileReturn[0])
             
             # Remove the temporary maya scene file.
             os.remove(tempFilePath)
             
-            # Now save the character template file.
-            mrtct_fObject_file = open(fileReturn[0], 'wb')
-            cPickle.dump(mrtct_fObject, mrtct_fObject_file, cPickle.HIGHEST_PROTOCOL)
-            mrtct_fObject_file.close()
-            del mrtct_fObject   # Remove the reference to file object.
-            
             # Load the new saved character template into the UI scroll list, if preferred.
-            ui_preferences_file = open(self.ui_preferences_path, 'rb')
-            ui_preferences = cPickle.load(ui_preferences_file)
-            ui_preferences_file.close()
+            ui_preferences = self.ui_preferences
             if ui_preferences['loadNewCharTemplatesToCurrentList']:
                 self.loadCharTemplatesForUI(fileReturn)
 
@@ -6062,27 +6257,14 @@ class MRT_UI(object):
         # If root joint name is passed-in
         if rootJoint:
             
-            # To collect valid control rig classes identified for the joint hierarchy.
-            control_klasses = []
-            
+            # The control rig classes are looked up from the registry built when "mrt_controlRig" was imported.
+            controlClassRegistry = mrt_controlRig.controlClassRegistry
+
             if customHierarchyTreeListString:
                 
-                # Get all control rig classes under the base class with class attribute
-                # "customHierarchy" set to string value (default base value is set to None).
-                customClasses = [cls for cls in getattr(mrt_controlRig, 'BaseJointControl').__subclasses__()
-                                                    if eval('mrt_controlRig.%s.customHierarchy' % cls.__name__) != None]
-                customClasses.sort()
-                
-                # Now find the class(es) that matches the input "customHierarchyTreeListString" string value.
-                for cls in customClasses:
-
-                    klass = mfunc.findLastSubClassForSuperClass(cls)
-
-                    klassName = klass.__name__
-
-                    h_string = eval('mrt_controlRig.%s.customHierarchy' % klassName)
-                    if mfunc.cmpCustomHierarchyStructureStrings(h_string, customHierarchyTreeListString):
-                        control_klasses.append(klassName)
+                # Find the control rig class(es) with a "customHierarchy" string value which matches the
+                # input "customHierarchyTreeListString" string value.
+                control_klasses = controlClassRegistry.returnCustomClassNames(customHierarchyTreeListString)
                 
                 # If multiple control rig classes are found for the custom joint hierarchy,
                 if len(control_klasses):
@@ -6111,47 +6293,34 @@ class MRT_UI(object):
                 moduleType = cmds.getAttr(rootJoint+'.inheritedNodeType')
                 numNodes = cmds.getAttr(rootJoint+'.numNodes')
                 
-                if moduleType != 'JointNode':
-                    className = '%sControl'%(moduleType.partition('Node')[0])
-                if moduleType == 'JointNode' and numNodes < 4:
-                    className = 'JointControl'
-                if moduleType == 'JointNode' and numNodes > 3:
-                    className = 'JointChainControl'
+                className = controlClassRegistry.returnClassNameForModuleType(moduleType, numNodes)
                 
                 # If class name has subclass(es) that overrides it.
-                subClasses = [cls for cls in eval('mrt_controlRig.%s' % (className)).__subclasses__()]
+                control_klasses = controlClassRegistry.returnSubClassNames(className)
 
-                if subClasses:
-                    for cls in subClasses:
-                        klass = mfunc.findLastSubClassForSuperClass(cls)
-                        control_klasses.append(klass.__name__)
+                # If multiple control rig classes are found for the joint hierarchy,
+                if len(control_klasses):
+                    control_klasses.sort()
                     
-                    # If multiple control rig classes are found for the joint hierarchy,
-                    if len(control_klasses):
-                        control_klasses.sort()
-                        
-                        # Use the first control rig class from the list.
-                        className = control_klasses[0]
-                        
-                        if len(control_klasses) > 1:
-                            print '## MRT message: ' \
-                                  'Multiple user control rigging classes (%s) found for selected joint hierarchy. ' \
-                                  '##\n## Using \"%s\" control class for rigging options. ##' \
-                                                  % (', '.join(control_klasses), (className))
-                        else:
-                            print '## MRT message: Custom user control rigging class found for selected joint hierarchy. ' \
-                                  '##\n## Using \"%s\" control class for rigging options. ##' % (className)
+                    # Use the first control rig class from the list.
+                    className = control_klasses[0]
+                    
+                    if len(control_klasses) > 1:
+                        print '## MRT message: ' \
+                              'Multiple user control rigging classes (%s) found for selected joint hierarchy. ' \
+                              '##\n## Using \"%s\" control class for rigging options. ##' \
+                                              % (', '.join(control_klasses), (className))
+                    else:
+                        print '## MRT message: Custom user control rigging class found for selected joint hierarchy. ' \
+                              '##\n## Using \"%s\" control class for rigging options. ##' % (className)
             
             # Now store the attributes for control rigging for the selected joint hierarchy.
             # Store the control rig class name.
             self.controlRiggingAttributes['__klass__'] = '%s' % (className)
             
-            # Get the control rig definitions that can be applied to the selected joint hierarchy.
-            funcList = eval('[item for item in dir(mrt_controlRig.%s) if not re.search(\'__\', item)]' % (className))
-            funcNameList = eval('[item.partition(\'apply\')[2].replace(\'_\', \' \') for item in dir(mrt_controlRig.%s) \
-                                                                        if re.search(\'^apply[A-Z]\', item)]' % (className))
-            # Store the control rig definitions under the attributes.
-            for (funcName, func) in zip(funcNameList, funcList):
+            # Get the control rig definitions that can be applied to the selected joint hierarchy, and
+            # store them under the attributes.
+            for (funcName, func) in controlClassRegistry.returnRigMethods(className):
                 self.controlRiggingAttributes[funcName] = func
             
             # Store the root joint for the selected joint hierarchy.
@@ -6163,9 +6332,8 @@ class MRT_UI(object):
             appendFuncList = [item for item in self.controlRiggingAttributes if item.find('__') == -1]
             
             # Get the list of control rig defitions currently applied to the selected joint hierarchy.
-            atRigList = cmds.getAttr(rootJoint+'.rigLayers')
-            if atRigList != 'None':
-                atRigList = atRigList.split(',')
+            atRigList = mchar.returnCharacterMetadata().returnRigLayers(rootJoint)
+            if atRigList:
                 atRigList = [item.replace('_', ' ') for item in atRigList]
                 
                 # Filter the control rig definitions not currently applied.
@@ -6221,48 +6389,35 @@ class MRT_UI(object):
         # Get the root joint name for the joint hierarchy.
         hierarchyRoot = self.controlRiggingAttributes['__rootJoint__']
         
-        # Get the control rig(s) currently applied to the joint hierarchy.
-        rigLayers = cmds.getAttr(hierarchyRoot+'.rigLayers')
-        if rigLayers != 'None':
-            rigLayers = rigLayers.split(',')
-            for layer in rigLayers:
-            
-                # If the control rig definition is already applied.
-                if selectFunc == layer:
-                    Error('MRT: The control rig is already attached. Skipping.')
-                    return
+        # Get the control rig definition to be applied.
+        controlRigApplyFunc = self.controlRiggingAttributes[selectFunc]
+        
+        # Get the name of the control rig definition suffix name.
+        ctrlRigLayer = controlRigApplyFunc.partition('apply')[2]
+        
+        # If the control rig definition is already applied to the joint hierarchy.
+        if mchar.returnCharacterMetadata().hasRigLayer(hierarchyRoot, ctrlRigLayer):
+            Error('MRT: The control rig is already attached. Skipping.')
+            return
         
         # Get the control rig class for the joint hierarchy.
         controlClass = self.controlRiggingAttributes['__klass__']
         
         # Get the character name.
         characterName = self.getMRTcharacter()[0]
-
-        # Get the control rig definition to be applied.
-        controlRigApplyFunc = self.controlRiggingAttributes[selectFunc]
-        
-        # Get the name of the control rig definition suffix name.
-        ctrlRigLayer = controlRigApplyFunc.partition('apply')[2]
         
         # Get the instance for the control rig class.
-        controlRigInst = eval('mrt_controlRig.%s(characterName, hierarchyRoot, ctrlRigLayer)' % controlClass)
+        controlRigInst = mrt_controlRig.controlClassRegistry.returnClass(controlClass)(characterName, hierarchyRoot,
+                                                                                                        ctrlRigLayer)
         
         # Apply the control rig definition to the selected joint hierarchy.
-        eval('controlRigInst.%s()' % controlRigApplyFunc)
+        getattr(controlRigInst, controlRigApplyFunc)()
         
         # Remove the instance reference for gc collection.
         del controlRigInst
         
-        # Add the new control rig definition to the "rigLayers" attribute
-        # on the root joint for the selected joint hierarchy.
-        if isinstance(rigLayers, list):
-            rigLayers.append(controlRigApplyFunc.split('apply')[1])
-            rigLayers = ','.join(rigLayers)
-            cmds.setAttr(hierarchyRoot+'.rigLayers', lock=False)
-            cmds.setAttr(hierarchyRoot+'.rigLayers', rigLayers, type='string', lock=True)
-        else:
-            cmds.setAttr(hierarchyRoot+'.rigLayers', lock=False)
-            cmds.setAttr(hierarchyRoot+'.rigLayers', controlRigApplyFunc.split('apply')[1], type='string', lock=True)
+        # Add the new control rig definition to the rig layers on the root joint for the selected joint hierarchy.
+        mchar.returnCharacterMetadata().addRigLayer(hierarchyRoot, ctrlRigLayer)
         
         # Update the UI.
         self.displayAttachedControlRigs(hierarchyRoot)
@@ -6292,17 +6447,8 @@ class MRT_UI(object):
         characterName = self.getMRTcharacter()[0]
         userSpecName = hierarchyRoot.partition('_root_node_joint')[0]
 
-        # Change the rig layer attribute on root joint for the character hierarchy
-        rigLayers = cmds.getAttr(hierarchyRoot+'.rigLayers')
-        rigLayers = rigLayers.split(',')
-        index = rigLayers.index(ctrlRigLayer)
-        rigLayers.pop(index)
-        if len(rigLayers):
-            cmds.setAttr(hierarchyRoot+'.rigLayers', lock=False)
-            cmds.setAttr(hierarchyRoot+'.rigLayers', ','.join(rigLayers), type='string', lock=True)
-        else:
-            cmds.setAttr(hierarchyRoot+'.rigLayers', lock=False)
-            cmds.setAttr(hierarchyRoot+'.rigLayers', 'None', type='string', lock=True)
+        # Remove the rig layer from the root joint for the character hierarchy.
+        mchar.returnCharacterMetadata().removeRigLayer(hierarchyRoot, ctrlRigLayer)
         cmds.currentTime(0)
 
         # Reset all controls.
@@ -6333,8 +6479,7 @@ class MRT_UI(object):
                             cmds.setAttr(node+'.'+attr, 1)
 
         # Get all character joints.
-        allJoints = cmds.getAttr('|%s.skinJointList' % characterName)
-        allJoints = allJoints.split(',')
+        allJoints = mchar.returnCharacterMetadata().returnSkinJoints(characterName)
 
         # Force update on character joint attributes.
         for joint in allJoints:
@@ -6445,21 +6590,20 @@ class MRT_UI(object):
     def displayAttachedControlRigs(self, rootJoint):
         '''
         Displays the attached/applied control rig(s) on a character joint hierarchy under "Control rigging".
-        Uses the "rigLayers" attribute on the root joint of the character hierarchy.
+        Uses the rig layers on the root joint of the character hierarchy (see mrt_characterMetadata).
         '''
         # Clear current attached control rig list.
         cmds.textScrollList(self.uiVars['c_rig_attachedRigs_txScList'], edit=True, height=32, removeAll=True)
 
-        # Get the "rigLayers" attribute from the root joint of the character hierarchy. This contains a string
+        # Get the rig layers from the root joint of the character hierarchy. This contains a
         # list of control rigs(s) currently applied to the character hierarchy.
         if rootJoint:
-            atRigList = cmds.getAttr(rootJoint+'.rigLayers')
+            atRigList = mchar.returnCharacterMetadata().returnRigLayers(rootJoint)
 
             # If attached control rig(s) are found.
-            if atRigList != 'None':
+            if atRigList:
 
                 # Set the height of the attached control rig scroll list based on the number of items.
-                atRigList = atRigList.split(',')
                 scrollHeight = len(atRigList) * 20
                 if scrollHeight > 100:
                     scrollHeight = 100
@@ -6475,7 +6619,7 @@ class MRT_UI(object):
                 cmds.button(self.uiVars['c_rig_removeRigButton'], edit=True, enable=True)
 
             # If no attached control rig is found.
-            if atRigList == 'None':
+            else:
                 cmds.textScrollList(self.uiVars['c_rig_attachedRigs_txScList'], edit=True, enable=True, 
                          height=32, append=['              < No rig(s) attached to the selected character hierarchy >'],
                                                                                                 font='obliqueLabelFont')
@@ -6493,23 +6637,17 @@ class MRT_UI(object):
         '''
         Checks if a selected object (passed-in) is an MRT character joint.
         '''
-        matchObjects = [re.compile('^\w+_node_\d+_joint$'),
-                        re.compile('^\w+_root_node_joint$'),
-                        re.compile('^\w+_end_node_joint$')]
+        # Check if the object matches an MRT character joint name (see mrt_names).
+        parsedName = mnames.parseName(selection)
 
-        for i, matchObject in enumerate(matchObjects):
+        if parsedName and parsedName.nodeRole in mnames.CHARACTER_JOINT_ROLES:
 
-            # Check if the object matches an MRT character joint name.
-            matchResult = matchObject.match(selection)
+            # Check if it's created by MRT.
+            if cmds.attributeQuery('mrtJoint', node=selection, exists=True):
 
-            if matchResult:
-                
-                # Check if it's created by MRT.
-                if cmds.attributeQuery('mrtJoint', node=selection, exists=True):
-                    
-                    # If valid, return true with the index+1 of the matchObjects index.
-                    # This can be used to identify the joint name type.
-                    return True, i+1
+                # If valid, return true with the joint name type (1 for "node", 2 for "root_node",
+                # 3 for "end_node" joint).
+                return True, mnames.CHARACTER_JOINT_ROLES[parsedName.nodeRole]
 
         # Invalid MRT character joint.
         return False, 0
@@ -6537,12 +6675,13 @@ class MRT_UI(object):
                 if char_joint_state:
 
                     rootJoint = mfunc.returnRootForCharacterHierarchy(selection)
-                    rootJointAllChildren = cmds.listRelatives(rootJoint, allDescendents=True, type='joint') or []
+                    # The joint hierarchy from the root joint is walked once, and cached until the DAG is changed.
+                    rootJointAllChildren = mreg.returnHierarchySnapshot(rootJoint).joints
 
                     # Check for additional "root_node_transform" joint children. This might exist
                     # in a custom character joint hierarchy, created from module with hierarchical child module(s).
                     children_roots = [item for item in rootJointAllChildren if \
-                                      re.match('^\w+_root_node_joint$', item)]
+                                      getattr(mnames.parseName(item), 'nodeRole', None) == 'root_node_joint']
                     if children_roots:
 
                         # Get the joint hierarchy data from the main root joint for the selected character hierarchy.
@@ -0,0 +1,76 @@
+# *************************************************************************************************************
+#
+#    mrt_autoCollections.py - Source for the store for auto module collection files, which are saved by MRT
+#                             while creating a character from scene modules (and used to revert the character
+#                             back to its scene modules). It doesn't depend on maya.
+#
+#    An auto collection file is stored by the hash for its scene content, as "character__<hash>.mrtmc", so
+#    characters created from the same scene modules use a single file. The store is limited by the total
+#    file size and the number of files, and the least recently used files are removed over the limits,
+#    except the files being used by the characters in the current scene (see mrt_fileStore).
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+__moduleName__ = 'mrt_autoCollections'
+
+import os, re
+
+import mrt_fileFormat as mfile
+import mrt_fileStore as mstore
+
+# Default limits for the store, total size in MB and the number of files.
+DEFAULT_MAX_SIZE_MB = 1024
+DEFAULT_MAX_COUNT = 100
+
+
+class MRTAutoCollectionStore(mstore.MRTFileStore):
+    '''
+    Store for auto module collection files in the directory, "storePath". The file id for an auto collection
+    file is stored as the "collectionFileID" attribute on the character main group.
+    '''
+    # Matches an auto collection file name, with its file id. Older files were saved with a random numerical id.
+    fileNameRe = re.compile(r'^character__(\w+)\.mrtmc$')
+
+    def __init__(self, storePath, maxSizeMB=DEFAULT_MAX_SIZE_MB, maxCount=DEFAULT_MAX_COUNT):
+
+        mstore.MRTFileStore.__init__(self, storePath, maxSizeMB, maxCount)
+
+
+    def returnFilePath(self, fileId):
+        '''
+        Returns the path for an auto collection file with a given file id.
+        '''
+        return '%s/character__%s.mrtmc' % (self.storePath, fileId)
+
+
+    def returnNewFilePath(self):
+        '''
+        Returns a temporary path for saving a new auto collection file, to be added with addFile().
+        '''
+        return '%s/character__%s.new.mrtmc' % (self.storePath, os.getpid())
+
+
+    def hasFile(self, fileId):
+        '''
+        Checks if an auto collection file exists for a given file id.
+        '''
+        return os.path.exists(self.returnFilePath(fileId))
+
+
+    def addFile(self, newFilePath):
+        '''
+        Adds a new auto collection file saved at "newFilePath" to the store, and returns its file id. If a
+        file with the same scene content exists in the store, it's used instead and the new file is removed.
+        '''
+        fileId = mfile.returnPayloadContentHash(newFilePath)
+        filePath = self.returnFilePath(fileId)
+
+        if os.path.exists(filePath):
+            os.remove(newFilePath)
+            self.touchFile(fileId)
+        else:
+            mfile.replaceFile(newFilePath, filePath)
+
+        return fileId
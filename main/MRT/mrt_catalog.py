@@ -0,0 +1,318 @@
+# *************************************************************************************************************
+#
+#    mrt_catalog.py - Source for the on-disk catalog of module collection and character template files
+#                     loaded in the MRT UI. It doesn't depend on maya.
+#
+#    The catalog stores the description, manifest and validity for each file, keyed by its path, and
+#    is checked against the file modification time and size. So, a file is only read again if it's new
+#    or it has changed since it was last cataloged, which is useful for file libraries on slow (network)
+#    file systems.
+#
+#    Files can also be cataloged on a pool of worker threads with MRTCatalogScanner, for loading a directory
+#    with a large number of files without blocking the caller (the maya UI).
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+__moduleName__ = 'mrt_catalog'
+
+import os, threading
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+import mrt_fileFormat as mfile
+
+# Version for the catalog data. A catalog file saved with a different version is discarded.
+MRT_CATALOG_VERSION = 3
+
+# Number of worker threads for scanning files. Scanning is limited by file I/O, not by the interpreter.
+SCAN_THREAD_COUNT = 8
+
+
+class MRTFileCatalog(object):
+    '''
+    Catalog for module collection / character template files, saved as a pickled dict at "catalogPath".
+
+    Each entry in the catalog is a dict with the following keys:
+    'mtime' -> File modification time when the file was cataloged.
+    'size' -> File size when the file was cataloged.
+    'fileType' -> "collection" or "template".
+    'description' -> Module collection / character template description.
+    'manifest' -> Manifest from the file header.
+    'payloadType' -> Maya scene type for the payload, "mayaAscii" or "mayaBinary".
+    'payloadChecksum' -> sha1 hex digest for the (decoded) payload, from the file header.
+    'valid' -> False if the file couldn't be read as a module collection / character template file.
+    '''
+    def __init__(self, catalogPath):
+
+        self.catalogPath = catalogPath
+
+        # Catalog entries, by normalized file path.
+        self.entries = {}
+
+        # If the catalog has been modified since it was loaded / saved.
+        self.modified = False
+
+        try:
+            catalogFile = open(self.catalogPath, 'rb')
+            try:
+                catalogData = pickle.load(catalogFile)
+            finally:
+                catalogFile.close()
+            if catalogData.get('version') == MRT_CATALOG_VERSION:
+                self.entries = catalogData['entries']
+        except Exception:
+            # The catalog is missing or unreadable, start with an empty catalog.
+            pass
+
+
+    def returnCachedEntry(self, filePath):
+        '''
+        Returns the catalog entry for a file without checking the file on disk, or None if the file
+        isn't cataloged.
+        '''
+        return self.entries.get(os.path.normpath(filePath))
+
+
+    def returnEntry(self, filePath):
+        '''
+        Returns the catalog entry for a file. The file is read if it's not cataloged, or if it has been
+        modified since it was cataloged. If the file doesn't exist, its entry is removed from the catalog
+        and None is returned.
+        '''
+        key = os.path.normpath(filePath)
+
+        try:
+            fileStat = os.stat(filePath)
+        except OSError:
+            self.removeEntry(filePath)
+            return None
+
+        entry = self.entries.get(key)
+
+        if entry is None or entry['mtime'] != fileStat.st_mtime or entry['size'] != fileStat.st_size:
+            entry = returnEntryFromFile(filePath, fileStat)
+            self.entries[key] = entry
+            self.modified = True
+
+        return entry
+
+
+    def updateEntry(self, filePath, entry):
+        '''
+        Adds or replaces the catalog entry for a file, with an entry returned by returnEntryFromFile().
+        '''
+        self.entries[os.path.normpath(filePath)] = entry
+        self.modified = True
+
+
+    def removeEntry(self, filePath):
+        '''
+        Removes the catalog entry for a file, if it exists.
+        '''
+        if self.entries.pop(os.path.normpath(filePath), None) is not None:
+            self.modified = True
+
+
+    def isEntryCurrent(self, filePath, fileStat):
+        '''
+        Checks if the catalog entry for a file matches its given os.stat() result.
+        '''
+        entry = self.entries.get(os.path.normpath(filePath))
+
+        return entry is not None and entry['mtime'] == fileStat.st_mtime and entry['size'] == fileStat.st_size
+
+
+    def save(self):
+        '''
+        Saves the catalog to disk, if it has been modified. The catalog file is written to a temporary
+        file first, and then renamed.
+        '''
+        if not self.modified:
+            return
+
+        tempFilePath = '%s.%s.tmp' % (self.catalogPath, os.getpid())
+        tempFile = open(tempFilePath, 'wb')
+        try:
+            pickle.dump({'version': MRT_CATALOG_VERSION, 'entries': self.entries}, tempFile, pickle.HIGHEST_PROTOCOL)
+        finally:
+            tempFile.close()
+
+        mfile.replaceFile(tempFilePath, self.catalogPath)
+
+        self.modified = False
+
+
+class MRTCatalogScanner(object):
+    '''
+    Catalogs a list of module collection / character template files on a pool of worker threads. Only a
+    file which is new or has changed since it was cataloged is read, as with MRTFileCatalog.returnEntry().
+
+    Results are passed to "resultsCallback(results, finished)" on the caller's (main) thread. Whenever new
+    results are available, a call for it is requested with "deferFunction" (for maya, maya.utils.executeDeferred),
+    and results available by then are passed together, as a list of (file path, catalog entry) tuples. The
+    entry is None for a missing file. The catalog is updated before the callback. "finished" is True for the
+    last call, after all the files are scanned or the scan is cancelled.
+    '''
+    def __init__(self, catalog, filePaths, resultsCallback, deferFunction, threadCount=SCAN_THREAD_COUNT):
+
+        self.catalog = catalog
+        self.resultsCallback = resultsCallback
+        self.deferFunction = deferFunction
+
+        # Number of files to be scanned.
+        self.fileCount = len(filePaths)
+
+        self._fileQueue = queue.Queue()
+        for filePath in filePaths:
+            self._fileQueue.put(filePath)
+
+        self._resultQueue = queue.Queue()
+        self._cancelEvent = threading.Event()
+        self._lock = threading.Lock()
+        self._callbackPending = False
+        self._finished = False
+
+        self._threads = []
+        for i in range(max(1, min(threadCount, self.fileCount))):
+            thread = threading.Thread(target=self._scanFiles)
+            thread.daemon = True
+            self._threads.append(thread)
+        self._activeThreadCount = len(self._threads)
+
+
+    def start(self):
+        '''
+        Starts the worker threads.
+        '''
+        for thread in self._threads:
+            thread.start()
+
+
+    def cancel(self):
+        '''
+        Cancels the scan. Files being read are completed, and the remaining files are skipped.
+        '''
+        self._cancelEvent.set()
+
+
+    def isCancelled(self):
+        '''
+        Checks if the scan has been cancelled.
+        '''
+        return self._cancelEvent.is_set()
+
+
+    def _scanFiles(self):
+        '''
+        Runs on a worker thread, and catalogs files from the queue until it's empty or the scan is cancelled.
+        '''
+        while not self._cancelEvent.is_set():
+            try:
+                filePath = self._fileQueue.get_nowait()
+            except queue.Empty:
+                break
+
+            try:
+                fileStat = os.stat(filePath)
+            except OSError:
+                entry = None
+            else:
+                # The catalog is only read here, it's updated on the main thread.
+                if self.catalog.isEntryCurrent(filePath, fileStat):
+                    entry = self.catalog.returnCachedEntry(filePath)
+                else:
+                    entry = returnEntryFromFile(filePath, fileStat)
+
+            self._resultQueue.put((filePath, entry))
+            self._requestCallback()
+
+        with self._lock:
+            self._activeThreadCount -= 1
+
+        # Request a callback after the thread is done, for the final call.
+        self._requestCallback()
+
+
+    def _requestCallback(self):
+        '''
+        Requests a callback on the main thread, if one isn't already pending.
+        '''
+        with self._lock:
+            if self._callbackPending:
+                return
+            self._callbackPending = True
+
+        self.deferFunction(self._runCallback)
+
+
+    def _runCallback(self):
+        '''
+        Runs on the main thread. Collects the available results, updates the catalog and passes them
+        to the results callback.
+        '''
+        with self._lock:
+            self._callbackPending = False
+            finished = self._activeThreadCount == 0
+
+        if self._finished:
+            return
+
+        results = []
+        while True:
+            try:
+                results.append(self._resultQueue.get_nowait())
+            except queue.Empty:
+                break
+
+        for filePath, entry in results:
+            if entry is None:
+                self.catalog.removeEntry(filePath)
+            elif self.catalog.returnCachedEntry(filePath) is not entry:
+                self.catalog.updateEntry(filePath, entry)
+
+        # All the results are collected if the threads were done before the queue was read.
+        self._finished = finished
+
+        self.resultsCallback(results, finished)
+
+
+def returnEntryFromFile(filePath, fileStat=None):
+    '''
+    Reads the header for a module collection / character template file and returns a catalog entry for it.
+    It only depends on the file, so it can be called from a worker thread.
+    '''
+    if fileStat is None:
+        fileStat = os.stat(filePath)
+
+    entry = {'mtime': fileStat.st_mtime,
+             'size': fileStat.st_size,
+             'fileType': mfile.returnFileTypeFromPath(filePath),
+             'description': '',
+             'manifest': {'modules': [], 'joints': []},
+             'payloadType': 'mayaAscii',
+             'payloadChecksum': None,
+             'valid': False}
+
+    try:
+        header = mfile.readFileHeader(filePath)
+    except Exception:
+        # Not a valid (or readable) module collection / character template file.
+        return entry
+
+    entry['description'] = header['description']
+    entry['manifest'] = header['manifest']
+    entry['payloadType'] = header['payloadType']
+    entry['payloadChecksum'] = header['payloadChecksum']
+    entry['valid'] = True
+
+    return entry
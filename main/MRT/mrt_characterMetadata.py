@@ -0,0 +1,398 @@
+# *************************************************************************************************************
+#
+#    mrt_characterMetadata.py - Source for the character metadata, for the skin joints in a character and the
+#                               control rigs (rig layers) attached to its joint hierarchies.
+#
+#    The skin joints are stored on the character main group as a multi message attribute ("skinJoints"),
+#    connected from each skin joint, and the rig layers are stored on the root joint for a joint hierarchy
+#    as a multi string attribute ("rigLayerList"). The comma-joined string attributes used before ("skinJointList"
+#    and "rigLayers") are still written, for the character template files and for older versions of MRT.
+#
+#    The existing characters are migrated after a scene is opened or imported: the structured attributes are added
+#    from the string attributes, in an undo chunk. The metadata is never written while it's read, so a character
+#    which isn't migrated (for example, if it's referenced, or if its migration is undone) is read from the
+#    string attributes instead.
+#
+#    The metadata is cached in memory, with sets for the skin joints for O(1) membership, and with the skin
+#    joints for each joint hierarchy. The cache is cleared by maya API callbacks, when a scene is opened,
+#    created or imported, a reference is loaded / unloaded, a node is renamed or a joint is removed, and on
+#    undo / redo.
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+__moduleName__ = 'mrt_characterMetadata'
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om2
+
+import mrt_moduleRegistry as mreg
+
+# Attribute on the character main group, connected from the message attribute for each skin joint.
+SKIN_JOINTS_ATTR = 'skinJoints'
+
+# Multi string attribute on the root joint for a character joint hierarchy, for the attached rig layers.
+RIG_LAYERS_ATTR = 'rigLayerList'
+
+# Scene messages after which the cache is cleared.
+_sceneMessages = ('kAfterNew', 'kAfterOpen', 'kAfterImport', 'kAfterCreateReference', 'kAfterLoadReference',
+                  'kAfterUnloadReference', 'kAfterRemoveReference', 'kAfterImportReference')
+
+# Events after which the cache is cleared.
+_events = ('NameChanged', 'Undo', 'Redo')
+
+# Scene messages after which the characters in the scene are migrated.
+_migrationMessages = ('kAfterOpen', 'kAfterImport')
+
+# The character metadata for the current maya session, see returnCharacterMetadata().
+_metadata = None
+
+
+class MRTCharacterMetadata(object):
+    '''
+    Character metadata for the characters in the current scene, read from the character attributes and cached.
+    '''
+    def __init__(self):
+
+        # Skin joints (in order) and the set of skin joints, by character name.
+        self._skinJoints = {}
+        self._skinJointSets = {}
+
+        # Sorted skin joints in a joint hierarchy (including its root joint), by (character name, root joint).
+        self._hierarchySkinJoints = {}
+
+        # Rig layers, by root joint.
+        self._rigLayers = {}
+
+        self._callbackIds = []
+
+
+    def addCallbacks(self):
+        '''
+        Adds the maya API callbacks for clearing the cache.
+        '''
+        if self._callbackIds:
+            return
+
+        for message in _sceneMessages:
+            self._callbackIds.append(om2.MSceneMessage.addCallback(getattr(om2.MSceneMessage, message),
+                                                                                            self._clearCallback))
+        for event in _events:
+            self._callbackIds.append(om2.MEventMessage.addEventCallback(event, self._clearCallback))
+
+        self._callbackIds.append(om2.MDGMessage.addNodeRemovedCallback(self._clearCallback, 'joint'))
+
+        for message in _migrationMessages:
+            self._callbackIds.append(om2.MSceneMessage.addCallback(getattr(om2.MSceneMessage, message),
+                                                                                            self._migrateCallback))
+
+
+    def removeCallbacks(self):
+        '''
+        Removes the maya API callbacks added by addCallbacks().
+        '''
+        if self._callbackIds:
+            om2.MMessage.removeCallbacks(self._callbackIds)
+        self._callbackIds = []
+
+
+    def clear(self):
+        '''
+        Clears the cache, so that the metadata is read again from the character attributes.
+        '''
+        self._skinJoints = {}
+        self._skinJointSets = {}
+        self._hierarchySkinJoints = {}
+        self._rigLayers = {}
+
+
+    def migrateScene(self):
+        '''
+        Adds the structured attributes for the characters in the scene which haven't been migrated, from their
+        string attributes, in a single undo chunk. A character which can't be modified (for example, if it's
+        referenced) isn't migrated.
+        '''
+        mainGrps = [mainGrp for mainGrp in cmds.ls('*.skinJointList', recursive=True, objectsOnly=True, long=True) \
+                                    if not cmds.attributeQuery(SKIN_JOINTS_ATTR, node=mainGrp, exists=True)]
+        rootJoints = [rootJoint for rootJoint in cmds.ls('*.rigLayers', recursive=True, objectsOnly=True, long=True) \
+                                    if not cmds.attributeQuery(RIG_LAYERS_ATTR, node=rootJoint, exists=True)]
+        if not mainGrps and not rootJoints:
+            return
+
+        cmds.undoInfo(openChunk=True)
+        try:
+            for mainGrp in mainGrps:
+                if cmds.referenceQuery(mainGrp, isNodeReferenced=True):
+                    continue
+                try:
+                    self._connectSkinJoints(mainGrp, self._readSkinJointList(mainGrp))
+                except RuntimeError:
+                    pass
+
+            for rootJoint in rootJoints:
+                if cmds.referenceQuery(rootJoint, isNodeReferenced=True):
+                    continue
+                try:
+                    self._migrateRigLayers(rootJoint, self._readRigLayerString(rootJoint))
+                except RuntimeError:
+                    pass
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+        self.clear()
+
+
+    # ............................................... SKIN JOINTS ..............................................
+
+
+    def setSkinJoints(self, characterName, joints):
+        '''
+        Stores the skin joints for a new character, on its main group.
+        '''
+        mainGrp = '|'+characterName
+
+        cmds.setAttr(mainGrp+'.skinJointList', lock=False)
+        cmds.setAttr(mainGrp+'.skinJointList', ','.join(joints), type='string', lock=True)
+
+        self._connectSkinJoints(mainGrp, joints)
+
+        self._storeSkinJoints(characterName, list(joints))
+
+
+    def returnSkinJoints(self, characterName):
+        '''
+        Returns a list of the skin joints for a character.
+        '''
+        if characterName not in self._skinJoints:
+            self._storeSkinJoints(characterName, self._readSkinJoints('|'+characterName))
+
+        return list(self._skinJoints[characterName])
+
+
+    def isSkinJoint(self, characterName, joint):
+        '''
+        Checks if a joint is a skin joint for a character.
+        '''
+        if characterName not in self._skinJointSets:
+            self.returnSkinJoints(characterName)
+
+        return joint in self._skinJointSets[characterName]
+
+
+    def returnHierarchySkinJoints(self, characterName, rootJoint):
+        '''
+        Returns a sorted list of the skin joints for a character in a joint hierarchy, including its root joint.
+        The joints below the root joint are returned from its hierarchy snapshot (see mrt_moduleRegistry).
+        '''
+        key = (characterName, rootJoint)
+
+        if key not in self._hierarchySkinJoints:
+            if characterName not in self._skinJointSets:
+                self.returnSkinJoints(characterName)
+            skinJointSet = self._skinJointSets[characterName]
+
+            hierarchyJoints = set([joint for joint in mreg.returnHierarchySnapshot(rootJoint).joints \
+                                                                                    if joint in skinJointSet])
+            hierarchyJoints.add(rootJoint)
+            self._hierarchySkinJoints[key] = sorted(hierarchyJoints)
+
+        return list(self._hierarchySkinJoints[key])
+
+
+    def _storeSkinJoints(self, characterName, joints):
+        '''
+        Stores the skin joints for a character in the cache.
+        '''
+        self._skinJoints[characterName] = joints
+        self._skinJointSets[characterName] = set(joints)
+
+        for key in [key for key in self._hierarchySkinJoints if key[0] == characterName]:
+            del self._hierarchySkinJoints[key]
+
+
+    def _readSkinJoints(self, mainGrp):
+        '''
+        Returns a list of the skin joints from the character main group, from its connections. If the character
+        hasn't been migrated, they're read from its string attribute.
+        '''
+        if not cmds.attributeQuery(SKIN_JOINTS_ATTR, node=mainGrp, exists=True):
+            return self._readSkinJointList(mainGrp)
+
+        selectionList = om2.MSelectionList()
+        selectionList.add(mainGrp+'.'+SKIN_JOINTS_ATTR)
+        skinJointsPlug = selectionList.getPlug(0)
+
+        joints = []
+        for i in range(skinJointsPlug.numElements()):
+            sourcePlug = skinJointsPlug.elementByPhysicalIndex(i).source()
+            if not sourcePlug.isNull:
+                joints.append(om2.MFnDagNode(sourcePlug.node()).partialPathName())
+
+        # Read the string attribute for a character which was only partly migrated.
+        if not joints:
+            joints = self._readSkinJointList(mainGrp)
+
+        return joints
+
+
+    def _readSkinJointList(self, mainGrp):
+        '''
+        Returns a list of the skin joints from the string attribute on the character main group.
+        '''
+        return [joint for joint in (cmds.getAttr(mainGrp+'.skinJointList') or '').split(',') if joint]
+
+
+    def _connectSkinJoints(self, mainGrp, joints):
+        '''
+        Adds the skin joints attribute on the character main group (if needed), and connects the skin joints to it.
+        '''
+        if not cmds.attributeQuery(SKIN_JOINTS_ATTR, node=mainGrp, exists=True):
+            cmds.addAttr(mainGrp, attributeType='message', longName=SKIN_JOINTS_ATTR, multi=True, indexMatters=False)
+
+        for joint in joints:
+            if cmds.objExists(joint):
+                cmds.connectAttr(joint+'.message', mainGrp+'.'+SKIN_JOINTS_ATTR, nextAvailable=True, force=True)
+
+
+    # ............................................... RIG LAYERS ...............................................
+
+
+    def initRigLayers(self, rootJoint):
+        '''
+        Adds the rig layer attributes (with no rig layers) on the root joint for a new character joint hierarchy.
+        '''
+        cmds.addAttr(rootJoint, dataType='string', longName='rigLayers', keyable=False)
+        cmds.addAttr(rootJoint, dataType='string', longName=RIG_LAYERS_ATTR, multi=True, keyable=False)
+
+        self._writeRigLayers(rootJoint, [])
+
+
+    def returnRigLayers(self, rootJoint):
+        '''
+        Returns a list of the rig layers (names for the control rigs) attached to a character joint hierarchy,
+        by its root joint.
+        '''
+        if rootJoint not in self._rigLayers:
+            self._rigLayers[rootJoint] = self._readRigLayers(rootJoint)
+
+        return list(self._rigLayers[rootJoint])
+
+
+    def hasRigLayer(self, rootJoint, rigLayer):
+        '''
+        Checks if a rig layer is attached to a character joint hierarchy.
+        '''
+        return rigLayer in self.returnRigLayers(rootJoint)
+
+
+    def addRigLayer(self, rootJoint, rigLayer):
+        '''
+        Adds a rig layer attached to a character joint hierarchy.
+        '''
+        rigLayers = self.returnRigLayers(rootJoint)
+
+        if rigLayer not in rigLayers:
+            rigLayers.append(rigLayer)
+            self._writeRigLayers(rootJoint, rigLayers)
+
+
+    def removeRigLayer(self, rootJoint, rigLayer):
+        '''
+        Removes a rig layer detached from a character joint hierarchy.
+        '''
+        rigLayers = self.returnRigLayers(rootJoint)
+
+        if rigLayer in rigLayers:
+            rigLayers.remove(rigLayer)
+            self._writeRigLayers(rootJoint, rigLayers)
+
+
+    def _readRigLayers(self, rootJoint):
+        '''
+        Returns a list of the rig layers from the root joint attributes. If the root joint hasn't been migrated,
+        they're read from its string attribute.
+        '''
+        if not cmds.attributeQuery(RIG_LAYERS_ATTR, node=rootJoint, exists=True):
+            return self._readRigLayerString(rootJoint)
+
+        rigLayersAttr = rootJoint+'.'+RIG_LAYERS_ATTR
+        return [cmds.getAttr('%s[%s]' % (rigLayersAttr, index)) \
+                                    for index in (cmds.getAttr(rigLayersAttr, multiIndices=True) or [])]
+
+
+    def _readRigLayerString(self, rootJoint):
+        '''
+        Returns a list of the rig layers from the string attribute on the root joint ("None" for no rig layers).
+        '''
+        rigLayers = cmds.getAttr(rootJoint+'.rigLayers') or 'None'
+        return [layer for layer in rigLayers.split(',') if layer and layer != 'None']
+
+
+    def _migrateRigLayers(self, rootJoint, rigLayers):
+        '''
+        Adds the multi string attribute for the rig layers on a root joint, from its string attribute.
+        '''
+        cmds.addAttr(rootJoint, dataType='string', longName=RIG_LAYERS_ATTR, multi=True, keyable=False)
+
+        self._writeRigLayers(rootJoint, rigLayers)
+
+
+    def _writeRigLayers(self, rootJoint, rigLayers):
+        '''
+        Writes the rig layers to the root joint attributes, and to the cache.
+        '''
+        rigLayersAttr = rootJoint+'.'+RIG_LAYERS_ATTR
+
+        # The multi attribute may not exist for a root joint which couldn't be migrated.
+        if cmds.attributeQuery(RIG_LAYERS_ATTR, node=rootJoint, exists=True):
+            for index in cmds.getAttr(rigLayersAttr, multiIndices=True) or []:
+                cmds.removeMultiInstance('%s[%s]' % (rigLayersAttr, index), b=True)
+            for index, rigLayer in enumerate(rigLayers):
+                cmds.setAttr('%s[%s]' % (rigLayersAttr, index), rigLayer, type='string')
+
+        # The string attribute has "None" for no rig layers.
+        cmds.setAttr(rootJoint+'.rigLayers', lock=False)
+        cmds.setAttr(rootJoint+'.rigLayers', ','.join(rigLayers) or 'None', type='string', lock=True)
+
+        self._rigLayers[rootJoint] = list(rigLayers)
+
+
+    def _clearCallback(self, *args):
+        '''
+        Called by the maya API callbacks, to clear the cache.
+        '''
+        self.clear()
+
+
+    def _migrateCallback(self, *args):
+        '''
+        Called by the maya API callbacks after a scene is opened or imported, to migrate its characters.
+        '''
+        self.migrateScene()
+
+
+def returnCharacterMetadata():
+    '''
+    Returns the character metadata for the current maya session. It's created, with its callbacks, when it's
+    first used.
+    '''
+    global _metadata
+
+    if _metadata is None:
+        _metadata = MRTCharacterMetadata()
+        _metadata.addCallbacks()
+
+    return _metadata
+
+
+def removeCharacterMetadata():
+    '''
+    Removes the callbacks for the character metadata for the current maya session (for example, before this
+    module is reloaded).
+    '''
+    global _metadata
+
+    if _metadata is not None:
+        _metadata.removeCallbacks()
+        _metadata = None
@@ -19,6 +19,8 @@ import re, math, os, math
 import mrt_functions as mfunc
 # Import functions for creating objects.
 import mrt_objects as objects
+# Import the character metadata.
+import mrt_characterMetadata as mchar
 
 
 """
@@ -45,6 +47,90 @@ with an upper-case. For eg, to name a method to create an fk control rig, use th
 _maya_version = mfunc.returnMayaVersion()
 
 
+"""
+The control rig classes are looked up from a registry, "controlClassRegistry", which is built once when this module is
+imported, after all the control rig classes (including the user control classes) are defined. The registry is created at
+the end of the module (see mrt_functions.prep_MRTcontrolRig_source()).
+"""
+
+
+class MRTControlClassRegistry(object):
+
+    """Registry for the control rig classes derived from a base control class. The control rig classes for a custom
+    joint hierarchy are stored by their normalized "customHierarchy" string, and the subclasses overriding a control
+    rig class and its control rig methods are stored by the class name."""
+
+    def __init__(self, baseClass):
+
+        # Control rig classes, by class name.
+        self.classes = {}
+
+        # Sorted leaf class names for the classes overriding a control rig class, by class name.
+        self.subClassNames = {}
+
+        # List of (control rig name, method name) for the control rig methods for a class, by class name.
+        self.rigMethods = {}
+
+        # Sorted leaf class names for the control rig types with a custom hierarchy, by the normalized hierarchy string.
+        self.customClassNames = {}
+
+        # Collect all classes derived from the base class.
+        klasses = [baseClass]
+        for klass in klasses:
+            self.classes[klass.__name__] = klass
+            klasses.extend(klass.__subclasses__())
+
+            self.subClassNames[klass.__name__] = sorted([mfunc.findLastSubClassForSuperClass(cls).__name__ \
+                                                                                for cls in klass.__subclasses__()])
+
+            self.rigMethods[klass.__name__] = [(item.partition('apply')[2].replace('_', ' '), item) \
+                                                                for item in dir(klass) if re.search('^apply[A-Z]', item)]
+
+        # For a control rig type with a custom hierarchy (directly derived from the base class), use its leaf class.
+        for cls in baseClass.__subclasses__():
+            if cls.customHierarchy == None:
+                continue
+            klass = mfunc.findLastSubClassForSuperClass(cls)
+            if klass.customHierarchy == None:
+                continue
+            self.customClassNames.setdefault(mfunc.returnNormalizedHierarchyString(klass.customHierarchy),
+                                                                                        []).append(klass.__name__)
+
+        for klassNames in self.customClassNames.values():
+            klassNames.sort()
+
+
+    def returnClass(self, className):
+        """Returns a control rig class by its name."""
+        return self.classes[className]
+
+
+    def returnCustomClassNames(self, hierarchyString):
+        """Returns a sorted list of the class names for the control rig types which match a custom joint hierarchy,
+        with its hierarchy tree list string (see mrt_functions.returnHierarchyTreeListStringForCustomControlRigging())."""
+        return list(self.customClassNames.get(mfunc.returnNormalizedHierarchyString(hierarchyString), []))
+
+
+    def returnClassNameForModuleType(self, moduleType, numNodes):
+        """Returns the name for the control rig class for a joint hierarchy created from a single module, by the
+        module type and its number of nodes."""
+        if moduleType != 'JointNode':
+            return '%sControl' % (moduleType.partition('Node')[0])
+        if numNodes < 4:
+            return 'JointControl'
+        return 'JointChainControl'
+
+
+    def returnSubClassNames(self, className):
+        """Returns a sorted list of the leaf class names for the classes overriding a control rig class."""
+        return list(self.subClassNames.get(className, []))
+
+
+    def returnRigMethods(self, className):
+        """Returns a list of (control rig name, method name) for the control rig methods for a control rig class."""
+        return list(self.rigMethods[className])
+
+
 class BaseJointControl(object):       # <object> For DP inheritance search order, and to track using __subclasses__().
 
     """Base control class to contain common control rigging methods and will be used solely for inheritance and to
@@ -151,16 +237,8 @@ class BaseJointControl(object):       # <object> For DP inheritance search order
         # Get the colour index value of the control rig colour slider from modular rigging tools window.
         self.controlColour = cmds.colorIndexSliderGrp('__MRT_controlLayerColour_IndexSliderGrp', query=True, value=True) - 1
 
-        # Get a list of all joints in the "skinJointList" set.
-        allJoints = cmds.getAttr('|%s.skinJointList' % characterName).split(',')
-
-        # Find and sort the names of joints in the selected joint hierarchy from "allJoints".
-        self.selCharacterHierarchy = []
-        rootJointAllChildren = cmds.listRelatives(rootJoint, allDescendents=True, type='joint')
-        if rootJointAllChildren:
-            self.selCharacterHierarchy = list(set.intersection(set(allJoints), set(rootJointAllChildren)))
-        self.selCharacterHierarchy.append(rootJoint)
-        self.selCharacterHierarchy.sort()
+        # Get the sorted names of the character joints in the selected joint hierarchy (see mrt_characterMetadata).
+        self.selCharacterHierarchy = mchar.returnCharacterMetadata().returnHierarchySkinJoints(characterName, rootJoint)
 
         # List to store the driver joint layer set.
         self.driverJointLayerSet = []
@@ -227,16 +305,14 @@ class BaseJointControl(object):       # <object> For DP inheritance search order
 
         containers = []
 
-        # Get the list of control rigs applied to a joint hierarchy stored as a string value.
-        rigLayers = cmds.getAttr(rootJoint+'.rigLayers')
+        # Get the list of control rigs applied to a joint hierarchy.
+        rigLayers = mchar.returnCharacterMetadata().returnRigLayers(self.rootJoint)
 
         # Collect the container names and return them.
-        if rigLayers != 'None':
-            rigLayers = rigLayers.split(',')
-            for layer in rigLayers:
-                rigLayerName = ''.join([item.title() for item in layer.split('_')])
-                name = 'MRT_%s__%s_container' % (self.userSpecName, rigLayerName)
-                containers.append(name)
+        for layer in rigLayers:
+            rigLayerName = ''.join([item.title() for item in layer.split('_')])
+            name = 'MRT_%s__%s_container' % (self.userSpecName, rigLayerName)
+            containers.append(name)
 
         return containers
 
@@ -0,0 +1,190 @@
+# *************************************************************************************************************
+#
+#    mrt_convertLegacyFiles.py - Command line tool for converting a library of legacy module collection (.mrtmc)
+#                                and character template (.mrtct) files to the container format (see
+#                                mrt_fileFormat). It doesn't need maya or mayapy. Usage:
+#
+#        python mrt_convertLegacyFiles.py [--jobs N] [--report reportFile] [--keep-legacy] libraryDir ...
+#
+#    The library directories are searched recursively, and the legacy files are converted in place, in
+#    parallel with a process pool. Each converted file is first written next to its legacy file, and is
+#    verified to have the same maya scene data (see mrt_fileFormat.verifyConvertedFile()) before it's renamed
+#    over it. With --keep-legacy, the legacy file is kept with a ".legacy" extension.
+#
+#    The result for each file (with its size before and after) is appended to a report file (JSON, one line
+#    for each file) as soon as it's converted, and a summary is printed at the end. If the conversion is
+#    interrupted, it can be run again to resume: the files already converted are skipped (they're detected
+#    by their format), and the incomplete files left from the interrupted conversion are removed.
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+__moduleName__ = 'mrt_convertLegacyFiles'
+
+import os, sys, json, time, shutil, optparse, multiprocessing
+
+import mrt_fileFormat as mfile
+
+# File extensions for the module collection / character template files.
+FILE_EXTENSIONS = ('.mrtmc', '.mrtct')
+
+# Name suffix for a file being converted (and the temporary files written for it).
+CONVERT_SUFFIX = '.mrtconvert'
+
+# Default report file name, in the first library directory.
+REPORT_FILE_NAME = 'mrt_conversionReport.json'
+
+
+def returnLegacyFilePaths(libraryDirs):
+    '''
+    Returns a sorted list of the legacy module collection / character template files under the library
+    directories. The incomplete files left from an interrupted conversion are removed.
+    '''
+    filePaths = []
+
+    for libraryDir in libraryDirs:
+        for dirPath, dirNames, fileNames in os.walk(libraryDir):
+            for fileName in fileNames:
+                filePath = os.path.join(dirPath, fileName)
+                if CONVERT_SUFFIX in fileName:
+                    os.remove(filePath)
+                    continue
+                if os.path.splitext(fileName)[1].lower() not in FILE_EXTENSIONS:
+                    continue
+                if not mfile.isMRTContainerFile(filePath):
+                    filePaths.append(filePath)
+
+    return sorted(filePaths)
+
+
+def convertFile(filePath, keepLegacy=False):
+    '''
+    Converts a legacy file in place, and returns a result dict for the report. The converted file is
+    written and verified next to the legacy file before it replaces it. Runs in a worker process.
+    '''
+    result = {'file': filePath, 'status': 'converted', 'sizeBefore': None, 'sizeAfter': None, 'error': None,
+                                                                                                'time': None}
+    convertedFilePath = filePath+CONVERT_SUFFIX
+    start = time.time()
+
+    try:
+        result['sizeBefore'] = os.path.getsize(filePath)
+
+        mfile.convertLegacyFile(filePath, convertedFilePath)
+        mfile.verifyConvertedFile(filePath, convertedFilePath)
+
+        # The legacy file is copied (not renamed) to be kept, so that its path always has a complete file.
+        if keepLegacy:
+            shutil.copy2(filePath, filePath+'.legacy')
+        mfile.replaceFile(convertedFilePath, filePath)
+
+        result['sizeAfter'] = os.path.getsize(filePath)
+    except Exception:
+        result['status'] = 'failed'
+        result['error'] = '%s: %s' % (sys.exc_info()[0].__name__, sys.exc_info()[1])
+        if os.path.exists(convertedFilePath):
+            os.remove(convertedFilePath)
+
+    result['time'] = time.time() - start
+
+    return result
+
+
+def _convertFileForPool(args):
+    '''
+    Calls convertFile() with a tuple of arguments, for Pool.imap_unordered().
+    '''
+    return convertFile(*args)
+
+
+def returnReportResults(reportFilePath):
+    '''
+    Returns the results from a report file as a dict by file path, with the last result for each file.
+    '''
+    results = {}
+
+    if not os.path.exists(reportFilePath):
+        return results
+
+    reportFile = open(reportFilePath, 'r')
+    for line in reportFile:
+        # Skip a partially written line from an interrupted conversion.
+        try:
+            result = json.loads(line)
+        except ValueError:
+            continue
+        results[result['file']] = result
+    reportFile.close()
+
+    return results
+
+
+def printSummary(results):
+    '''
+    Prints the number of files converted / failed, with the total sizes before and after conversion.
+    '''
+    converted = [result for result in results.values() if result['status'] == 'converted']
+    failed = sorted([result for result in results.values() if result['status'] == 'failed'],
+                                                                                key=lambda result: result['file'])
+
+    sizeBefore = sum([result['sizeBefore'] for result in converted])
+    sizeAfter = sum([result['sizeAfter'] for result in converted])
+
+    print('%-12s %12s %16s %16s %8s' % ('status', 'files', 'before (KB)', 'after (KB)', 'ratio'))
+    print('%-12s %12s %16.1f %16.1f %8.3f' % ('converted', len(converted), sizeBefore / 1024.0, sizeAfter / 1024.0,
+                                                                    (float(sizeAfter) / sizeBefore) if sizeBefore else 0))
+    print('%-12s %12s' % ('failed', len(failed)))
+
+    for result in failed:
+        print('    %s - %s' % (result['file'], result['error']))
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options] libraryDir ...')
+    parser.add_option('-j', '--jobs', type='int', default=multiprocessing.cpu_count(),
+                                                    help='number of worker processes (default: number of CPUs)')
+    parser.add_option('-r', '--report', default=None,
+                                            help='report file (default: %s in the first library directory)'
+                                                                                                % REPORT_FILE_NAME)
+    parser.add_option('-k', '--keep-legacy', action='store_true', default=False,
+                                            help='keep the legacy files, with a ".legacy" extension')
+    options, libraryDirs = parser.parse_args()
+
+    if not libraryDirs:
+        parser.error('No library directory passed-in.')
+
+    reportFilePath = options.report or os.path.join(libraryDirs[0], REPORT_FILE_NAME)
+
+    filePaths = returnLegacyFilePaths(libraryDirs)
+    results = returnReportResults(reportFilePath)
+
+    print('%s legacy file(s) to convert, %s in the report from previous run(s).' % (len(filePaths), len(results)))
+
+    reportFile = open(reportFilePath, 'a')
+    pool = multiprocessing.Pool(max(options.jobs, 1))
+
+    try:
+        # Append each result to the report as it's returned, so that the report is complete for the files
+        # converted before an interruption.
+        for count, result in enumerate(pool.imap_unordered(_convertFileForPool,
+                                                [(filePath, options.keep_legacy) for filePath in filePaths])):
+            reportFile.write(json.dumps(result, sort_keys=True)+'\n')
+            reportFile.flush()
+            results[result['file']] = result
+            sys.stdout.write('\r%s / %s' % (count + 1, len(filePaths)))
+            sys.stdout.flush()
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        print('\nInterrupted. Run again to resume.')
+    finally:
+        pool.join()
+        reportFile.close()
+
+    print('')
+    printSummary(results)
+
+
+if __name__ == '__main__':
+    main()
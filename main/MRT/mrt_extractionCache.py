@@ -0,0 +1,175 @@
+# *************************************************************************************************************
+#
+#    mrt_extractionCache.py - Source for the local cache of maya scene files extracted from module collection
+#                             and character template files for import. It doesn't depend on maya.
+#
+#    A maya scene file is extracted once for the payload(s) it's written from (see mrt_fileFormat.
+#    extractPayloadsToFile()), and is stored in the cache directory by a hash of the payload type, the payload
+#    checksums and the module namespaces to be extracted. So, a module collection or a character template
+#    installed again is imported directly from the cache, and the library directories (which may be read-only
+#    or on a network file system) are never written to.
+#
+#    The module namespaces aren't renamed in the cached scene files, since the new namespaces for a module
+#    collection depend on the scene it's installed into. A maya scene file is extracted to the cache for each
+#    module collection, and the cached files for the module collections installed together are copied to a
+#    single import file, with their module namespaces renamed while they're copied (see returnImportFile()).
+#
+#    The cache is limited by the total file size and the number of files, and the least recently used files
+#    are removed over the limits (see mrt_fileStore).
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+__moduleName__ = 'mrt_extractionCache'
+
+import os, re, json, hashlib
+
+import mrt_fileFormat as mfile
+import mrt_fileStore as mstore
+import mrt_manifest as mman
+
+# Default limits for the cache, total size in MB and the number of files.
+DEFAULT_MAX_SIZE_MB = 2048
+DEFAULT_MAX_COUNT = 200
+
+
+class MRTExtractionCache(mstore.MRTFileStore):
+    '''
+    Cache for maya scene files extracted from module collection / character template files, in the directory
+    "cachePath". The file id for a cached maya scene file is its file name.
+    '''
+    # Matches a cached maya scene file name, with its cache key and file extension.
+    fileNameRe = re.compile(r'^([0-9a-f]{40}\.m[ab])$')
+
+    def __init__(self, cachePath, maxSizeMB=DEFAULT_MAX_SIZE_MB, maxCount=DEFAULT_MAX_COUNT):
+
+        mstore.MRTFileStore.__init__(self, cachePath, maxSizeMB, maxCount)
+
+
+    def returnCacheKey(self, payloads, payloadChecksums, payloadType):
+        '''
+        Returns the cache key for the maya scene file extracted from payloads, with a list of (file path,
+        module namespaces) tuples as "payloads" (see mrt_fileFormat.extractPayloadsToFile()), and the payload
+        checksum for each file (from its header). The key doesn't depend on the file paths.
+        '''
+        keyData = [payloadType]
+
+        for (filePath, moduleNamespaces), payloadChecksum in zip(payloads, payloadChecksums):
+            keyData.append([payloadChecksum, sorted(moduleNamespaces) if moduleNamespaces is not None else None])
+
+        return hashlib.sha1(json.dumps(keyData).encode('utf-8')).hexdigest()
+
+
+    def returnFileId(self, cacheKey, payloadType):
+        '''
+        Returns the file id (file name) for a cached maya scene file with a given cache key.
+        '''
+        return '%s%s' % (cacheKey, mfile.PAYLOAD_TYPES[payloadType])
+
+
+    def returnExtractedFile(self, payloads, payloadChecksums, payloadType='mayaAscii'):
+        '''
+        Returns the path for the maya scene file extracted from payloads (see returnCacheKey()), to be imported.
+        If it isn't in the cache, it's extracted to a temporary file in the cache directory, which is then renamed,
+        and the least recently used files are removed over the cache limits. Multiple payloads are only supported
+        for mayaAscii.
+        '''
+        fileId = self._extractFile(payloads, payloadChecksums, payloadType)
+
+        self.evictFiles(protectedFileIds=(fileId,))
+
+        return self.returnFilePath(fileId)
+
+
+    def returnImportFile(self, payloads, payloadChecksums):
+        '''
+        Returns the path for a mayaAscii scene file for importing the modules from module collection payloads
+        together, with a list of (file path, namespace remapping, module namespaces) tuples as "payloads" (see
+        mrt_fileFormat.extractPayloadsToFile()). The maya scene file for each payload is extracted to the cache
+        without renaming its module namespaces. For a single payload without a namespace remapping, the cached
+        file is returned. Otherwise, the cached files are copied in order to the import file in the cache
+        directory, and the module namespaces are renamed for each while it's copied, in one pass. The import file
+        is removed with removeImportFile().
+        '''
+        fileIds = []
+        for (filePath, namespaceRemapping, moduleNamespaces), payloadChecksum in zip(payloads, payloadChecksums):
+            fileIds.append(self._extractFile([(filePath, moduleNamespaces)], [payloadChecksum]))
+
+        self.evictFiles(protectedFileIds=fileIds)
+
+        if len(payloads) == 1 and not payloads[0][1]:
+            return self.returnFilePath(fileIds[0])
+
+        importFilePath = self.returnImportFilePath()
+
+        outFileObj = open(importFilePath, 'wb')
+        try:
+            for (filePath, namespaceRemapping, moduleNamespaces), fileId in zip(payloads, fileIds):
+                remapLine = mman.returnNamespaceRemapFunction(namespaceRemapping) if namespaceRemapping else None
+                line = b'\n'
+                inFileObj = open(self.returnFilePath(fileId), 'rb')
+                try:
+                    for line in inFileObj:
+                        outFileObj.write(remapLine(line) if remapLine else line)
+                finally:
+                    inFileObj.close()
+                # Start the scene data for the next payload on a new line.
+                if not line.endswith(b'\n'):
+                    outFileObj.write(b'\n')
+        finally:
+            outFileObj.close()
+
+        return importFilePath
+
+
+    def returnImportFilePath(self):
+        '''
+        Returns the path for the import file written by returnImportFile(). It isn't a cached file, so it's not
+        counted for the cache limits.
+        '''
+        return '%s/import.%s%s' % (self.storePath, os.getpid(), mfile.PAYLOAD_TYPES['mayaAscii'])
+
+
+    def removeImportFile(self):
+        '''
+        Removes the import file written by returnImportFile(), after it's imported.
+        '''
+        importFilePath = self.returnImportFilePath()
+
+        if os.path.exists(importFilePath):
+            os.remove(importFilePath)
+
+
+    def _extractFile(self, payloads, payloadChecksums, payloadType='mayaAscii'):
+        '''
+        Extracts the maya scene file from payloads to the cache, if it isn't in the cache (see
+        returnExtractedFile()), and returns its file id. The cache limits aren't checked.
+        '''
+        cacheKey = self.returnCacheKey(payloads, payloadChecksums, payloadType)
+        fileId = self.returnFileId(cacheKey, payloadType)
+        filePath = self.returnFilePath(fileId)
+
+        if os.path.exists(filePath):
+            self.touchFile(fileId)
+            return fileId
+
+        if not os.path.isdir(self.storePath):
+            os.makedirs(self.storePath)
+
+        tempFilePath = '%s/%s.%s.tmp' % (self.storePath, cacheKey, os.getpid())
+        try:
+            if payloadType == 'mayaAscii':
+                mfile.extractPayloadsToFile([(payloadFilePath, None, moduleNamespaces) \
+                                                    for (payloadFilePath, moduleNamespaces) in payloads], tempFilePath)
+            else:
+                payloadFilePath, moduleNamespaces = payloads[0]
+                mfile.extractPayloadToFile(payloadFilePath, tempFilePath, moduleNamespaces=moduleNamespaces)
+        except:
+            if os.path.exists(tempFilePath):
+                os.remove(tempFilePath)
+            raise
+
+        mfile.replaceFile(tempFilePath, filePath)
+
+        return fileId
@@ -0,0 +1,979 @@
+# *************************************************************************************************************
+#
+#    mrt_fileFormat.py - Source for reading and writing module collection (.mrtmc) and character template
+#                        (.mrtct) files. It doesn't depend on maya, so it can be used outside of a maya session.
+#
+#    A file is written in a versioned container format, with a small header ahead of its scene data
+#    (payload), so that the header can be read without loading the payload:
+#
+#    [magic, 4 bytes]['MRTF']
+#    [format version, unsigned short, big-endian]
+#    [header size, unsigned int, big-endian]
+#    [header, JSON (utf-8)] - description, creation time, MRT version, payload size/checksum and a manifest.
+#    [payload] - maya scene data exported for the module collection / character template, stored as a single
+#                zlib compressed stream. It's written and read in fixed-size blocks, so that the memory used
+#                while saving or installing doesn't depend on the size of the scene.
+#
+#    For a module collection, the payload is split into chunks by module group (a module, with its mirror
+#    module), each stored as a separate zlib stream, and the header has an index for the chunks with their
+#    offsets in the payload (format version 2). A chunk is a run of consecutive scene lines for a module group,
+#    so the chunks are stored in the order of the scene, and the whole payload is decoded as it was saved.
+#    The chunks for a subset of modules can then be read without reading the whole payload, for installing
+#    only those modules.
+#
+#    The payload is a mayaAscii scene by default. It can also be a mayaBinary scene, which is faster to import
+#    for a large number of nodes, but its scene data can't be read without maya; so a mayaBinary payload has
+#    its manifest computed in maya, isn't split into chunks, and its module namespaces can't be renamed before
+#    it's imported (see extractPayloadToFile()).
+#
+#    Older files saved as a pickled dict with one string per line for the maya scene are still supported
+#    for reading (they're referred to as "legacy" files here).
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+__moduleName__ = 'mrt_fileFormat'
+
+import os, sys, mmap, struct, json, time, hashlib, zlib
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import mrt_manifest as mman
+
+# Identifies a file in the container format.
+MRT_FILE_MAGIC = b'MRTF'
+
+# Current container format version.
+MRT_FILE_FORMAT_VERSION = 2
+
+# Size for each read/write block while copying payload data.
+PAYLOAD_BLOCK_SIZE = 256 * 1024
+
+# Size for each memory-mapped window of the file while copying an uncompressed payload (a multiple of
+# mmap.ALLOCATIONGRANULARITY), so that the address space used doesn't depend on the size of the payload.
+MMAP_WINDOW_SIZE = 64 * 1024 * 1024
+
+# Default encoding for the payload data, "zlib" or "none".
+PAYLOAD_ENCODING = 'zlib'
+
+# Compression level for zlib payload encoding.
+ZLIB_COMPRESSION_LEVEL = 6
+
+# File types with the payload split into chunks by module group (for a mayaAscii payload).
+CHUNKED_FILE_TYPES = ('collection',)
+
+# Maya scene types for the payload, with their file extension.
+PAYLOAD_TYPES = {'mayaAscii': '.ma', 'mayaBinary': '.mb'}
+
+# The preamble before the header, (magic, format version, header size).
+_preamble = struct.Struct('>4sHI')
+
+# Legacy file dict keys for the description and the scene line prefix, by file type.
+_legacyKeys = {'collection': ('collectionDescrp', 'collectionData_line_'),
+               'template': ('templateDescription', 'templateData_line_')}
+
+
+class MRTFileError(Exception):
+    '''
+    Raised for a malformed or unsupported module collection / character template file.
+    '''
+    pass
+
+
+def isMRTContainerFile(filePath):
+    '''
+    Checks if a given file is written in the container format (as opposed to a legacy file).
+    '''
+    fileObj = open(filePath, 'rb')
+    magic = fileObj.read(len(MRT_FILE_MAGIC))
+    fileObj.close()
+
+    return magic == MRT_FILE_MAGIC
+
+
+def returnFileTypeFromPath(filePath):
+    '''
+    Returns the file type, "collection" or "template" from a file path extension.
+    '''
+    if filePath.lower().endswith('.mrtct'):
+        return 'template'
+
+    return 'collection'
+
+
+def readFileHeader(filePath):
+    '''
+    Returns the header dict for a module collection / character template file. Only the header
+    is read for a container file. For a legacy file, the header is built after loading the file.
+
+    The header contains the following keys:
+    'fileType' -> "collection" or "template".
+    'description' -> Module collection / character template description.
+    'creationTime' -> Time of saving, in seconds since the epoch (None for a legacy file).
+    'mrtVersion' -> MRT version used for saving (None for a legacy file).
+    'payloadType' -> Maya scene type for the payload, "mayaAscii" or "mayaBinary".
+    'payloadEncoding' -> Encoding for the payload data, "zlib" or "none".
+    'payloadSize' -> Size of the (decoded) payload in bytes.
+    'payloadStoredSize' -> Size of the payload data stored in the file, in bytes.
+    'payloadChecksum' -> sha1 hex digest for the (decoded) payload.
+    'payloadChunks' -> A list of chunk dicts for a payload split into chunks, in their order in the payload
+                       (None, if the payload isn't split), each with the keys:
+                       'section' -> Scene section for the first line in the chunk, see
+                                    mrt_manifest.SCENE_SECTIONS. A "links" chunk only has "links" lines.
+                       'modules' -> Module namespaces for the module group in the chunk (empty, if none).
+                       'offset' -> Offset for the chunk data from the start of the payload, in bytes.
+                       'storedSize' -> Size of the chunk data stored in the file, in bytes.
+                       'size' -> Size of the (decoded) chunk data in bytes.
+                       'checksum' -> sha1 hex digest for the (decoded) chunk data.
+    'manifest' -> Modules and character joints in the payload, see mrt_manifest.returnManifestFromSceneLines().
+    'legacy' -> True for a legacy file.
+    '''
+    fileObj = open(filePath, 'rb')
+
+    try:
+        if fileObj.read(len(MRT_FILE_MAGIC)) == MRT_FILE_MAGIC:
+            fileObj.seek(0)
+            header = _readContainerHeader(fileObj)[0]
+        else:
+            fileObj.seek(0)
+            header = _returnLegacyHeader(_loadLegacyData(fileObj), returnFileTypeFromPath(filePath))
+    finally:
+        fileObj.close()
+
+    return header
+
+
+def writeFile(filePath, fileType, description, payloadFilePath, mrtVersion, manifest=None, payloadEncoding=None,
+                                                                                        payloadType='mayaAscii'):
+    '''
+    Writes a module collection / character template file in the container format, with the maya scene
+    file at "payloadFilePath" as its payload, of type "payloadType" (see PAYLOAD_TYPES). The payload is
+    encoded and copied in blocks, so it's never entirely loaded in memory. If a manifest isn't passed-in,
+    it's computed from the payload (a manifest is required for a mayaBinary payload). For a file type in
+    CHUNKED_FILE_TYPES, a mayaAscii payload is split into chunks by module group.
+    Returns the header written to the file.
+    '''
+    payloadEncoding = payloadEncoding or PAYLOAD_ENCODING
+
+    if payloadType not in PAYLOAD_TYPES:
+        raise MRTFileError('Unsupported MRT payload type "%s".' % payloadType)
+
+    if manifest is None:
+        if payloadType != 'mayaAscii':
+            raise MRTFileError('A manifest is required for a %s payload.' % payloadType)
+        manifest = mman.returnManifestFromSceneFile(payloadFilePath)
+
+    payloadChunks = None
+
+    # Get the size and the checksum for the payload before writing the header. If the payload is to be
+    # compressed or split, write the stored payload to a temporary file first, to get its stored size.
+    if fileType in CHUNKED_FILE_TYPES and payloadType == 'mayaAscii':
+        storedFilePath = '%s.%s.payload' % (filePath, os.getpid())
+        payloadSize, payloadChecksum, payloadChunks = \
+                            _writeChunkedPayload(payloadFilePath, storedFilePath, manifest, payloadEncoding)
+    elif payloadEncoding == 'none':
+        payloadSize, payloadChecksum = _returnFileSizeAndChecksum(payloadFilePath)
+        storedFilePath = payloadFilePath
+    else:
+        storedFilePath = '%s.%s.payload' % (filePath, os.getpid())
+        payloadFileObj = open(payloadFilePath, 'rb')
+        storedFileObj = open(storedFilePath, 'wb')
+        try:
+            payloadSize, payloadChecksum = _encodeBlocks(payloadFileObj, storedFileObj, payloadEncoding)
+        finally:
+            payloadFileObj.close()
+            storedFileObj.close()
+
+    header = {'fileType': fileType,
+              'description': description,
+              'creationTime': time.time(),
+              'mrtVersion': mrtVersion,
+              'payloadType': payloadType,
+              'payloadEncoding': payloadEncoding,
+              'payloadSize': payloadSize,
+              'payloadStoredSize': os.path.getsize(storedFilePath),
+              'payloadChecksum': payloadChecksum,
+              'payloadChunks': payloadChunks,
+              'manifest': manifest,
+              'legacy': False}
+
+    storedFileObj = open(storedFilePath, 'rb')
+    try:
+        tempFilePath = _writeContainerTempFile(filePath, header, storedFileObj)
+    finally:
+        storedFileObj.close()
+        if storedFilePath != payloadFilePath:
+            os.remove(storedFilePath)
+
+    replaceFile(tempFilePath, filePath)
+
+    return header
+
+
+def extractPayloadToFile(filePath, outFilePath, namespaceRemapping=None, moduleNamespaces=None):
+    '''
+    Writes the maya scene data (payload) from a module collection / character template file
+    to a maya scene file at "outFilePath", to be imported. If a namespace remapping dict is passed-in
+    (see mrt_manifest.returnNamespaceRemapping()), the module namespaces are renamed in the scene data
+    while it's written.
+
+    If a list of module namespaces is passed-in, only the scene data for these modules (with their mirror
+    modules) is written, for installing a subset of modules from a module collection. The modules should
+    include their parent modules, see mrt_manifest.returnRequiredModuleNamespaces(). For a payload split into
+    chunks, only the chunks for these modules are read.
+
+    The namespace remapping and the module namespaces are only supported for a mayaAscii payload.
+    '''
+    outFileObj = open(outFilePath, 'wb')
+
+    try:
+        _writePayload(filePath, outFileObj, namespaceRemapping, moduleNamespaces)
+    finally:
+        outFileObj.close()
+
+
+def extractPayloadsToFile(payloads, outFilePath):
+    '''
+    Writes the maya scene data (mayaAscii payloads) from module collection files to a single maya scene file
+    at "outFilePath", so that they can be imported together. "payloads" is a list of (file path, namespace
+    remapping, module namespaces) tuples, with the arguments for each file as in extractPayloadToFile().
+    The scene data is written in order, as if the files were imported one after the other.
+    '''
+    outFileObj = open(outFilePath, 'w+b')
+
+    try:
+        for filePath, namespaceRemapping, moduleNamespaces in payloads:
+            # Start the scene data for a file on a new line.
+            if outFileObj.tell():
+                outFileObj.seek(-1, os.SEEK_END)
+                if outFileObj.read(1) != b'\n':
+                    outFileObj.write(b'\n')
+            if returnPayloadType(filePath) != 'mayaAscii':
+                raise MRTFileError('Only a mayaAscii payload can be written with other payloads.')
+            _writePayload(filePath, outFileObj, namespaceRemapping, moduleNamespaces)
+    finally:
+        outFileObj.close()
+
+
+def returnPayloadType(filePath):
+    '''
+    Returns the maya scene type for the payload in a module collection / character template file.
+    '''
+    if isMRTContainerFile(filePath):
+        return readFileHeader(filePath)['payloadType']
+
+    return 'mayaAscii'
+
+
+def returnCommonNodeNames(filePath):
+    '''
+    Returns a set of the names for the nodes created outside the module namespaces in the maya scene data
+    (mayaAscii payload) for a module collection file. These nodes may have name conflicts with nodes in another
+    module collection. For a payload split into chunks, only the chunks without a module group are read.
+    '''
+    fileObj = open(filePath, 'rb')
+
+    try:
+        if fileObj.read(len(MRT_FILE_MAGIC)) == MRT_FILE_MAGIC:
+            fileObj.seek(0)
+            header = _readContainerHeader(fileObj)[0]
+            if header['payloadType'] != 'mayaAscii':
+                raise MRTFileError('The scene data for a %s payload can\'t be read.' % header['payloadType'])
+            if header.get('payloadChunks') is not None:
+                payloadOffset = fileObj.tell()
+                nodeNames = set()
+                for chunk in header['payloadChunks']:
+                    if chunk['section'] != 'links' and not chunk['modules']:
+                        nodeNames.update(mman.returnCommonNodeNames(_returnLinesFromBlocks(
+                                                        _returnChunkBlocks(fileObj, header, chunk, payloadOffset))))
+                return nodeNames
+            lines = _returnLinesFromBlocks(_returnPayloadBlocks(fileObj, header))
+        else:
+            fileObj.seek(0)
+            lines = _returnLegacyPayloadLines(_loadLegacyData(fileObj), returnFileTypeFromPath(filePath))
+
+        return mman.returnCommonNodeNames(lines)
+    finally:
+        fileObj.close()
+
+
+def updateFileDescription(filePath, description):
+    '''
+    Modifies the description for a module collection / character template file. For a container file,
+    the header is re-written and the stored payload is copied as is (in blocks).
+    '''
+    if isMRTContainerFile(filePath):
+        _updateContainerHeader(filePath, {'description': description})
+    else:
+        # Re-write a legacy file with the new description.
+        fileObj = open(filePath, 'rb')
+        legacyData = _loadLegacyData(fileObj)
+        fileObj.close()
+        legacyData[_legacyKeys[returnFileTypeFromPath(filePath)][0]] = description
+        fileObj = open(filePath, 'wb')
+        pickle.dump(legacyData, fileObj, 2)
+        fileObj.close()
+
+
+def returnManifestFromFile(filePath):
+    '''
+    Computes the manifest for a module collection / character template file from its payload, without
+    writing the payload to a file. The payload is decoded in blocks for a container file. For a mayaBinary
+    payload, the manifest from the file header is returned.
+    '''
+    fileObj = open(filePath, 'rb')
+
+    try:
+        if fileObj.read(len(MRT_FILE_MAGIC)) == MRT_FILE_MAGIC:
+            fileObj.seek(0)
+            header = _readContainerHeader(fileObj)[0]
+            if header['payloadType'] != 'mayaAscii':
+                return header['manifest']
+            manifest = mman.returnManifestFromSceneLines(_returnLinesFromBlocks(_returnPayloadBlocks(fileObj, header)))
+        else:
+            # The manifest is computed when a legacy file header is built.
+            fileObj.seek(0)
+            manifest = _returnLegacyHeader(_loadLegacyData(fileObj), returnFileTypeFromPath(filePath))['manifest']
+    finally:
+        fileObj.close()
+
+    return manifest
+
+
+def returnPayloadContentHash(filePath):
+    '''
+    Returns a sha1 hex digest for the maya scene data (payload) in a module collection / character template
+    file, without its comment lines (which have the scene file name and the save time). So, it's the same
+    for files saved from the same scene content. For a mayaBinary payload, the digest is for all its data.
+    '''
+    fileObj = open(filePath, 'rb')
+
+    # The comment lines are skipped for a mayaAscii payload.
+    skipComments = True
+
+    try:
+        if fileObj.read(len(MRT_FILE_MAGIC)) == MRT_FILE_MAGIC:
+            fileObj.seek(0)
+            header = _readContainerHeader(fileObj)[0]
+            if header['payloadType'] == 'mayaAscii':
+                lines = _returnLinesFromBlocks(_returnPayloadBlocks(fileObj, header))
+            else:
+                lines = _returnPayloadBlocks(fileObj, header)
+                skipComments = False
+        else:
+            fileObj.seek(0)
+            lines = _returnLegacyPayloadLines(_loadLegacyData(fileObj), returnFileTypeFromPath(filePath))
+
+        contentHash = hashlib.sha1()
+        for line in lines:
+            if not (skipComments and line.startswith(b'//')):
+                contentHash.update(line)
+    finally:
+        fileObj.close()
+
+    return contentHash.hexdigest()
+
+
+def regenerateFileManifest(filePath):
+    '''
+    Computes the manifest for a container file from its payload and updates it in the file header,
+    for a file saved with an incomplete manifest (with a mayaAscii payload). Returns the manifest.
+    '''
+    manifest = returnManifestFromFile(filePath)
+
+    _updateContainerHeader(filePath, {'manifest': manifest})
+
+    return manifest
+
+
+def convertLegacyFile(filePath, outFilePath=None, mrtVersion=None, payloadEncoding=None):
+    '''
+    Writes a legacy module collection / character template file in the container format, at "outFilePath"
+    (or over the legacy file, if it isn't passed-in). The scene lines are written to a temporary mayaAscii
+    file first, which is then written as the payload (see writeFile()). Returns the header written to the file.
+    '''
+    outFilePath = outFilePath or filePath
+    fileType = returnFileTypeFromPath(filePath)
+
+    fileObj = open(filePath, 'rb')
+    try:
+        if fileObj.read(len(MRT_FILE_MAGIC)) == MRT_FILE_MAGIC:
+            raise MRTFileError('Not a legacy MRT file.')
+        fileObj.seek(0)
+        legacyData = _loadLegacyData(fileObj)
+    finally:
+        fileObj.close()
+
+    payloadFilePath = '%s.%s.ma' % (outFilePath, os.getpid())
+    payloadFileObj = open(payloadFilePath, 'wb')
+    try:
+        for line in _returnLegacyPayloadLines(legacyData, fileType):
+            payloadFileObj.write(line)
+        payloadFileObj.close()
+
+        header = writeFile(outFilePath, fileType, legacyData[_legacyKeys[fileType][0]], payloadFilePath, mrtVersion,
+                                                                                payloadEncoding=payloadEncoding)
+    finally:
+        payloadFileObj.close()
+        os.remove(payloadFilePath)
+
+    return header
+
+
+def verifyConvertedFile(legacyFilePath, filePath):
+    '''
+    Verifies that a container file converted from a legacy file (see convertLegacyFile()) has the same maya scene
+    data, by decoding its whole stored payload in order, and comparing its sha1 hex digest with the digest for
+    the scene lines in the legacy file. Raises MRTFileError for a mismatch.
+    '''
+    fileType = returnFileTypeFromPath(legacyFilePath)
+
+    legacyFileObj = open(legacyFilePath, 'rb')
+    try:
+        expectedChecksum = hashlib.sha1()
+        for line in _returnLegacyPayloadLines(_loadLegacyData(legacyFileObj), fileType):
+            expectedChecksum.update(line)
+    finally:
+        legacyFileObj.close()
+
+    fileObj = open(filePath, 'rb')
+    try:
+        header = _readContainerHeader(fileObj)[0]
+
+        if header['fileType'] != fileType or header['payloadType'] != 'mayaAscii':
+            raise MRTFileError('Converted MRT file type mismatch for "%s".' % filePath)
+
+        # Decode the stored payload (the decoded data, and each chunk for a payload split into chunks, is
+        # verified with its stored checksum), and compare.
+        checksum = hashlib.sha1()
+        for block in _returnPayloadBlocks(fileObj, header):
+            checksum.update(block)
+    finally:
+        fileObj.close()
+
+    if checksum.hexdigest() != expectedChecksum.hexdigest():
+        raise MRTFileError('Converted MRT file payload mismatch for "%s".' % filePath)
+
+
+def replaceFile(sourcePath, targetPath):
+    '''
+    Renames a file over an existing one (os.rename doesn't overwrite on windows).
+    '''
+    try:
+        os.rename(sourcePath, targetPath)
+    except OSError:
+        os.remove(targetPath)
+        os.rename(sourcePath, targetPath)
+
+
+# -------------------------------------------------------------------------------------------------------------
+#
+#   INTERNAL FUNCTIONS
+#
+# -------------------------------------------------------------------------------------------------------------
+
+def _writePayload(filePath, outFileObj, namespaceRemapping=None, moduleNamespaces=None):
+    '''
+    Writes the maya scene data (payload) from a module collection / character template file to a file
+    object, see extractPayloadToFile().
+    '''
+    fileObj = open(filePath, 'rb')
+
+    remapLine = mman.returnNamespaceRemapFunction(namespaceRemapping) if namespaceRemapping else None
+
+    try:
+        if fileObj.read(len(MRT_FILE_MAGIC)) == MRT_FILE_MAGIC:
+            fileObj.seek(0)
+            header = _readContainerHeader(fileObj)[0]
+            if header['payloadType'] != 'mayaAscii' and (remapLine or moduleNamespaces is not None):
+                raise MRTFileError('The module namespaces for a %s payload can only be modified after '
+                                                                    'import.' % header['payloadType'])
+            if moduleNamespaces is not None:
+                if header.get('payloadChunks') is not None:
+                    lines = _returnModuleLinesFromChunks(fileObj, header, moduleNamespaces)
+                else:
+                    lines = mman.returnModuleSceneLines(_returnLinesFromBlocks(_returnPayloadBlocks(fileObj, header)),
+                                                        mman.returnModuleGroups(header['manifest']), moduleNamespaces)
+                for line in lines:
+                    outFileObj.write(remapLine(line) if remapLine else line)
+            elif remapLine:
+                for line in _returnLinesFromBlocks(_returnPayloadBlocks(fileObj, header)):
+                    outFileObj.write(remapLine(line))
+            else:
+                _decodeBlocks(fileObj, outFileObj, header)
+        else:
+            # For a legacy file, write the scene lines in order.
+            fileObj.seek(0)
+            fileType = returnFileTypeFromPath(filePath)
+            legacyData = _loadLegacyData(fileObj)
+            lines = _returnLegacyPayloadLines(legacyData, fileType)
+            if moduleNamespaces is not None:
+                moduleGroups = mman.returnModuleGroups(_returnLegacyHeader(legacyData, fileType)['manifest'])
+                lines = mman.returnModuleSceneLines(lines, moduleGroups, moduleNamespaces)
+            for line in lines:
+                outFileObj.write(remapLine(line) if remapLine else line)
+            del legacyData
+    finally:
+        fileObj.close()
+
+
+def _readContainerHeader(fileObj):
+    '''
+    Reads the preamble and the header from a container file object positioned at its start.
+    Returns the header dict and the format version. The file object is left at the start of the payload.
+    '''
+    preamble = fileObj.read(_preamble.size)
+    if len(preamble) != _preamble.size:
+        raise MRTFileError('Truncated MRT file header.')
+
+    magic, formatVersion, headerSize = _preamble.unpack(preamble)
+
+    if magic != MRT_FILE_MAGIC:
+        raise MRTFileError('Not an MRT container file.')
+    if formatVersion > MRT_FILE_FORMAT_VERSION:
+        raise MRTFileError('Unsupported MRT file format version %s. Please update MRT.' % formatVersion)
+
+    headerData = fileObj.read(headerSize)
+    if len(headerData) != headerSize:
+        raise MRTFileError('Truncated MRT file header.')
+
+    return json.loads(headerData.decode('utf-8')), formatVersion
+
+
+def _updateContainerHeader(filePath, headerValues):
+    '''
+    Updates the values in the header for a container file. The header is re-written and the stored
+    payload is copied as is (in blocks).
+    '''
+    fileObj = open(filePath, 'rb')
+
+    try:
+        header = _readContainerHeader(fileObj)[0]
+        header.update(headerValues)
+        tempFilePath = _writeContainerTempFile(filePath, header, fileObj)
+    finally:
+        fileObj.close()
+
+    replaceFile(tempFilePath, filePath)
+
+
+def _writeContainerTempFile(filePath, header, payloadFileObj):
+    '''
+    Writes a container file with the header and the payload read (in blocks) from a file object,
+    from its current position. The file is written to a temporary file next to "filePath" and its path
+    is returned; it's renamed with replaceFile() after the source file objects are closed, so that an
+    existing file (which may also be the payload source) is replaced only after the write is complete.
+    '''
+    headerData = json.dumps(header, sort_keys=True).encode('utf-8')
+
+    tempFilePath = '%s.%s.tmp' % (filePath, os.getpid())
+    tempFileObj = open(tempFilePath, 'wb')
+
+    try:
+        tempFileObj.write(_preamble.pack(MRT_FILE_MAGIC, MRT_FILE_FORMAT_VERSION, len(headerData)))
+        tempFileObj.write(headerData)
+        _copyBlocks(payloadFileObj, tempFileObj, header['payloadStoredSize'])
+        tempFileObj.close()
+    except:
+        tempFileObj.close()
+        os.remove(tempFilePath)
+        raise
+
+    return tempFilePath
+
+
+def _copyBlocks(inFileObj, outFileObj, size):
+    '''
+    Copies "size" bytes between two file objects, in blocks.
+    '''
+    remaining = size
+
+    while remaining > 0:
+        block = inFileObj.read(min(PAYLOAD_BLOCK_SIZE, remaining))
+        if not block:
+            raise MRTFileError('Truncated MRT file payload.')
+        outFileObj.write(block)
+        remaining -= len(block)
+
+
+def _encodeBlocks(inFileObj, outFileObj, payloadEncoding):
+    '''
+    Reads the payload from a file object in blocks and writes it encoded to another file object.
+    Returns the size and the sha1 hex digest for the payload read.
+    '''
+    if payloadEncoding != 'zlib':
+        raise MRTFileError('Unsupported MRT payload encoding "%s".' % payloadEncoding)
+
+    compressor = zlib.compressobj(ZLIB_COMPRESSION_LEVEL)
+    checksum = hashlib.sha1()
+    size = 0
+
+    block = inFileObj.read(PAYLOAD_BLOCK_SIZE)
+    while block:
+        checksum.update(block)
+        size += len(block)
+        outFileObj.write(compressor.compress(block))
+        block = inFileObj.read(PAYLOAD_BLOCK_SIZE)
+    outFileObj.write(compressor.flush())
+
+    return size, checksum.hexdigest()
+
+
+def _copyMappedBlocks(inFileObj, outFileObj, size):
+    '''
+    Copies "size" bytes from a file object (from its current position) to another file object, in blocks
+    from memory-mapped windows of the file, so that the data isn't read into python buffers in between.
+    Returns the sha1 hex digest for the data copied. If the file can't be memory-mapped, it's read in blocks.
+    '''
+    checksum = hashlib.sha1()
+
+    offset = inFileObj.tell()
+    end = offset + size
+
+    if os.fstat(inFileObj.fileno()).st_size < end:
+        raise MRTFileError('Truncated MRT file payload.')
+
+    while offset < end:
+        # The mapped window starts at an offset aligned to the allocation granularity.
+        windowOffset = offset - (offset % mmap.ALLOCATIONGRANULARITY)
+        windowSize = min(MMAP_WINDOW_SIZE, end - windowOffset)
+        try:
+            window = mmap.mmap(inFileObj.fileno(), windowSize, access=mmap.ACCESS_READ, offset=windowOffset)
+        except (EnvironmentError, ValueError):
+            window = None
+
+        if window is None:
+            inFileObj.seek(offset)
+            while offset < end:
+                block = inFileObj.read(min(PAYLOAD_BLOCK_SIZE, end - offset))
+                if not block:
+                    raise MRTFileError('Truncated MRT file payload.')
+                checksum.update(block)
+                outFileObj.write(block)
+                offset += len(block)
+            break
+
+        try:
+            position = offset - windowOffset
+            while position < windowSize:
+                block = window[position:position + PAYLOAD_BLOCK_SIZE]
+                checksum.update(block)
+                outFileObj.write(block)
+                position += len(block)
+            offset = windowOffset + windowSize
+        finally:
+            window.close()
+
+    inFileObj.seek(end)
+
+    return checksum.hexdigest()
+
+
+def _decodeBlocks(inFileObj, outFileObj, header):
+    '''
+    Reads the stored payload from a container file object (positioned at the payload) in blocks and
+    writes it decoded to another file object. An uncompressed payload is copied from the memory-mapped
+    file, and verified with its checksum (the chunks for a split payload are stored contiguously, in order).
+    '''
+    if header['payloadEncoding'] == 'none':
+        if _copyMappedBlocks(inFileObj, outFileObj, header['payloadStoredSize']) != header['payloadChecksum']:
+            raise MRTFileError('MRT file payload checksum mismatch. The file may be corrupt.')
+        return
+
+    for block in _returnPayloadBlocks(inFileObj, header):
+        outFileObj.write(block)
+
+
+def _returnPayloadBlocks(inFileObj, header):
+    '''
+    Returns a generator for the decoded payload blocks from a container file object (positioned at the
+    payload). For a payload split into chunks, the chunks are decoded in order.
+    '''
+    if header.get('payloadChunks') is None:
+        for block in _returnDecodedBlocks(inFileObj, header):
+            yield block
+        return
+
+    payloadOffset = inFileObj.tell()
+
+    for chunk in header['payloadChunks']:
+        for block in _returnChunkBlocks(inFileObj, header, chunk, payloadOffset):
+            yield block
+
+
+def _returnChunkBlocks(inFileObj, header, chunk, payloadOffset):
+    '''
+    Returns a generator for the decoded blocks for a payload chunk, from a container file object with its
+    payload at "payloadOffset". The chunk is verified with its checksum.
+    '''
+    inFileObj.seek(payloadOffset + chunk['offset'])
+
+    chunkHeader = {'payloadEncoding': header['payloadEncoding'],
+                   'payloadStoredSize': chunk['storedSize'],
+                   'payloadChecksum': chunk['checksum']}
+
+    return _returnDecodedBlocks(inFileObj, chunkHeader)
+
+
+def _returnModuleLinesFromChunks(inFileObj, header, moduleNamespaces):
+    '''
+    Returns a generator for the scene lines for a subset of modules, from a container file object (positioned
+    at the payload) with its payload split into chunks. Only the chunks without a module group, and the chunks
+    for the module groups with a passed-in module namespace are read. The lines in a "links" chunk are skipped
+    for the connections to other module groups.
+    '''
+    payloadOffset = inFileObj.tell()
+
+    moduleGroups = {}
+    for chunk in header['payloadChunks']:
+        for namespace in chunk['modules']:
+            moduleGroups[namespace] = chunk['modules'][0]
+
+    groups = set([moduleGroups[namespace] for namespace in moduleNamespaces if namespace in moduleGroups])
+
+    for chunk in header['payloadChunks']:
+        if chunk['modules'] and chunk['modules'][0] not in groups:
+            continue
+
+        lines = _returnLinesFromBlocks(_returnChunkBlocks(inFileObj, header, chunk, payloadOffset))
+
+        for line in lines:
+            if chunk['section'] != 'links' or mman.returnSceneLineModuleGroups(line, moduleGroups).issubset(groups):
+                yield line
+
+
+def _writeChunkedPayload(payloadFilePath, storedFilePath, manifest, payloadEncoding):
+    '''
+    Splits the maya scene data in a payload file into chunks by module group (see mrt_manifest.
+    returnSceneLineSections()), and writes the encoded chunks to a file. A chunk is a run of consecutive scene
+    lines for a module group (or without one), so the chunks are stored in the order of the scene lines, and the
+    chunks decoded in order are the same as the payload. The "links" lines (for the connections between module
+    groups) are in separate chunks. Returns the size and the sha1 hex digest for the payload, and the list of
+    chunk dicts for the header.
+    '''
+    if payloadEncoding not in ('none', 'zlib'):
+        raise MRTFileError('Unsupported MRT payload encoding "%s".' % payloadEncoding)
+
+    moduleGroups = mman.returnModuleGroups(manifest)
+
+    groupNamespaces = {}
+    for namespace in sorted(moduleGroups):
+        groupNamespaces.setdefault(moduleGroups[namespace], []).append(namespace)
+
+    checksum = hashlib.sha1()
+    size = 0
+    payloadChunks = []
+
+    # The ("links" section, module group) and the encoder for the current chunk.
+    chunkKey, chunkEncoder = None, None
+
+    payloadFileObj = open(payloadFilePath, 'rb')
+    storedFileObj = open(storedFilePath, 'wb')
+    try:
+        for section, group, line in mman.returnSceneLineSections(payloadFileObj, moduleGroups):
+            if (section == 'links', group) != chunkKey:
+                if chunkEncoder:
+                    payloadChunks.append(chunkEncoder.close())
+                chunkKey = (section == 'links', group)
+                chunkEncoder = _ChunkEncoder(storedFileObj, payloadEncoding, section, groupNamespaces.get(group, []))
+
+            chunkEncoder.write(line)
+            checksum.update(line)
+            size += len(line)
+
+        if chunkEncoder:
+            payloadChunks.append(chunkEncoder.close())
+    finally:
+        payloadFileObj.close()
+        storedFileObj.close()
+
+    return size, checksum.hexdigest(), payloadChunks
+
+
+class _ChunkEncoder(object):
+    '''
+    Writes an encoded payload chunk to a file object (from its current position), from its scene lines.
+    The lines are encoded in blocks of up to PAYLOAD_BLOCK_SIZE.
+    '''
+    def __init__(self, outFileObj, payloadEncoding, section, modules):
+
+        self.outFileObj = outFileObj
+        self.chunk = {'section': section, 'modules': modules, 'offset': outFileObj.tell()}
+
+        self._compressor = zlib.compressobj(ZLIB_COMPRESSION_LEVEL) if payloadEncoding == 'zlib' else None
+        self._checksum = hashlib.sha1()
+        self._size = 0
+
+        # Lines to be encoded, with their size.
+        self._lines = []
+        self._linesSize = 0
+
+
+    def write(self, line):
+        '''
+        Adds a scene line (bytes) to the chunk.
+        '''
+        self._lines.append(line)
+        self._linesSize += len(line)
+
+        if self._linesSize >= PAYLOAD_BLOCK_SIZE:
+            self._encodeLines()
+
+
+    def close(self):
+        '''
+        Writes the remaining encoded data for the chunk, and returns the chunk dict for the header.
+        '''
+        self._encodeLines()
+        if self._compressor:
+            self.outFileObj.write(self._compressor.flush())
+
+        self.chunk.update({'storedSize': self.outFileObj.tell() - self.chunk['offset'],
+                           'size': self._size,
+                           'checksum': self._checksum.hexdigest()})
+        return self.chunk
+
+
+    def _encodeLines(self):
+        '''
+        Encodes the lines added since the last call, and writes them.
+        '''
+        data = b''.join(self._lines)
+        self._lines = []
+        self._linesSize = 0
+
+        self._checksum.update(data)
+        self._size += len(data)
+        self.outFileObj.write(self._compressor.compress(data) if self._compressor else data)
+
+
+def _returnDecodedBlocks(inFileObj, header):
+    '''
+    Returns a generator for the decoded payload blocks from a container file object (positioned at the
+    payload). The decoded payload is verified with its checksum after the last block.
+    '''
+    payloadEncoding = header['payloadEncoding']
+
+    if payloadEncoding not in ('none', 'zlib'):
+        raise MRTFileError('Unsupported MRT payload encoding "%s".' % payloadEncoding)
+
+    decompressor = zlib.decompressobj()
+    checksum = hashlib.sha1()
+    remaining = header['payloadStoredSize']
+
+    while remaining > 0:
+        block = inFileObj.read(min(PAYLOAD_BLOCK_SIZE, remaining))
+        if not block:
+            raise MRTFileError('Truncated MRT file payload.')
+        remaining -= len(block)
+
+        if payloadEncoding == 'none':
+            checksum.update(block)
+            yield block
+            continue
+
+        # Limit the size of each decompressed block, and continue with any unconsumed input.
+        while block:
+            data = decompressor.decompress(block, PAYLOAD_BLOCK_SIZE)
+            checksum.update(data)
+            yield data
+            block = decompressor.unconsumed_tail
+
+    if payloadEncoding == 'zlib':
+        data = decompressor.flush()
+        checksum.update(data)
+        yield data
+
+    if checksum.hexdigest() != header['payloadChecksum']:
+        raise MRTFileError('MRT file payload checksum mismatch. The file may be corrupt.')
+
+
+def _returnLinesFromBlocks(blocks):
+    '''
+    Returns a generator for the lines (with line endings) from an iterable of data blocks.
+    '''
+    partialLine = b''
+
+    for block in blocks:
+        lines = (partialLine + block).split(b'\n')
+        partialLine = lines.pop()
+        for line in lines:
+            yield line + b'\n'
+
+    if partialLine:
+        yield partialLine
+
+
+def _returnFileSizeAndChecksum(filePath):
+    '''
+    Returns the size and the sha1 hex digest for a file, read in blocks.
+    '''
+    checksum = hashlib.sha1()
+    size = 0
+
+    fileObj = open(filePath, 'rb')
+    block = fileObj.read(PAYLOAD_BLOCK_SIZE)
+    while block:
+        checksum.update(block)
+        size += len(block)
+        block = fileObj.read(PAYLOAD_BLOCK_SIZE)
+    fileObj.close()
+
+    return size, checksum.hexdigest()
+
+
+def _loadLegacyData(fileObj):
+    '''
+    Loads the pickled dict from a legacy file object. The scene lines were pickled as python 2 str,
+    so they're loaded as latin-1 under python 3 to preserve their bytes.
+    '''
+    if sys.version_info[0] > 2:
+        return pickle.load(fileObj, encoding='latin1')
+
+    return pickle.load(fileObj)
+
+
+def _returnLegacyPayloadLines(legacyData, fileType):
+    '''
+    Returns a generator for the maya scene lines (as bytes) in order, from a legacy file dict.
+    '''
+    lineKey = _legacyKeys[fileType][1]
+
+    for i in range(1, len(legacyData)):
+        line = legacyData[lineKey+str(i)]
+        if not isinstance(line, bytes):
+            line = line.encode('latin1')
+        yield line
+
+
+def _returnLegacyHeader(legacyData, fileType):
+    '''
+    Builds a header dict for a loaded legacy file dict.
+    '''
+    checksum = hashlib.sha1()
+    size = [0]
+
+    def returnPayloadLines():
+        # Update the checksum and the size for the lines while they're read for the manifest.
+        for line in _returnLegacyPayloadLines(legacyData, fileType):
+            checksum.update(line)
+            size[0] += len(line)
+            yield line
+
+    manifest = mman.returnManifestFromSceneLines(returnPayloadLines())
+
+    return {'fileType': fileType,
+            'description': legacyData[_legacyKeys[fileType][0]],
+            'creationTime': None,
+            'mrtVersion': None,
+            'payloadType': 'mayaAscii',
+            'payloadEncoding': 'none',
+            'payloadSize': size[0],
+            'payloadStoredSize': size[0],
+            'payloadChecksum': checksum.hexdigest(),
+            'manifest': manifest,
+            'legacy': True}
@@ -0,0 +1,120 @@
+# *************************************************************************************************************
+#
+#    mrt_fileStore.py - Source for a directory of files written by MRT, limited by the total file size and the
+#                       number of files. It's the base for the extraction cache (mrt_extractionCache) and the
+#                       auto collection store (mrt_autoCollections). It doesn't depend on maya.
+#
+#    A file in the store is identified by a file id, which is matched from its file name. The last use for
+#    a file is recorded as its modification time, and the least recently used files are removed over the limits.
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+__moduleName__ = 'mrt_fileStore'
+
+import os, re
+
+
+class MRTFileStore(object):
+    '''
+    Base for a store of files in the directory, "storePath", limited to "maxSizeMB" total file size and
+    "maxCount" files. A derived class sets "fileNameRe", which matches the file names in the store with
+    their file id as the first group, and returnFilePath() for a file id.
+    '''
+    # Matches a file name in the store, with its file id.
+    fileNameRe = re.compile(r'^(.+)$')
+
+    def __init__(self, storePath, maxSizeMB, maxCount):
+
+        self.storePath = storePath
+        self.maxSizeMB = maxSizeMB
+        self.maxCount = maxCount
+
+
+    def returnFilePath(self, fileId):
+        '''
+        Returns the path for a file in the store with a given file id.
+        '''
+        return '%s/%s' % (self.storePath, fileId)
+
+
+    def touchFile(self, fileId):
+        '''
+        Records the use of a file in the store, by updating its modification time.
+        '''
+        try:
+            os.utime(self.returnFilePath(fileId), None)
+        except OSError:
+            pass
+
+
+    def evictFiles(self, protectedFileIds=()):
+        '''
+        Removes the least recently used files until the store is within its size and count limits. Files with
+        ids in "protectedFileIds" are never removed. Returns the list of file ids removed.
+        '''
+        storeFiles = self.returnStoreFiles()
+
+        totalSize = sum([fileSize for (fileMtime, fileSize, fileId) in storeFiles])
+        totalCount = len(storeFiles)
+        maxSize = self.maxSizeMB * 1024 * 1024
+
+        removedFileIds = []
+
+        # Remove files from the least recently used.
+        for (fileMtime, fileSize, fileId) in sorted(storeFiles):
+            if totalSize <= maxSize and totalCount <= self.maxCount:
+                break
+            if fileId in protectedFileIds:
+                continue
+            try:
+                os.remove(self.returnFilePath(fileId))
+            except OSError:
+                continue
+            totalSize -= fileSize
+            totalCount -= 1
+            removedFileIds.append(fileId)
+
+        return removedFileIds
+
+
+    def purgeFiles(self, protectedFileIds=()):
+        '''
+        Removes all the files in the store, except the files with ids in "protectedFileIds".
+        Returns the list of file ids removed.
+        '''
+        removedFileIds = []
+
+        for (fileMtime, fileSize, fileId) in self.returnStoreFiles():
+            if fileId in protectedFileIds:
+                continue
+            try:
+                os.remove(self.returnFilePath(fileId))
+            except OSError:
+                continue
+            removedFileIds.append(fileId)
+
+        return removedFileIds
+
+
+    def returnStoreFiles(self):
+        '''
+        Returns a list of (modification time, size, file id) for the files in the store.
+        '''
+        storeFiles = []
+
+        if not os.path.isdir(self.storePath):
+            return storeFiles
+
+        for fileName in os.listdir(self.storePath):
+            storeFile = self.fileNameRe.match(fileName)
+            if not storeFile:
+                continue
+            try:
+                fileStat = os.stat('%s/%s' % (self.storePath, fileName))
+            except OSError:
+                continue
+            storeFiles.append((fileStat.st_mtime, fileStat.st_size, storeFile.group(1)))
+
+        return storeFiles
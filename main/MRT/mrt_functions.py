@@ -17,10 +17,15 @@ from pymel.core import melGlobals
 from pymel.core.datatypes import Point
 
 from maya.OpenMaya import MGlobal; Error = MGlobal.displayError; Warning = MGlobal.displayWarning
+import maya.api.OpenMaya as om2
 
 from functools import partial    # Alternative "from pymel.core.windows import Callback"
 import os, math, sys, re, glob, shutil, platform
 
+import mrt_moduleRegistry as mreg
+import mrt_characterMetadata as mchar
+import mrt_names as mnames
+
 melGlobals.initVar('int[]', '_mrt_utilJobList') # To store utility script jobs (eg., for module mirroring).
 
 os_name = platform.uname()[0]  # Get the OS type
@@ -259,6 +264,10 @@ def prep_MRTcontrolRig_source():
 
         os.remove(path+'cc_tmp_collect')
 
+    # Build the control rig class registry once the module is imported, after all control rig classes are defined.
+    f_file.write('\n\n# Registry for the control rig classes, see "MRTControlClassRegistry".\n')
+    f_file.write('controlClassRegistry = MRTControlClassRegistry(BaseJointControl)\n')
+
     m_file.close()
     f_file.close()
 
@@ -372,6 +381,10 @@ def cleanup_MRT_actions(jobNum=None):
     if os.path.exists(path+'mrt_controlRig.pyc'):
         os.remove(path+'mrt_controlRig.pyc')
 
+    # Remove the callbacks for the module registry and the character metadata. They're created again when used.
+    mreg.removeModuleRegistry()
+    mchar.removeCharacterMetadata()
+
     # If a scriptJob is passed in, kill it as well.
     if jobNum:
         cmds.scriptJob(kill=jobNum)
@@ -382,10 +395,10 @@ def stripMRTNamespace(moduleName):
     Separates an input string name if it has a namespace defined by MRT.
     It returns the namespace and the object name.
     '''
-    if re.match('^MRT_\D+__\w+:\w+$', moduleName):
-        namespaceInfo = str(moduleName).partition(':')
+    parsedName = mnames.parseName(moduleName)
 
-        return namespaceInfo[0], namespaceInfo[2]
+    if parsedName and parsedName.namespace:
+        return parsedName.namespace, parsedName.nodeName
 
     return None
 
@@ -396,29 +409,11 @@ def returnMRT_Namespaces(inNamespace=''):
     
     Optional "inNamespace" argument recursively looks for module 
     namespaces within a specified namespace beginning from root.
-    '''
-    # Get the current namespace, set the namespace to root.
-    currentNamespace = cmds.namespaceInfo(currentNamespace=True)
-    cmds.namespace(setNamespace=':')
-    
-    sceneNamespaces = cmds.namespaceInfo(listOnlyNamespaces=True, recurse=True)
-    
-    MRT_namespaces = []
-    
-    namespaceToMatch = '^%s:MRT_(Joint|Spline|Hinge){1}Node__\w+$' % inNamespace \
-                            if inNamespace else '^MRT_(Joint|Spline|Hinge){1}Node__\w+$'
 
-    for name in sceneNamespaces:
-        if re.match(namespaceToMatch, name):
-            MRT_namespaces.append(str(name))
-            
-    # Restore the current namespace.
-    cmds.namespace(setNamespace=currentNamespace)
-    
-    if not MRT_namespaces:
-        MRT_namespaces = None 
-    
-    return MRT_namespaces
+    The namespaces are returned from the module registry, which is kept current with the scene
+    by maya callbacks (see mrt_moduleRegistry), instead of scanning the scene namespaces each time.
+    '''
+    return mreg.returnModuleRegistry().returnNamespaces(inNamespace)
 
 
 def validateSceneModules():
@@ -503,7 +498,7 @@ def returnModuleUserSpecNames(namespaces):
     strippedNamespaces = []
 
     for namespace in namespaces:
-        userSpecifiedNames.append(namespace.rpartition('__')[2])
+        userSpecifiedNames.append(mnames.parseNamespace(namespace).userName)
         strippedNamespaces.append(namespace.rpartition('__')[0])
 
     return strippedNamespaces, userSpecifiedNames
@@ -684,10 +679,44 @@ def returnModuleTypeFromNamespace(namespace):
     Return the type of a module from it namespace.
     Eg., "MRT_HingeNode__module1:" will return "HingeNode" 
     '''
-    firstPart = namespace.partition('__')[0]
-    moduleType = firstPart.partition('_')[2]
+    return mnames.parseNamespace(namespace).moduleType
 
-    return moduleType
+
+def returnManifestForSceneModules(moduleNamespaces, characterName=None):
+    '''
+    Returns the manifest for module(s) and a character in the scene, in the same format as the manifest
+    computed from a mayaAscii scene (see mrt_manifest.returnManifestFromSceneLines()). It's used for saving
+    a module collection / character template with a mayaBinary payload, which can't be read for its manifest.
+    '''
+    modules = []
+
+    for namespace in sorted(moduleNamespaces):
+        moduleGrp = namespace+':moduleGrp'
+
+        module = {'namespace': namespace,
+                  'type': returnModuleTypeFromNamespace(namespace),
+                  'numberOfNodes': None,
+                  'moduleParent': None,
+                  'mirrorModuleNamespace': None,
+                  'proxyGeometry': cmds.objExists(namespace+':proxyGeometryGrp')}
+
+        if cmds.attributeQuery('numberOfNodes', node=moduleGrp, exists=True):
+            module['numberOfNodes'] = cmds.getAttr(moduleGrp+'.numberOfNodes')
+
+        for attribute in ('moduleParent', 'mirrorModuleNamespace'):
+            if cmds.attributeQuery(attribute, node=moduleGrp, exists=True):
+                value = cmds.getAttr(moduleGrp+'.'+attribute)
+                if value and value != 'None':
+                    module[attribute] = value
+
+        modules.append(module)
+
+    # Get the character joints, for a character template.
+    joints = []
+    if characterName:
+        joints = mchar.returnCharacterMetadata().returnSkinJoints(characterName)
+
+    return {'modules': modules, 'joints': joints}
 
 
 def loadXhandleShapePlugin():
@@ -794,48 +823,41 @@ def returnValidSelectionFlagForModuleTransformObjects(selection):
     '''
     Checks a selection for a valid module object created by MRT.
     '''
-    matchObjects = [re.compile('^MRT_\D+__\w+:module_transform$'),
-                    re.compile('^MRT_\D+__\w+:root_node_transform$'),
-                    re.compile('^MRT_\D+__\w+:end_node_transform$'),
-                    re.compile('^MRT_\D+__\w+:node_\d+_transform$'),
-                    re.compile('^MRT_\D+__\w+:spline_\d+_adjustCurve_transform$'),
-                    re.compile('^MRT_\D+__\w+:splineStartHandleTransform$'),
-                    re.compile('^MRT_\D+__\w+:splineEndHandleTransform$'),
-                    re.compile('^MRT_\D+__\w+:root_node_transform_control$'),
-                    re.compile('^MRT_\D+__\w+:end_node_transform_control$'),
-                    re.compile('^MRT_\D+__\w+:node_1_transform_control$'),
-                    re.compile('^MRT_\D+__\w+:single_orient_repr_transform$'),
-                    re.compile('^MRT_\D+__\w+:[_0-9a-z]*transform_orient_repr_transform$')]
+    parsedName = mnames.parseName(selection)
 
-    for matchObject in matchObjects:
+    return bool(parsedName and parsedName.nodeRole in mnames.MODULE_TRANSFORM_ROLES)
 
-        matchResult = matchObject.match(selection)
 
-        if matchResult:
-            return True
-
-    return False
-
-
-def concatenateCommonNamesFromHierarchyData(data, commonNames=[]):
+def concatenateCommonNamesFromHierarchyData(data, commonNames=None):
     '''
     This function works upon the hierarchy data returned by traverseParentModules() or traverseChildrenModules().
     It collects all object names uniquely in a mutable sequence (list) passed-in as an argument. 
     '''
-    if type(data) == dict:
-        for item in data:
-            if not item in commonNames:
-                commonNames += [item]
-            if isinstance(data[item], dict):
-                commonNames = concatenateCommonNamesFromHierarchyData(data[item], commonNames)
-
-    if type(data) == list:
-        for item in data:
-            if isinstance(item, list):
-                commonNames = concatenateCommonNamesFromHierarchyData(item, commonNames)
-            else:
-                if not item in commonNames:
-                    commonNames += [item]
+    if commonNames is None:
+        commonNames = []
+
+    # Names already collected, for checking uniqueness.
+    collectedNames = set(commonNames)
+
+    def collectNames(data):
+        if type(data) == dict:
+            for item in data:
+                if not item in collectedNames:
+                    collectedNames.add(item)
+                    commonNames.append(item)
+                if isinstance(data[item], dict):
+                    collectNames(data[item])
+
+        if type(data) == list:
+            for item in data:
+                if isinstance(item, list):
+                    collectNames(item)
+                elif not item in collectedNames:
+                    collectedNames.add(item)
+                    commonNames.append(item)
+
+    collectNames(data)
+
     return commonNames
 
 
@@ -871,26 +893,25 @@ def cmpCustomHierarchyStructureStrings(clsAttrString='', hierarchyString=''):
     and hence this has to be taken into account.
     
     """
-    # Break the individual strings as lists as per newlines, so each joint name occurs 
-    # as individual string items in the lists.
-    clsAttrString_items = [i for i in re.split('[ ]*\n', clsAttrString) if len(i.strip())]
-    hierarchyString_items = [i for i in re.split('[ ]*\n', hierarchyString) if len(i.strip())]
-    
-    # For "clsAttrString_items", find the common preceding space value and remove them from items.
-    paddings = [re.findall('^[ ]*', i)[0] for i in clsAttrString_items]
-    clsAttrString_items = [re.sub('^%s' % min(paddings), '', i) for i in clsAttrString_items]
-    
-    # Check if the lists are of same length, or if they have same number of joints in their descriptions.
-    if len(clsAttrString_items) == len(hierarchyString_items):
-        
-        # If each item matches,
-        for str1, str2 in zip(clsAttrString_items, hierarchyString_items):
-            if str1 != str2:
-                return False
-    else:
-        return False
+    return returnNormalizedHierarchyString(clsAttrString) == returnNormalizedHierarchyString(hierarchyString)
 
-    return True
+
+def returnNormalizedHierarchyString(hierarchyString):
+    '''
+    Returns a hierarchy tree list string (see cmpCustomHierarchyStructureStrings()) with its blank lines and
+    the spaces at the end of each line removed, and with its common preceding spaces removed from each line.
+    The normalized strings can be compared directly, or used as keys.
+    '''
+    # Break the string as a list as per newlines, so each joint name occurs as an individual string item.
+    items = [i for i in re.split('[ ]*\n', hierarchyString) if len(i.strip())]
+
+    if not items:
+        return ''
+
+    # Find the common preceding space value and remove it from the items.
+    padding = min([len(i) - len(i.lstrip(' ')) for i in items])
+
+    return '\n'.join([i[padding:] for i in items])
                 
 
 # -------------------------------------------------------------------------------------------------------------
@@ -1004,70 +1025,9 @@ def returnHierarchyTreeListStringForCustomControlRigging(rootJoint, prefix=''):
                 <JointNode>_root_node_joint
                     <JointNode>_end_node_joint
     '''
-    # DEPRECATED >>>>>
-    # if prettyPrint:
-    #    newLine = '\n'
-    #    tabLine = '\t'
-    # else:
-    #    newLine = '\\n'
-    #    tabLine = '\\t'
-    # <<<<<<
-    
-    newLine = '\n'
-    tabLine = ' ' * 4
-
-    # Stores the string attributes for the passed-in joint name.
-    jh_string = '%s<%s>%s%s' % (prefix, 
-                                cmds.getAttr(rootJoint+'.inheritedNodeType'),
-                                re.split('(_root_node_joint|_end_node_joint|_node_\d+_joint)', rootJoint)[1], 
-                                newLine)
-
-    # Check the joint for multiple children. If they have further descendents, search recursively and collect 
-    # their joint name attributes if the passed-in joint has only a single child joint.
-
-    children = cmds.listRelatives(rootJoint, children=True, type='joint')
-
-    while children:
-
-        prefix = prefix + tabLine
-
-        if len(children) == 1:
-
-            # Append the child joint name attributes.
-            jh_string += '%s<%s>%s%s' % (prefix, 
-                                         cmds.getAttr(children[0]+'.inheritedNodeType'),
-                                         re.split('(_root_node_joint|_end_node_joint|_node_\d+_joint)', children[0])[1], 
-                                         newLine)
-
-            children = cmds.listRelatives(children[0], children=True, type='joint') 
-
-        else:
-
-            children_list = []
-            allC_count_dict = {}
-
-            for child in children:
-
-                allChildren = cmds.listRelatives(child, allDescendents=True, type='joint') or []
-
-                if allC_count_dict.get(len(allChildren)):
-                    allC_count_dict[len(allChildren)].append(child)
-                else:
-                    allC_count_dict[len(allChildren)] = [child]
-
-            if len(allC_count_dict):
-
-                for item in sorted(allC_count_dict):
-                    children_list.extend(allC_count_dict[item])
-
-            if len(children_list):
-
-                for child in children_list:
-                    jh_string += returnHierarchyTreeListStringForCustomControlRigging(child, prefix)
-
-                break
-
-    return jh_string
+    # The hierarchy is walked once for a root joint, and the tree list string is cached until the DAG is
+    # changed (see mrt_moduleRegistry.MRTHierarchySnapshot).
+    return mreg.returnHierarchySnapshot(rootJoint).returnTreeString(prefix)
 
 
 def returnRootForCharacterHierarchy(joint):
@@ -1198,8 +1158,10 @@ def traverseParentModules(module_namespace):
                 moduleParentNamespace = stripMRTNamespace(moduleParentNode)[0]
                 traversed_modules += [moduleParentNamespace]
     
-                traverse_length += traverseParentModules(moduleParentNamespace)[1]
-                traversed_modules += traverseParentModules(moduleParentNamespace)[0]
+                # Traverse the parent module once for its parent modules.
+                parentTraversalInfo = traverseParentModules(moduleParentNamespace)
+                traverse_length += parentTraversalInfo[1]
+                traversed_modules += parentTraversalInfo[0]
     
     # If scene error during parent module traversal.
     except TypeError, RuntimeError:
@@ -1294,28 +1256,18 @@ def traverseConstrainedParentHierarchiesForSkeleton(rootJoint):
 
 def checkForJointDuplication():
     '''
-    Checks if a character joint has been manually duplicated in the scene.
+    Checks if a character joint has been manually duplicated in the scene. The character joints are
+    looked up by their names from an index, which is updated as joints are added, removed or renamed
+    (see mrt_moduleRegistry).
     '''
-    allJoints = cmds.ls(type='joint')
-    
-    # Get all the mrt joint names in the scene. Only the node name at the end of
-    # a DAG path.
-    mrt_joints = [item.split('|')[-1] for item in allJoints if \
-                  cmds.attributeQuery('mrtJoint', node=item, exists=True)]
-    check = True
+    duplicateJointNames = mreg.returnJointIndex().returnDuplicateJointNames()
 
-    if mrt_joints:
-    
-        for joint in mrt_joints:
-        
-            # If the joint "node" name occurs twice in the list, warn.
-            if mrt_joints.count(joint) > 1:
-                Error('MRT: One of the character joints has been manually duplicated. ' \
-                      'Please undo it in order to perform control rigging.')
-                check = False
-                break
+    if duplicateJointNames:
+        Error('MRT: One of the character joints has been manually duplicated (%s). ' \
+              'Please undo it in order to perform control rigging.' % ', '.join(duplicateJointNames))
+        return False
 
-    return check
+    return True
 
 
 def returnConstraintWeightIndexForTransform(transform, constraintNode, matchAttr=False):
@@ -1529,6 +1481,37 @@ def align(target, toAlignTransform):
     cmds.delete(cmds.parentConstraint(target, toAlignTransform, maintainOffset=False))
 
 
+def updateTransformMatrices(dagPaths):
+    '''
+    Updates the transforms for a list of DAG paths (MDagPath), by pulling their world matrices, so that
+    their dirty values are evaluated.
+    '''
+    for dagPath in dagPaths:
+        worldMatrixPlug = om2.MFnDagNode(dagPath).findPlug('worldMatrix', False)
+        worldMatrixPlug.elementByLogicalIndex(dagPath.instanceNumber()).asMObject()
+
+
+def returnTransformDagPaths(nodes):
+    '''
+    Returns a list of DAG paths (MDagPath) for the transforms in a given node list.
+    '''
+    dagPaths = []
+
+    selectionList = om2.MSelectionList()
+    for node in nodes:
+        selectionList.add(node)
+
+    for i in range(selectionList.length()):
+        try:
+            dagPath = selectionList.getDagPath(i)
+        except TypeError:
+            continue
+        if dagPath.hasFn(om2.MFn.kTransform):
+            dagPaths.append(dagPath)
+
+    return dagPaths
+
+
 def updateNodeList(nodes):
     '''
     Updates all DAG nodes in a given node list.
@@ -1536,30 +1519,22 @@ def updateNodeList(nodes):
     if not isinstance(nodes, list):
         nodes = [nodes]
 
-    cmds.setToolTo('moveSuperContext')
-
-    for node in nodes:
-        if cmds.objectType(node, isAType='transform'):
-            cmds.select(node, replace=True)  
+    updateTransformMatrices(returnTransformDagPaths(nodes))
 
+    # Leave the selection and the tool as before, when the nodes were updated by selecting them.
     cmds.select(clear=True)
-    cmds.setToolTo('selectSuperContext')    
+    cmds.setToolTo('selectSuperContext')
 
 
 def updateAllTransforms():
     '''
-    Updates all transforms created by MRT.
+    Updates all transforms created by MRT, by pulling their world matrices. Only the transforms added or made
+    dirty since the last update are updated (see mrt_moduleRegistry.MRTTransformTracker).
     '''
-    cmds.setToolTo('moveSuperContext')
-
-    nodes = [node for node in cmds.ls(type='dagNode') if \
-            re.match('^MRT_[a-zA-Z0-9_:]*(handle|transform|control){1}$', node)]
-
-    for node in nodes:
-        cmds.select(node, replace=True)  
+    updateTransformMatrices(mreg.returnTransformTracker().returnChangedTransforms())
 
     cmds.select(clear=True)
-    cmds.setToolTo('selectSuperContext')   
+    cmds.setToolTo('selectSuperContext')
 
 
 def updateContainerNodes(container):
@@ -1567,11 +1542,8 @@ def updateContainerNodes(container):
     Updates nodes within a given container.
     '''
     nodes = cmds.container(container, query=True, nodeList=True)
-    cmds.setToolTo('moveSuperContext')
 
-    for node in nodes:
-        if cmds.objectType(node, isAType='transform'):
-            cmds.select(node, replace=True)  
+    updateTransformMatrices(returnTransformDagPaths(nodes or []))
 
     cmds.select(clear=True)
     cmds.setToolTo('selectSuperContext')
@@ -1595,6 +1567,103 @@ def cleanSceneState():      # This definition is to be modified as necessary.
             cmds.delete(extra_nodes)
 
 
+def returnTransformValuesFromScene(transforms, handleSizeNode=None):
+    '''
+    Returns a list of dicts with the values for a list of transforms (module nodes), read with the maya python API 2.0.
+    The transforms are resolved to their DAG paths together, and their values are read from their plugs and world
+    matrices, instead of a separate getAttr / xform call for each value. Each dict contains the following keys:
+    'name' -> Transform name without the module namespace.
+    'translation' -> Local translation values, as returned by getAttr (a tuple).
+    'worldTranslation' -> World translation values, as returned by xform (a list).
+    'worldRotation' -> World rotation values in the transform rotation order, as returned by xform (a list).
+    'rotateOrder' -> Rotation order value.
+    'handleSize' -> Value of the "<name>_handle_size" attribute on "handleSizeNode" (the module transform), if passed-in.
+    The distance and angle values are returned in the UI units, as for getAttr / xform.
+    '''
+    selection = om2.MSelectionList()
+    for transform in transforms:
+        selection.add(transform)
+
+    if handleSizeNode:
+        handleSizeSelection = om2.MSelectionList()
+        handleSizeSelection.add(handleSizeNode)
+        handleSizeNodeFn = om2.MFnDependencyNode(handleSizeSelection.getDependNode(0))
+
+    # Factors to convert from the internal distance and angle units to the UI units.
+    distanceFactor = om2.MDistance(1.0).asUnits(om2.MDistance.uiUnit())
+    angleFactor = om2.MAngle(1.0).asUnits(om2.MAngle.uiUnit())
+
+    transformValues = []
+
+    for i, transform in enumerate(transforms):
+        dagPath = selection.getDagPath(i)
+        transformFn = om2.MFnTransform(dagPath)
+        transformName = stripMRTNamespace(transform)[1]
+
+        rotateOrder = transformFn.findPlug('rotateOrder', False).asShort()
+        translation = transformFn.translation(om2.MSpace.kTransform)
+
+        # Decompose the world matrix for the world translation and rotation values. The euler rotation order
+        # constants match the rotation order attribute values.
+        worldMatrix = om2.MTransformationMatrix(dagPath.inclusiveMatrix())
+        worldTranslation = worldMatrix.translation(om2.MSpace.kWorld)
+        worldRotation = worldMatrix.rotation(asQuaternion=False).reorder(rotateOrder)
+
+        values = {'name': transformName,
+                  'translation': tuple([value * distanceFactor for value in translation]),
+                  'worldTranslation': [value * distanceFactor for value in worldTranslation],
+                  'worldRotation': [value * angleFactor for value in (worldRotation.x, worldRotation.y, worldRotation.z)],
+                  'rotateOrder': rotateOrder}
+        if handleSizeNode:
+            values['handleSize'] = handleSizeNodeFn.findPlug(transformName+'_handle_size', False).asDouble()
+
+        transformValues.append(values)
+
+    return transformValues
+
+
+def returnAttributeValuesFromScene(node, attributes):
+    '''
+    Returns a list of values for a list of attributes on a node, read from their plugs with the maya python API 2.0
+    (see returnPlugValueFromScene()).
+    '''
+    selection = om2.MSelectionList()
+    selection.add(node)
+    nodeFn = om2.MFnDependencyNode(selection.getDependNode(0))
+
+    return [returnPlugValueFromScene(nodeFn.findPlug(attribute, False), node+'.'+attribute) for attribute in attributes]
+
+
+def returnPlugValueFromScene(plug, plugName):
+    '''
+    Returns the value for a plug (maya python API 2.0), as it's returned by getAttr for its attribute "plugName".
+    Numeric, enum, distance and angle values are read from the plug; other values are read with getAttr.
+    '''
+    attributeObj = plug.attribute()
+
+    if attributeObj.hasFn(om2.MFn.kEnumAttribute):
+        return plug.asShort()
+
+    if attributeObj.hasFn(om2.MFn.kUnitAttribute):
+        unitType = om2.MFnUnitAttribute(attributeObj).unitType()
+        if unitType == om2.MFnUnitAttribute.kDistance:
+            return plug.asMDistance().asUnits(om2.MDistance.uiUnit())
+        if unitType == om2.MFnUnitAttribute.kAngle:
+            return plug.asMAngle().asUnits(om2.MAngle.uiUnit())
+
+    elif attributeObj.hasFn(om2.MFn.kNumericAttribute):
+        numericType = om2.MFnNumericAttribute(attributeObj).numericType()
+        if numericType == om2.MFnNumericData.kBoolean:
+            return plug.asBool()
+        if numericType in (om2.MFnNumericData.kByte, om2.MFnNumericData.kChar, om2.MFnNumericData.kShort,
+                                                                                    om2.MFnNumericData.kInt):
+            return plug.asInt()
+        if numericType in (om2.MFnNumericData.kFloat, om2.MFnNumericData.kDouble):
+            return plug.asDouble()
+
+    return cmds.getAttr(plugName)
+
+
 def returnModuleAttrsFromScene(moduleNamespace):
     '''
     Called to return all module specs / attributes. Accepts an existing
@@ -1634,7 +1703,7 @@ def returnModuleAttrsFromScene(moduleNamespace):
     moduleAttrsDict['module_Namespace'] = moduleNamespace ## moduleName
 
     # Get the user specified name for the module
-    moduleAttrsDict['userSpecName'] = moduleNamespace.partition(':')[0].partition('__')[2]
+    moduleAttrsDict['userSpecName'] = mnames.parseNamespace(moduleNamespace.partition(':')[0]).userName
 
     # Mirrored module namespace (valid in case of a mirrored module pair. Setting the default value.)
     moduleAttrsDict['mirror_module_Namespace'] = moduleNamespace + '_mirror'
@@ -1675,8 +1744,8 @@ def returnModuleAttrsFromScene(moduleNamespace):
 
         # Get the module transform attributes.
         otherAttrs = cmds.listAttr(moduleNamespace+':module_transform', keyable=True, visible=True, unlocked=True)[6:]
-        for attr in otherAttrs:
-            moduleAttrsDict[attr] = cmds.getAttr(moduleNamespace+':module_transform'+'.'+attr)
+        moduleAttrsDict.update(zip(otherAttrs, returnAttributeValuesFromScene(moduleNamespace+':module_transform',
+                                                                                                        otherAttrs)))
 
         # Get the sizes, rotation orders, orientations and translation values for the module nodes.
         if numNodes == 1:
@@ -1706,21 +1775,28 @@ def returnModuleAttrsFromScene(moduleNamespace):
             all_node_orientation_transforms = filter(lambda transform:transform.endswith('orient_repr_transform'), \
                                                                                         node_orientation_Grp_allChildren)
 
+            # The orientation representation controls are created with the same keyable attribute (the rotation
+            # about the node aim axis), so it's listed once.
+            orientationAttr = cmds.listAttr(all_node_orientation_transforms[0], keyable=True, visible=True,
+                                                                                                    unlocked=True)[0]
+            orientationPlugs = [transform+'.'+orientationAttr for transform in all_node_orientation_transforms]
+            orientationSelection = om2.MSelectionList()
+            for plug in orientationPlugs:
+                orientationSelection.add(plug)
+
             node_orientation_repr_values = []
 
-            for transform in all_node_orientation_transforms:
-                orientationAttr = cmds.listAttr(transform, keyable=True, visible=True, unlocked=True)[0]
+            for i, transform in enumerate(all_node_orientation_transforms):
                 node_orientation_repr_values.append((stripMRTNamespace(transform)[1], \
-                                                                                cmds.getAttr(transform+'.'+orientationAttr)))
+                                            returnPlugValueFromScene(orientationSelection.getPlug(i), orientationPlugs[i])))
 
             moduleAttrsDict['orientation_repr_values'] = node_orientation_repr_values
 
             # Get the world orientation values for the module nodes.
             node_world_orientations = []
 
-            for transform in all_node_orientation_transforms:
-                node_world_orientations.append((stripMRTNamespace(transform)[1].partition('_orient')[0], \
-                                          cmds.xform(transform, query=True, worldSpace=True, rotation=True)))
+            for values in returnTransformValuesFromScene(all_node_orientation_transforms):
+                node_world_orientations.append((values['name'].partition('_orient')[0], values['worldRotation']))
             node_world_orientations.append(('end_node_transform', [0.0, 0.0, 0.0]))
             
             moduleAttrsDict['node_world_orientation_values'] = node_world_orientations
@@ -1734,12 +1810,13 @@ def returnModuleAttrsFromScene(moduleNamespace):
             node_rotationOrders = []
             node_handle_sizes = []
 
-            for transform in node_transform_Grp_allChildren:
-                transformName = stripMRTNamespace(transform)[1]
-                node_translations.append((transformName, cmds.getAttr(transform+'.translate')[0]))
-                node_world_translations.append((transformName, cmds.xform(transform, query=True, worldSpace=True, translation=True)))
-                node_rotationOrders.append((transformName, cmds.getAttr(transform+'.rotateOrder')))
-                node_handle_sizes.append((transformName, cmds.getAttr(moduleNamespace+':module_transform.'+transformName+'_handle_size')))
+            for values in returnTransformValuesFromScene(node_transform_Grp_allChildren,
+                                                                            moduleNamespace+':module_transform'):
+                transformName = values['name']
+                node_translations.append((transformName, values['translation']))
+                node_world_translations.append((transformName, values['worldTranslation']))
+                node_rotationOrders.append((transformName, values['rotateOrder']))
+                node_handle_sizes.append((transformName, values['handleSize']))
             
             moduleAttrsDict['node_translation_values'] = node_translations
             moduleAttrsDict['node_world_translation_values'] = node_world_translations
@@ -1767,8 +1844,8 @@ def returnModuleAttrsFromScene(moduleNamespace):
 
         # Get the start spline module transform attributes.
         otherAttrs = cmds.listAttr(moduleNamespace+':splineStartHandleTransform', keyable=True, visible=True, unlocked=True)[3:]
-        for attr in otherAttrs:
-            moduleAttrsDict[attr] = cmds.getAttr(moduleNamespace+':splineStartHandleTransform'+'.'+attr)
+        moduleAttrsDict.update(zip(otherAttrs,
+                        returnAttributeValuesFromScene(moduleNamespace+':splineStartHandleTransform', otherAttrs)))
 
         # Get the spline "axis rotate" orientation value.
         moduleAttrsDict['splineOrientation_value'] = cmds.getAttr(moduleNamespace+':splineStartHandleTransform.Axis_Rotate')
@@ -1784,8 +1861,8 @@ def returnModuleAttrsFromScene(moduleNamespace):
 
         splineAdjustCurveTransformValues = []
 
-        for transform in moduleSplineAdjustCurveGrp_allTransforms:
-            splineAdjustCurveTransformValues.append((stripMRTNamespace(transform)[1], cmds.getAttr(transform + '.translate')[0]))
+        for values in returnTransformValuesFromScene(moduleSplineAdjustCurveGrp_allTransforms):
+            splineAdjustCurveTransformValues.append((values['name'], values['translation']))
 
         moduleAttrsDict['splineAdjustCurveTransformValues'] = splineAdjustCurveTransformValues
 
@@ -1796,11 +1873,9 @@ def returnModuleAttrsFromScene(moduleNamespace):
         node_world_orientations = []
         node_world_translations = []
 
-        for transform in node_transform_Grp_allChildren:
-            node_world_translations.append((stripMRTNamespace(transform)[1], cmds.xform(transform, query=True, worldSpace=True, \
-                                                                                                            translation=True)))
-            node_world_orientations.append((stripMRTNamespace(transform)[1], cmds.xform(transform, query=True, worldSpace=True, \
-                                                                                                               rotation=True)))
+        for values in returnTransformValuesFromScene(node_transform_Grp_allChildren):
+            node_world_translations.append((values['name'], values['worldTranslation']))
+            node_world_orientations.append((values['name'], values['worldRotation']))
 
         moduleAttrsDict['node_world_translation_values'] = node_world_translations
         moduleAttrsDict['node_world_orientation_values'] = node_world_orientations
@@ -1822,8 +1897,8 @@ def returnModuleAttrsFromScene(moduleNamespace):
 
         # Get the module transform attributes.
         otherAttrs = cmds.listAttr(moduleNamespace+':module_transform', keyable=True, visible=True, unlocked=True)[6:]
-        for attr in otherAttrs:
-            moduleAttrsDict[attr] = cmds.getAttr(moduleNamespace+':module_transform'+'.'+attr)
+        moduleAttrsDict.update(zip(otherAttrs, returnAttributeValuesFromScene(moduleNamespace+':module_transform',
+                                                                                                        otherAttrs)))
 
         # Get the module node transform values (required for creating a duplicate hinge module).
         moduleIKnodesGrp = moduleNamespace+':moduleIKnodesGrp'
@@ -1833,8 +1908,8 @@ def returnModuleAttrsFromScene(moduleNamespace):
 
         node_translations = []
 
-        for transform in moduleIKnodesGrp_transforms:
-            node_translations.append((stripMRTNamespace(transform)[1], cmds.getAttr(transform+'.translate')[0]))
+        for values in returnTransformValuesFromScene(moduleIKnodesGrp_transforms):
+            node_translations.append((values['name'], values['translation']))
 
         moduleAttrsDict['node_translation_values'] = node_translations
 
@@ -1847,8 +1922,8 @@ def returnModuleAttrsFromScene(moduleNamespace):
 
         # Get the current rotation orders of module nodes (set by the user).
         node_rotationOrder = []
-        for transform in node_transform_Grp_allChildren[::-1]:
-            node_rotationOrder.append((stripMRTNamespace(transform)[1], cmds.getAttr(transform+'.rotateOrder')))
+        for values in returnTransformValuesFromScene(node_transform_Grp_allChildren[::-1]):
+            node_rotationOrder.append((values['name'], values['rotateOrder']))
 
         moduleAttrsDict['node_rotationOrder_values'] = node_rotationOrder
 
@@ -1866,11 +1941,12 @@ def returnModuleAttrsFromScene(moduleNamespace):
         node_world_orientations = []
         node_handle_sizes = []
 
-        for transform in node_transform_Grp_allChildren[::-1]:
-            transformName = stripMRTNamespace(transform)[1]
-            node_world_translations.append((transformName, cmds.xform(transform, query=True, worldSpace=True, translation=True)))
-            node_world_orientations.append((transformName, cmds.xform(transform, query=True, worldSpace=True, rotation=True)))
-            node_handle_sizes.append((transformName, cmds.getAttr(moduleNamespace+':module_transform.'+transformName+'_handle_size')))
+        for values in returnTransformValuesFromScene(node_transform_Grp_allChildren[::-1],
+                                                                            moduleNamespace+':module_transform'):
+            transformName = values['name']
+            node_world_translations.append((transformName, values['worldTranslation']))
+            node_world_orientations.append((transformName, values['worldRotation']))
+            node_handle_sizes.append((transformName, values['handleSize']))
             
         moduleAttrsDict['node_world_translation_values'] = node_world_translations
         moduleAttrsDict['node_world_orientation_values'] = node_world_orientations
@@ -2255,7 +2331,7 @@ def setupParentingForRawCharacterParts(characterJointSet, jointsMainGrp):
             # This is needed since "setupParentingForRawCharacterParts" is called after all module nodes in the scene
             # are converted to joints.
             # Eg., "MRT_HingeNode__l_leg:end_node_transform" is renamed as "l_leg_end_node_joint".
-            userSpecName = parentInfo[0].partition(':')[0].partition('__')[2]
+            userSpecName = mnames.parseName(parentInfo[0]).userName
             jointName = parentInfo[0].partition(':')[2].replace('transform', 'joint')
             parentInfo[0] = '%s_%s' % (userSpecName, jointName)
 
@@ -2606,11 +2682,13 @@ def createFKlayerDriverOnJointHierarchy(*args, **kwargs):
                 # Get the name of the root joint of this new layer.
                 layerRootJoint = newRootJoint
 
-                # Delete the ".rigLayers" attribute from the layer root joint
+                # Delete the rig layer attributes from the layer root joint
                 # (derived by copying the input joint hierarchy, by duplicating its root joint).
                 if cmds.attributeQuery('rigLayers', node=newRootJoint, exists=True):
                     cmds.setAttr(newRootJoint+'.rigLayers', lock=False)
                     cmds.deleteAttr(newRootJoint+'.rigLayers')
+                if cmds.attributeQuery(mchar.RIG_LAYERS_ATTR, node=newRootJoint, exists=True):
+                    cmds.deleteAttr(newRootJoint+'.'+mchar.RIG_LAYERS_ATTR)
 
                 # Append the new driver layer's root joint to the layer set
                 layerJointSet.append(newRootJoint)
@@ -2699,58 +2777,27 @@ def createModuleFromAttributes(moduleAttrsDict, createFromUI=False):
     currentNamespace = mel.eval('namespaceInfo -currentNamespace')
     cmds.namespace(setNamespace=':')
 
+    # The allocator for unique user specified names for the modules, seeded from the scene modules. A copy is used,
+    # since the module may not be created (the registry is invalidated when it's created).
+    nameAllocator = mreg.returnModuleRegistry().returnNameAllocator().copy()
+
     # If the module namespace in moduleAttrsDict exists, get a new namespace (while creating a duplicate module)
     if cmds.namespace(exists=moduleAttrsDict['module_Namespace']):
 
-        # Get the user specified name.
-        currentModuleUserSpecifiedName = moduleAttrsDict['userSpecName']
-
-        underscore_search = '_'
-
         # The namespace for a module has two naming parts, the first part is assigned by MRT, and the second
         # part is assigned by the user
         # Eg., "MRT_JointNode__userModuleName:", where "userModuleName" is the user specified name.
         # This user specified name can also have a numerical suffix separated by underscore,
-        # like MRT_JointNode__userModuleName_2:".
-
-        # If the current user specified name has an integer suffix separated by an underscore
-        if re.match('^\w+_[0-9]*$', currentModuleUserSpecifiedName):
-
-            # Find all occurrences of underscores in the string as a list.
-            underscore_search = re.findall('_*', currentModuleUserSpecifiedName)
-            underscore_search.reverse()
-
-            # Match and return the last underscore(which is added before the integer suffix).
-            for item in underscore_search:
-                if '_' in item:
-                    underscore_search = item
-                    break
-            # Separate the base user specified name from the integer suffix (with the underscore)
-            currentModuleUserSpecifiedNameBase = currentModuleUserSpecifiedName.rpartition(underscore_search)[0]
-        else:
-            # If not integer suffix found, proceed with the current user specified name
-            currentModuleUserSpecifiedNameBase = currentModuleUserSpecifiedName
-
-        # Get all matching module namespaces in the scene with the current base user specified name with a integer suffix.
-        currentCopyNamespacesForModule = filter(lambda namespace:re.match('^MRT_\D+__%s%s[0-9]*$'%  \
-                                                                          (currentModuleUserSpecifiedNameBase,  \
-                                                                           underscore_search), namespace), \
-                                                                            cmds.namespaceInfo(listOnlyNamespaces=True))
-        # If such module namespaces are found, find the highest integer suffix.
-        if len(currentCopyNamespacesForModule) > 0:
-            # Get the user specified names
-            currentCopyUserNamesForModule = [namespace.partition('__')[2] for namespace in currentCopyNamespacesForModule]
-            # Get the highest integer suffix.
-            suffix = findHighestNumSuffix(currentModuleUserSpecifiedNameBase, currentCopyUserNamesForModule)
-        else:
-            suffix = 0
+        # like MRT_JointNode__userModuleName_2:". The new user specified name has a numerical suffix one
+        # more than the highest suffix for the base user specified name, or 1 for the first duplicate
+        # (see mrt_names.MRTNameAllocator).
+        nameAllocator.addName(moduleAttrsDict['userSpecName'])
+        newUserSpecifiedName = nameAllocator.allocate(moduleAttrsDict['userSpecName'], firstSuffix=1)
 
         # Store the original module namespace
         moduleAttrsDict['orig_module_Namespace'] = moduleAttrsDict['module_Namespace']
         # Get the new module namespace, for the new module to be created
-        moduleAttrsDict['module_Namespace'] = 'MRT_{0}__{1}{2}{3}'.format(moduleAttrsDict['node_type'], \
-                                                                          currentModuleUserSpecifiedNameBase,   \
-                                                                          underscore_search, (suffix+1))
+        moduleAttrsDict['module_Namespace'] = 'MRT_{0}__{1}'.format(moduleAttrsDict['node_type'], newUserSpecifiedName)
         # Update the module parent info (see returnModuleAttrsFromScene())
         moduleAttrsDict['moduleParentInfo'][0][0] = moduleAttrsDict['module_Namespace']
 
@@ -2761,44 +2808,16 @@ def createModuleFromAttributes(moduleAttrsDict, createFromUI=False):
         # If the mirror module namespace in moduleAttrsDict exists, get a new namespace (while creating a duplicate module)
         if cmds.namespace(exists=moduleAttrsDict['mirror_module_Namespace']):
 
-            # Get the current mirror module user specified name
-            currentModuleUserSpecifiedName = moduleAttrsDict['mirror_module_Namespace'].partition('__')[2]
-            underscore_search = '_'
-
-            if re.match('^\w+_[0-9]*$', currentModuleUserSpecifiedName):
-
-                # Find all occurrences of underscores in the string as a list.
-                underscore_search = re.findall('_*', currentModuleUserSpecifiedName)
-                underscore_search.reverse()
-
-                # Match and return the last underscore.
-                for item in underscore_search:
-                    if '_' in item:
-                        underscore_search = item
-                        break
-                currentModuleUserSpecifiedNameBase = currentModuleUserSpecifiedName.rpartition(underscore_search)[0]
-            else:
-                currentModuleUserSpecifiedNameBase = currentModuleUserSpecifiedName
-
-            updated_namespaces_for_mirror = cmds.namespaceInfo(listOnlyNamespaces=True)
-            updated_namespaces_for_mirror.append(moduleAttrsDict['module_Namespace'])    # Add the new namspace created above
-            currentCopyNamespacesForModule = filter(lambda namespace:re.match('^MRT_\D+__%s%s[0-9]*$'%  \
-                                                                              (currentModuleUserSpecifiedNameBase,  \
-                                                                               underscore_search), namespace),  \
-                                                                                updated_namespaces_for_mirror)
-
-            if len(currentCopyNamespacesForModule) > 0:
-                currentCopyUserNamesForModule = [namespace.partition('__')[2] for namespace in currentCopyNamespacesForModule]
-                suffix = findHighestNumSuffix(currentModuleUserSpecifiedNameBase, currentCopyUserNamesForModule)
-            else:
-                suffix = 0
+            # Get a new user specified name for the mirror module, from its current user specified name.
+            mirrorUserSpecifiedName = moduleAttrsDict['mirror_module_Namespace'].partition('__')[2]
+            nameAllocator.addName(mirrorUserSpecifiedName)
+            newUserSpecifiedName = nameAllocator.allocate(mirrorUserSpecifiedName, firstSuffix=1)
 
             # Store the original mirror module namespace
             moduleAttrsDict['orig_mirror_module_Namespace'] = moduleAttrsDict['mirror_module_Namespace']
             # Get the new mirror module namespace
-            moduleAttrsDict['mirror_module_Namespace'] = 'MRT_{0}__{1}{2}{3}'.format(moduleAttrsDict['node_type'], \
-                                                                                     currentModuleUserSpecifiedNameBase, \
-                                                                                     underscore_search, (suffix+1))
+            moduleAttrsDict['mirror_module_Namespace'] = 'MRT_{0}__{1}'.format(moduleAttrsDict['node_type'], \
+                                                                               newUserSpecifiedName)
             moduleAttrsDict['moduleParentInfo'][1][0] = moduleAttrsDict['mirror_module_Namespace']
 
     # If the current module is on the '-' side of the creation plane for the mirrored module pair,
@@ -3262,7 +3281,9 @@ def setupMirrorMoveConnections(selections, moduleNamespaces):
                                         partial(updateChangedAttributeForMirrorMove, selection, mirrorObject, selectionAttrs[2])]))
 
 
-            if re.match('^MRT_\D+__\w+:splineStartHandleTransform$', selection): # A splineStartHandleTransform control ?
+            selectionRole = getattr(mnames.parseName(selection), 'nodeRole', None)
+
+            if selectionRole == 'splineStartHandleTransform': # A splineStartHandleTransform control ?
 
                 cmds.connectAttr(selection+'.translate', mirrorTranslateMultiplyDivide+'.input1')
                 cmds.connectAttr(mirrorTranslateMultiplyDivide+'.output', mirrorObject+'.translate')
@@ -3293,7 +3314,7 @@ def setupMirrorMoveConnections(selections, moduleNamespaces):
                                                         cmds.getAttr(moduleNamespace+':moduleGrp.mirrorModuleNamespace'))]))
 
 
-            if re.match('^MRT_\D+__\w+:module_transform$', selection): # Module transform ?
+            if selectionRole == 'module_transform': # Module transform ?
 
                 cmds.connectAttr(selection+'.translate', mirrorTranslateMultiplyDivide+'.input1')
                 cmds.connectAttr(mirrorTranslateMultiplyDivide+'.output', mirrorObject+'.translate')
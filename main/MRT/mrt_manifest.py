@@ -0,0 +1,384 @@
+# *************************************************************************************************************
+#
+#    mrt_manifest.py - Source for extracting the manifest for a module collection / character template from
+#                      its mayaAscii scene data, without importing it. It doesn't depend on maya.
+#
+#    The manifest lists the modules in the scene data with their attributes, and the character joints
+#    (for a character template). It's computed when a file is saved and stored in the file header, and
+#    it can be regenerated for older (legacy) files, so that the files can be searched and filtered, and
+#    the module namespace conflicts for installing a file can be found, without an import.
+#
+#    It also resolves the module namespace conflicts for installing a module collection into a scene, and
+#    renames the module namespaces in the scene data before it's imported.
+#
+#    The scene data for a module collection can be split into sections by module group (a module, with its
+#    mirror module), so that a subset of modules can be installed, see returnSceneLineSections().
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+__moduleName__ = 'mrt_manifest'
+
+import re
+
+import mrt_names as mnames
+
+# Matches the node name for a "createNode" or a "select" statement.
+_nodeNameRe = re.compile(r'^(?:createNode\s+\w+.*?\s-n|select\s+-ne)\s+"([^"]+)"')
+
+# Matches an MRT module namespace for a node name, with its module type.
+_moduleNodeRe = re.compile(r'^:?(MRT_(\w+?Node)__\w+):(\w+)$')
+
+# Matches the attribute name and the value for a "setAttr" statement.
+_setAttrRe = re.compile(r'^\s+setAttr\s+(?:-\w+\s+(?:on|off|true|false|\d+)\s+)*"\.(\w+)"\s+(.*?);?\s*$')
+
+# Matches a string value for a "setAttr" statement.
+_stringValueRe = re.compile(r'^-type\s+"string"\s+"((?:[^"\\]|\\.)*)"')
+
+# Module group attributes collected for the manifest, with their value types.
+_moduleGrpAttributes = {'numberOfNodes': int, 'moduleParent': str, 'mirrorModuleNamespace': str}
+
+# Matches a module namespace in a scene line (bytes).
+_moduleNamespaceBytesRe = re.compile(br'(?<!\w)MRT_(?:Joint|Spline|Hinge)Node__\w+')
+
+# Matches the parent node name for a "createNode" statement.
+_parentNameRe = re.compile(r'\s-p\s+"([^"]+)"')
+
+# Top-level statements which apply to the current node, as with its indented attribute statements.
+_nodeStatements = (b'setAttr', b'addAttr', b'lockNode', b'rename')
+
+# Scene sections, in the order they appear in a maya scene. A "head" section has the statements before the
+# first node (file info and requirements), "nodes" sections have the node statements and "connections"
+# sections have the statements for connections within a module group. A "links" section has the
+# statements for connections between module groups.
+SCENE_SECTIONS = ('head', 'nodes', 'connections', 'links')
+
+
+def returnManifestFromSceneFile(filePath):
+    '''
+    Returns the manifest for a mayaAscii scene file. The file is read line by line.
+    '''
+    sceneFile = open(filePath, 'rb')
+    try:
+        manifest = returnManifestFromSceneLines(sceneFile)
+    finally:
+        sceneFile.close()
+
+    return manifest
+
+
+def returnManifestFromSceneLines(lines):
+    '''
+    Returns the manifest from an iterable of mayaAscii scene lines (bytes or str).
+
+    The manifest is a dict with the following keys:
+    'modules' -> A list of module dicts, sorted by namespace, each with the keys:
+                 'namespace' -> Module namespace, e.g., "MRT_JointNode__module1".
+                 'type' -> Module type, e.g., "JointNode".
+                 'numberOfNodes' -> Number of module nodes (None, if not found).
+                 'moduleParent' -> Module parent, "<module node>,<parent type>" (None, if the module has no parent).
+                 'mirrorModuleNamespace' -> Namespace for the mirror module (None, if not a mirrored module).
+                 'proxyGeometry' -> True if the module has proxy geometry.
+    'joints' -> A list of character joints, from the "skinJointList" attribute for a character (for a template).
+    '''
+    modules = {}
+    joints = []
+
+    # Module dict for the current node, if it's a module group. The current node is set by the last
+    # "createNode" or "select" statement, and it's used by the "setAttr" statements that follow.
+    currentModuleGrp = None
+
+    for line in lines:
+        if not isinstance(line, str):
+            line = line.decode('latin1')
+
+        if line.startswith('createNode ') or line.startswith('select '):
+            currentModuleGrp = None
+
+            nodeName = _nodeNameRe.match(line)
+            if not nodeName:
+                continue
+
+            # Check if the node is in a module namespace.
+            moduleNode = _moduleNodeRe.match(nodeName.group(1))
+            if not moduleNode:
+                continue
+
+            namespace, moduleType, name = moduleNode.groups()
+            module = modules.get(namespace)
+            if module is None:
+                module = modules[namespace] = {'namespace': namespace,
+                                               'type': moduleType,
+                                               'numberOfNodes': None,
+                                               'moduleParent': None,
+                                               'mirrorModuleNamespace': None,
+                                               'proxyGeometry': False}
+            if name == 'moduleGrp':
+                currentModuleGrp = module
+            elif name == 'proxyGeometryGrp':
+                module['proxyGeometry'] = True
+
+        elif line.startswith('\tsetAttr'):
+            # Only the module group attributes and the character joint list are needed, skip other
+            # attribute values without parsing.
+            if currentModuleGrp is None and '.skinJointList"' not in line:
+                continue
+
+            attribute = _setAttrRe.match(line)
+            if not attribute:
+                continue
+            attributeName, value = attribute.groups()
+
+            if attributeName == 'skinJointList':
+                value = _returnStringValue(value)
+                if value:
+                    joints.extend([joint for joint in value.split(',') if joint])
+
+            elif currentModuleGrp is not None and attributeName in _moduleGrpAttributes:
+                if _moduleGrpAttributes[attributeName] is int:
+                    try:
+                        value = int(value.split()[0])
+                    except (ValueError, IndexError):
+                        continue
+                else:
+                    value = _returnStringValue(value)
+                    if value == 'None':
+                        value = None
+                currentModuleGrp[attributeName] = value
+
+    return {'modules': [modules[namespace] for namespace in sorted(modules)], 'joints': joints}
+
+
+def _returnStringValue(value):
+    '''
+    Returns the string value for a "setAttr" statement value, or None if it's not a string.
+    '''
+    stringValue = _stringValueRe.match(value)
+    if not stringValue:
+        return None
+
+    return stringValue.group(1).replace('\\"', '"').replace('\\\\', '\\')
+
+
+def returnNamespaceRemapping(namespaces, sceneNamespaces=(), nameAllocator=None):
+    '''
+    Returns a dict of new module namespaces by their namespace, for the passed-in module namespaces to
+    be installed into a scene with existing module namespaces. A module is renamed if its user specified
+    name (the part of the namespace after "__") is used by a scene module, by adding a numerical suffix
+    to the name, e.g., "MRT_JointNode__arm" -> "MRT_JointNode__arm_2". Namespaces without a conflict are
+    not included.
+
+    The new names are allocated from a name allocator (mrt_names.MRTNameAllocator) with the scene user specified
+    names. A name allocator can be passed-in to install modules from multiple files, in which case the names
+    for the installed modules are added to it.
+    '''
+    remapping = {}
+
+    if nameAllocator is None:
+        nameAllocator = mnames.MRTNameAllocator()
+    for namespace in sceneNamespaces:
+        nameAllocator.addName(namespace.rpartition('__')[2])
+
+    conflictNamespaces = [namespace for namespace in namespaces \
+                                        if nameAllocator.hasName(namespace.rpartition('__')[2])]
+
+    # Add the names without a conflict before the new names are allocated, so that they're not allocated.
+    for namespace in namespaces:
+        nameAllocator.addName(namespace.rpartition('__')[2])
+
+    for namespace in conflictNamespaces:
+        moduleTypespace, userSpecName = namespace.rpartition('__')[::2]
+        remapping[namespace] = '%s__%s' % (moduleTypespace, nameAllocator.allocate(userSpecName))
+
+    return remapping
+
+
+def returnNamespaceRemapFunction(remapping):
+    '''
+    Returns a function which renames the module namespaces in a scene line (bytes) using a remapping dict
+    returned by returnNamespaceRemapping(). This renames the module nodes as well as the references to
+    the module namespaces in the string attribute values, such as "moduleParent" and "mirrorModuleNamespace".
+    '''
+    bytesRemapping = dict([(namespace.encode('utf-8'), newNamespace.encode('utf-8')) \
+                                                    for (namespace, newNamespace) in remapping.items()])
+
+    def replaceNamespace(match):
+        return bytesRemapping.get(match.group(0), match.group(0))
+
+    def remapLine(line):
+        if b'MRT_' not in line:
+            return line
+        return _moduleNamespaceBytesRe.sub(replaceNamespace, line)
+
+    return remapLine
+
+
+def returnRequiredModuleNamespaces(manifest, namespaces):
+    '''
+    Returns a set of module namespaces to be installed from a module collection manifest, for a subset of its
+    modules. These include the passed-in modules with their mirror modules, and all their parent modules in
+    the collection (with their mirror modules).
+    '''
+    modules = dict([(module['namespace'], module) for module in manifest['modules']])
+
+    requiredNamespaces = set()
+    namespacesToCheck = [namespace for namespace in namespaces if namespace in modules]
+
+    while namespacesToCheck:
+        namespace = namespacesToCheck.pop()
+        if namespace in requiredNamespaces:
+            continue
+        requiredNamespaces.add(namespace)
+
+        module = modules[namespace]
+        for relatedNamespace in (module['mirrorModuleNamespace'],
+                                 _returnModuleParentNamespace(module['moduleParent'])):
+            if relatedNamespace in modules and relatedNamespace not in requiredNamespaces:
+                namespacesToCheck.append(relatedNamespace)
+
+    return requiredNamespaces
+
+
+def returnModuleGroups(manifest):
+    '''
+    Returns a dict of module group names by module namespace, for the modules in a manifest. A module and its
+    mirror module are in the same group, so that they're always installed together. A group is named by
+    the first module namespace in it (sorted).
+    '''
+    modules = dict([(module['namespace'], module) for module in manifest['modules']])
+
+    moduleGroups = {}
+
+    for namespace, module in modules.items():
+        groupNamespaces = [namespace]
+        if module['mirrorModuleNamespace'] in modules:
+            groupNamespaces.append(module['mirrorModuleNamespace'])
+        moduleGroups[namespace] = min(groupNamespaces)
+
+    return moduleGroups
+
+
+def returnSceneLineSections(lines, moduleGroups):
+    '''
+    Returns a generator of (section, module group, line) for an iterable of mayaAscii scene lines (bytes),
+    for splitting the scene data by module group (see returnModuleGroups()). The section is one of
+    SCENE_SECTIONS. The module group is None for the lines which don't belong to a module group (such as the
+    file info, and the nodes outside the module namespaces), and for the "links" section.
+
+    The lines are returned in their original order, so the scene data can be stored in runs of lines for each
+    module group, to be imported with all or some of its module groups (see mrt_fileFormat). A node belongs to the module group for its parent node, if it has one (so that a node is
+    always imported with its parent), or else to the module group for its namespace.
+    '''
+    section, group = 'head', None
+
+    # Module groups for the nodes created so far, by node name (without a DAG path), for the child nodes.
+    nodeGroups = {}
+
+    for line in lines:
+        # Indented (and empty) lines continue the current statement.
+        if line[:1] in (b'\t', b' ') or not line.strip() or line.startswith(_nodeStatements):
+            yield section, group, line
+            continue
+
+        # Comment lines (such as the file info, and the end of the file) don't belong to a module group.
+        if line.startswith(b'//'):
+            yield section, None, line
+            continue
+
+        if line.startswith(b'createNode ') or line.startswith(b'select '):
+            section, group = 'nodes', None
+
+            nodeLine = line.decode('latin1')
+            nodeName = _nodeNameRe.match(nodeLine)
+            parentName = _parentNameRe.search(nodeLine)
+            if parentName:
+                parentName = parentName.group(1)
+                if parentName.rpartition('|')[2] in nodeGroups:
+                    group = nodeGroups[parentName.rpartition('|')[2]]
+                else:
+                    group = _returnNodeModuleGroup(parentName, moduleGroups)
+            if group is None and nodeName:
+                group = _returnNodeModuleGroup(nodeName.group(1), moduleGroups)
+            if nodeName and line.startswith(b'createNode '):
+                nodeGroups[nodeName.group(1).rpartition('|')[2]] = group
+
+        elif section != 'head':
+            # Statements for connections (and others) after the nodes.
+            groups = returnSceneLineModuleGroups(line, moduleGroups)
+            if len(groups) > 1:
+                section, group = 'links', None
+            else:
+                section, group = 'connections', groups.pop() if groups else None
+
+        yield section, group, line
+
+
+def _returnNodeModuleGroup(nodeName, moduleGroups):
+    '''
+    Returns the module group for the (first) module namespace in a node name or a DAG path, or None.
+    '''
+    namespace = _moduleNamespaceBytesRe.search(nodeName.encode('latin1'))
+    if namespace:
+        return moduleGroups.get(namespace.group(0).decode('latin1'))
+
+    return None
+
+
+def returnSceneLineModuleGroups(line, moduleGroups):
+    '''
+    Returns a set of module groups for the module namespaces in a scene line (bytes).
+    '''
+    if b'MRT_' not in line:
+        return set()
+
+    groups = set()
+    for namespace in _moduleNamespaceBytesRe.findall(line):
+        group = moduleGroups.get(namespace.decode('latin1'))
+        if group is not None:
+            groups.add(group)
+
+    return groups
+
+
+def returnModuleSceneLines(lines, moduleGroups, namespaces):
+    '''
+    Returns a generator for the mayaAscii scene lines (bytes) for a subset of modules, from an iterable of
+    scene lines. The lines for the module groups without a passed-in module namespace are skipped. The lines
+    are in their original order.
+    '''
+    groups = set([moduleGroups[namespace] for namespace in namespaces if namespace in moduleGroups])
+
+    for section, group, line in returnSceneLineSections(lines, moduleGroups):
+        if section == 'links':
+            if returnSceneLineModuleGroups(line, moduleGroups).issubset(groups):
+                yield line
+        elif group is None or group in groups:
+            yield line
+
+
+def returnCommonNodeNames(lines):
+    '''
+    Returns a set of the names for the nodes created outside the module namespaces (and without a parent
+    node in a module namespace), from an iterable of mayaAscii scene lines (bytes).
+    '''
+    nodeNames = set()
+
+    for line in lines:
+        if not line.startswith(b'createNode ') or _moduleNamespaceBytesRe.search(line):
+            continue
+        nodeName = _nodeNameRe.match(line.decode('latin1'))
+        if nodeName:
+            nodeNames.add(nodeName.group(1))
+
+    return nodeNames
+
+
+def _returnModuleParentNamespace(moduleParent):
+    '''
+    Returns the module namespace for a "moduleParent" value, "<module node>,<parent type>", or None.
+    '''
+    if not moduleParent:
+        return None
+
+    return moduleParent.split(',')[0].lstrip(':').partition(':')[0] or None
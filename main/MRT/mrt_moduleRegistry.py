@@ -0,0 +1,1003 @@
+# *************************************************************************************************************
+#
+#    mrt_moduleRegistry.py - Source for the registry of the modules in the current scene, used for looking up
+#                            module namespaces, module types and mirror module pairs without scanning the scene
+#                            namespaces for each lookup.
+#
+#    The registry is built from the scene namespaces when it's first used, and it's invalidated (to be built
+#    again for the next lookup) by maya API callbacks: when a scene is opened, created, imported, or a reference
+#    is loaded / unloaded, when a module container is added or removed, when a node is renamed, and on undo /
+#    redo. Adding, moving or removing a namespace doesn't trigger any maya API callback, so MRT invalidates the
+#    registry explicitly after it changes the module namespaces (see MRTModuleRegistry.invalidate()).
+#
+#    Invalidating the registry only resets it, but the next lookup builds it again from all the scene
+#    namespaces, with a getAttr for each module, i.e., O(number of namespaces). The node added / removed
+#    callbacks are limited to containers (each module has a module container), so that the nodes created
+#    while editing a module don't invalidate it. Any node rename still does.
+#
+#    The module hierarchy (from the module parent info for each module) is returned with MRTModuleGraph.
+#
+#    The character joints (with the "mrtJoint" attribute) are indexed by their names with MRTJointIndex, for
+#    checking if a character joint has been duplicated. The index is updated with maya API callbacks for
+#    joints added, removed and renamed, and is built again after a scene is opened, created or imported, and
+#    on undo / redo.
+#
+#    The MRT transforms changed since they were last updated (see mrt_functions.updateAllTransforms()) are tracked
+#    with MRTTransformTracker, so that only those are updated: the transforms added, and the tracked transforms
+#    made dirty (with node dirty callbacks), with the transforms below them. The scene is searched once after it's
+#    opened or created.
+#
+#    The joint hierarchy from a character root joint is walked once with MRTHierarchySnapshot, for its hierarchy
+#    tree list string (see mrt_functions.returnHierarchyTreeListStringForCustomControlRigging()). The snapshots
+#    are cached by root joint with MRTHierarchySnapshotCache, which is cleared by maya API callbacks for DAG
+#    changes (parent / child changes), nodes renamed, undo / redo, and scene changes.
+#
+#    The character main groups in the scene (with their auto module collection file ids) are cached with
+#    MRTCharacterRegistry, which is invalidated by maya API callbacks for scene and DAG changes.
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+__moduleName__ = 'mrt_moduleRegistry'
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om2
+
+import re, hashlib
+
+import mrt_names as mnames
+
+# Matches a module namespace (as the last name in a namespace path), with the module type.
+_moduleNamespaceRe = re.compile(r'^MRT_(Joint|Spline|Hinge)Node__\w+$')
+
+# Scene messages after which the registry is invalidated.
+_sceneMessages = ('kAfterNew', 'kAfterOpen', 'kAfterImport', 'kAfterCreateReference', 'kAfterLoadReference',
+                  'kAfterUnloadReference', 'kAfterRemoveReference', 'kAfterImportReference')
+
+# Events after which the registry is invalidated.
+_events = ('NameChanged', 'Undo', 'Redo')
+
+# The registries, the joint index, the transform tracker and the hierarchy snapshot cache for the current maya session,
+# see returnModuleRegistry(), returnJointIndex(), returnTransformTracker(), returnHierarchySnapshot() and
+# returnCharacterRegistry().
+_registry = None
+_jointIndex = None
+_transformTracker = None
+_hierarchySnapshotCache = None
+_characterRegistry = None
+
+
+class MRTModuleRegistry(object):
+    '''
+    Registry for the modules in the current scene. The lookups are from dicts, which are built from the
+    scene namespaces once after the registry is invalidated.
+    '''
+    def __init__(self):
+
+        # Module namespaces, by their parent namespace ('' for the root namespace).
+        self._namespaces = None
+
+        # Module types and mirror module namespaces, by module namespace.
+        self._moduleTypes = None
+        self._mirrorNamespaces = None
+
+        # Name allocator for the module user specified names, seeded from the root module namespaces.
+        self._nameAllocator = None
+
+        self._callbackIds = []
+
+
+    def addCallbacks(self):
+        '''
+        Adds the maya API callbacks for invalidating the registry.
+        '''
+        if self._callbackIds:
+            return
+
+        for message in _sceneMessages:
+            self._callbackIds.append(om2.MSceneMessage.addCallback(getattr(om2.MSceneMessage, message),
+                                                                                            self._invalidateCallback))
+        for event in _events:
+            self._callbackIds.append(om2.MEventMessage.addEventCallback(event, self._invalidateCallback))
+
+        # A module is created / deleted with its module container.
+        self._callbackIds.append(om2.MDGMessage.addNodeAddedCallback(self._invalidateCallback, 'container'))
+        self._callbackIds.append(om2.MDGMessage.addNodeRemovedCallback(self._invalidateCallback, 'container'))
+
+
+    def removeCallbacks(self):
+        '''
+        Removes the maya API callbacks added by addCallbacks().
+        '''
+        if self._callbackIds:
+            om2.MMessage.removeCallbacks(self._callbackIds)
+        self._callbackIds = []
+
+
+    def invalidate(self):
+        '''
+        Invalidates the registry, so that it's built again for the next lookup. It's called after a module
+        namespace is added, moved or removed, since there's no maya API callback for namespace changes.
+        '''
+        self._namespaces = None
+
+
+    def returnNamespaces(self, inNamespace=''):
+        '''
+        Returns a list of the module namespaces in the scene, or None if there are none, as returned by
+        mrt_functions.returnMRT_Namespaces(). The optional "inNamespace" returns the module namespaces in a
+        namespace (from root).
+        '''
+        self._build()
+
+        namespaces = self._namespaces.get(inNamespace)
+
+        return list(namespaces) if namespaces else None
+
+
+    def returnModuleType(self, namespace):
+        '''
+        Returns the module type for a module namespace in the scene ("JointNode", "SplineNode" or "HingeNode"),
+        or None, if the module doesn't exist.
+        '''
+        self._build()
+
+        return self._moduleTypes.get(namespace)
+
+
+    def returnMirrorNamespace(self, namespace):
+        '''
+        Returns the namespace for the mirror module for a module namespace in the scene, or None, if the module
+        isn't part of a mirror module pair.
+        '''
+        self._build()
+
+        return self._mirrorNamespaces.get(namespace)
+
+
+    def returnNameAllocator(self):
+        '''
+        Returns the name allocator (mrt_names.MRTNameAllocator) for the user specified names for the module
+        namespaces in the root namespace. It's seeded once after the registry is built, and the names allocated
+        from it are kept until the registry is invalidated (when the module container is created).
+        '''
+        self._build()
+
+        if self._nameAllocator is None:
+            self._nameAllocator = mnames.MRTNameAllocator([mnames.parseNamespace(namespace).userName \
+                                                                for namespace in self._namespaces.get('', [])])
+        return self._nameAllocator
+
+
+    def _build(self):
+        '''
+        Builds the registry from the scene namespaces, if it's invalidated.
+        '''
+        if self._namespaces is not None:
+            return
+
+        # Get the current namespace, set the namespace to root.
+        currentNamespace = cmds.namespaceInfo(currentNamespace=True)
+        cmds.namespace(setNamespace=':')
+
+        sceneNamespaces = cmds.namespaceInfo(listOnlyNamespaces=True, recurse=True) or []
+
+        # Restore the current namespace.
+        cmds.namespace(setNamespace=currentNamespace)
+
+        namespaces = {}
+        moduleTypes = {}
+        mirrorNamespaces = {}
+
+        for name in sceneNamespaces:
+            name = str(name)
+            parentNamespace, sep, moduleName = name.rpartition(':')
+            moduleNamespace = _moduleNamespaceRe.match(moduleName)
+            if not moduleNamespace:
+                continue
+            namespaces.setdefault(parentNamespace, []).append(name)
+            moduleTypes[name] = moduleNamespace.group(1)+'Node'
+
+            mirrorAttribute = name+':moduleGrp.mirrorModuleNamespace'
+            if cmds.objExists(mirrorAttribute):
+                mirrorNamespaces[name] = str(cmds.getAttr(mirrorAttribute))
+
+        self._namespaces = namespaces
+        self._moduleTypes = moduleTypes
+        self._mirrorNamespaces = mirrorNamespaces
+        self._nameAllocator = None
+
+
+    def _invalidateCallback(self, *args):
+        '''
+        Called by the maya API callbacks to invalidate the registry.
+        '''
+        self._namespaces = None
+
+
+class MRTModuleGraph(object):
+    '''
+    Module hierarchy for the scene modules, with the parent and children adjacency built in one pass from the
+    "moduleParent" attribute for each module. The ancestors, descendants and subtree for a module are returned
+    in linear time in the number of modules. If "namespaces" isn't passed-in, the graph is built for all the
+    modules in the scene (from the module registry).
+    '''
+    def __init__(self, namespaces=None):
+
+        if namespaces is None:
+            namespaces = returnModuleRegistry().returnNamespaces() or []
+
+        # Parent module namespace (or None), and the list of child module namespaces, by module namespace.
+        self.parents = {}
+        self.children = {}
+
+        for namespace in namespaces:
+            self.children.setdefault(namespace, [])
+            self.parents[namespace] = None
+
+            moduleParentAttribute = namespace+':moduleGrp.moduleParent'
+            if not cmds.objExists(moduleParentAttribute):
+                continue
+            # The module parent info is stored as "<parent module node>,<parent type>".
+            moduleParent = cmds.getAttr(moduleParentAttribute)
+            if moduleParent and moduleParent != 'None':
+                parentNamespace = str(moduleParent.split(',')[0].partition(':')[0])
+                self.parents[namespace] = parentNamespace
+                self.children.setdefault(parentNamespace, []).append(namespace)
+
+
+    def returnParent(self, namespace):
+        '''
+        Returns the parent module namespace for a module, or None.
+        '''
+        return self.parents.get(namespace)
+
+
+    def returnChildren(self, namespace):
+        '''
+        Returns a list of the direct child module namespaces for a module.
+        '''
+        return list(self.children.get(namespace, []))
+
+
+    def returnAncestors(self, namespace):
+        '''
+        Returns a list of the ancestor module namespaces for a module, from its parent to the root module.
+        '''
+        ancestors = []
+        visited = set([namespace])
+
+        parentNamespace = self.parents.get(namespace)
+
+        # Stop at a module already visited, for a (malformed) cyclic module parent info.
+        while parentNamespace is not None and parentNamespace not in visited:
+            ancestors.append(parentNamespace)
+            visited.add(parentNamespace)
+            parentNamespace = self.parents.get(parentNamespace)
+
+        return ancestors
+
+
+    def returnDescendants(self, namespace):
+        '''
+        Returns a list of the descendant module namespaces for a module, in breadth-first order.
+        '''
+        descendants = []
+        visited = set([namespace])
+
+        queue = [namespace]
+        for currentNamespace in queue:
+            for childNamespace in self.children.get(currentNamespace, []):
+                if childNamespace not in visited:
+                    visited.add(childNamespace)
+                    descendants.append(childNamespace)
+                    queue.append(childNamespace)
+
+        return descendants
+
+
+    def returnSubtree(self, namespace):
+        '''
+        Returns a list of the module namespaces in the subtree for a module (the module and its descendants).
+        '''
+        return [namespace] + self.returnDescendants(namespace)
+
+
+class MRTJointIndex(object):
+    '''
+    Index for the character joints in the scene by their names (without the DAG path), for checking if a
+    character joint has been duplicated. The joints are tracked by their MObjectHandle hash codes.
+
+    A joint is added as pending when it's created (its "mrtJoint" attribute is added after it's created),
+    and the pending joints are checked when the index is queried, or when they're renamed. A pending joint
+    stays pending until it has the "mrtJoint" attribute or it's removed, so the cost of a query depends only
+    on the number of joints added since the index was built. The index is built again after a scene change
+    and on undo / redo.
+    '''
+    def __init__(self):
+
+        # Joint names and MObjectHandles for the character joints, by hash code.
+        self._jointNames = {}
+        self._jointHandles = {}
+
+        # Hash codes for the character joints, by joint name, and the names with more than one joint.
+        self._namedJoints = {}
+        self._duplicateNames = set()
+
+        # MObjectHandles for the joints added which aren't character joints yet, by hash code.
+        self._pendingJoints = {}
+
+        # Build the index from the scene joints for the next query.
+        self._rebuild = True
+
+        self._callbackIds = []
+
+
+    def addCallbacks(self):
+        '''
+        Adds the maya API callbacks for updating the index.
+        '''
+        if self._callbackIds:
+            return
+
+        for message in _sceneMessages:
+            self._callbackIds.append(om2.MSceneMessage.addCallback(getattr(om2.MSceneMessage, message),
+                                                                                            self._rebuildCallback))
+        for event in ('Undo', 'Redo'):
+            self._callbackIds.append(om2.MEventMessage.addEventCallback(event, self._rebuildCallback))
+
+        self._callbackIds.append(om2.MDGMessage.addNodeAddedCallback(self._jointAddedCallback, 'joint'))
+        self._callbackIds.append(om2.MDGMessage.addNodeRemovedCallback(self._jointRemovedCallback, 'joint'))
+        self._callbackIds.append(om2.MNodeMessage.addNameChangedCallback(om2.MObject.kNullObj,
+                                                                                    self._nameChangedCallback))
+
+
+    def removeCallbacks(self):
+        '''
+        Removes the maya API callbacks added by addCallbacks().
+        '''
+        if self._callbackIds:
+            om2.MMessage.removeCallbacks(self._callbackIds)
+        self._callbackIds = []
+
+
+    def returnDuplicateJointNames(self):
+        '''
+        Returns a sorted list of the names for the character joints which have been duplicated (with more
+        than one joint with the same name), or an empty list.
+        '''
+        self._update()
+
+        return sorted(self._duplicateNames)
+
+
+    def _update(self):
+        '''
+        Builds the index from the scene joints if needed, or adds the pending joints which are character joints
+        (and keeps the others pending).
+        '''
+        if self._rebuild:
+            self._jointNames.clear()
+            self._jointHandles.clear()
+            self._namedJoints.clear()
+            self._duplicateNames.clear()
+            self._pendingJoints.clear()
+
+            jointIter = om2.MItDependencyNodes(om2.MFn.kJoint)
+            while not jointIter.isDone():
+                self._addJoint(om2.MObjectHandle(jointIter.thisNode()))
+                jointIter.next()
+
+            self._rebuild = False
+            return
+
+        for hashCode, jointHandle in list(self._pendingJoints.items()):
+            if not jointHandle.isValid() or self._addJoint(jointHandle):
+                del self._pendingJoints[hashCode]
+
+
+    def _addJoint(self, jointHandle):
+        '''
+        Adds a joint to the index, if it's a character joint. Returns True if it's a character joint.
+        '''
+        jointFn = om2.MFnDependencyNode(jointHandle.object())
+        if not jointFn.hasAttribute('mrtJoint'):
+            return False
+
+        hashCode = jointHandle.hashCode()
+        if hashCode in self._jointNames:
+            return True
+
+        jointName = jointFn.name()
+        self._jointNames[hashCode] = jointName
+        self._jointHandles[hashCode] = jointHandle
+
+        namedJoints = self._namedJoints.setdefault(jointName, set())
+        namedJoints.add(hashCode)
+        if len(namedJoints) > 1:
+            self._duplicateNames.add(jointName)
+
+        return True
+
+
+    def _removeJoint(self, hashCode):
+        '''
+        Removes a joint from the index, by its hash code.
+        '''
+        self._pendingJoints.pop(hashCode, None)
+
+        jointName = self._jointNames.pop(hashCode, None)
+        if jointName is None:
+            return
+        del self._jointHandles[hashCode]
+
+        namedJoints = self._namedJoints[jointName]
+        namedJoints.discard(hashCode)
+        if len(namedJoints) < 2:
+            self._duplicateNames.discard(jointName)
+        if not namedJoints:
+            del self._namedJoints[jointName]
+
+
+    def _rebuildCallback(self, *args):
+        '''
+        Called by the maya API scene and undo / redo callbacks, to build the index again for the next query.
+        '''
+        self._rebuild = True
+
+
+    def _jointAddedCallback(self, node, *args):
+        '''
+        Called by the maya API callback for a joint added, to add it as pending.
+        '''
+        if not self._rebuild:
+            jointHandle = om2.MObjectHandle(node)
+            self._pendingJoints[jointHandle.hashCode()] = jointHandle
+
+
+    def _jointRemovedCallback(self, node, *args):
+        '''
+        Called by the maya API callback for a joint removed, to remove it from the index.
+        '''
+        if not self._rebuild:
+            self._removeJoint(om2.MObjectHandle(node).hashCode())
+
+
+    def _nameChangedCallback(self, node, previousName, *args):
+        '''
+        Called by the maya API callback for a node renamed, to update the name for a character joint. A pending
+        joint is added if it's a character joint, since a duplicated joint is renamed after it's created.
+        '''
+        if self._rebuild:
+            return
+        hashCode = om2.MObjectHandle(node).hashCode()
+        if hashCode in self._jointNames:
+            jointHandle = self._jointHandles[hashCode]
+            self._removeJoint(hashCode)
+            self._addJoint(jointHandle)
+        elif hashCode in self._pendingJoints:
+            if self._addJoint(self._pendingJoints[hashCode]):
+                del self._pendingJoints[hashCode]
+
+
+class MRTTransformTracker(object):
+    '''
+    Tracks the MRT transforms in the scene which have changed since they were last returned, by their
+    MObjectHandles: the transforms added, and the tracked transforms made dirty (moved, constrained, or with
+    an input connection changed), with their MRT transforms below them in the DAG. The scene is searched for all
+    the MRT transforms once after a scene is opened or created, and they're all returned for the next query.
+    '''
+    def __init__(self):
+
+        # MObjectHandles for the tracked MRT transforms, and the ids for their node dirty callbacks, by hash code.
+        self._transforms = {}
+        self._dirtyCallbackIds = {}
+
+        # MObjectHandles for the transforms added and the tracked transforms made dirty since the last query,
+        # by hash code. The names for the transforms added are checked at the next query.
+        self._addedTransforms = {}
+        self._dirtyTransforms = {}
+
+        # Search the scene for the MRT transforms for the next query.
+        self._searchScene = True
+
+        self._callbackIds = []
+
+
+    def addCallbacks(self):
+        '''
+        Adds the maya API callbacks for tracking the transforms.
+        '''
+        if self._callbackIds:
+            return
+
+        # The transforms from an import or a reference are tracked as they're added.
+        for message in ('kAfterNew', 'kAfterOpen'):
+            self._callbackIds.append(om2.MSceneMessage.addCallback(getattr(om2.MSceneMessage, message),
+                                                                                            self._resetCallback))
+
+        self._callbackIds.append(om2.MDGMessage.addNodeAddedCallback(self._transformAddedCallback, 'transform'))
+        self._callbackIds.append(om2.MDGMessage.addNodeRemovedCallback(self._transformRemovedCallback, 'transform'))
+
+
+    def removeCallbacks(self):
+        '''
+        Removes the maya API callbacks added by addCallbacks(), and the node dirty callbacks for the transforms.
+        '''
+        if self._callbackIds:
+            om2.MMessage.removeCallbacks(self._callbackIds)
+        self._callbackIds = []
+
+        self._untrackTransforms()
+
+
+    def returnChangedTransforms(self):
+        '''
+        Returns a list of DAG paths (MDagPath) for the MRT transforms added since the last query, and the tracked
+        MRT transforms made dirty since the last query with the tracked transforms below them (or all the MRT
+        transforms in the scene, for the first query after a scene is opened or created). The transform names
+        are checked when they're queried, since a transform is usually renamed after it's created.
+        '''
+        if self._searchScene:
+            self._untrackTransforms()
+            transformIter = om2.MItDag(om2.MItDag.kDepthFirst, om2.MFn.kTransform)
+            transformHandles = []
+            while not transformIter.isDone():
+                transformHandles.append(om2.MObjectHandle(transformIter.currentItem()))
+                transformIter.next()
+            self._searchScene = False
+        else:
+            transformHandles = list(self._addedTransforms.values())
+
+        dirtyTransforms = self._dirtyTransforms
+        self._addedTransforms = {}
+        self._dirtyTransforms = {}
+
+        changedTransforms = {}
+
+        # Track the MRT transforms added.
+        for transformHandle in transformHandles:
+            if not transformHandle.isValid():
+                continue
+            if mnames.TRANSFORM_NAME_RE.match(om2.MFnDependencyNode(transformHandle.object()).name()):
+                self._trackTransform(transformHandle)
+                changedTransforms[transformHandle.hashCode()] = transformHandle
+
+        # Add the tracked transforms below the dirty transforms, since their world matrices depend on them.
+        for hashCode, transformHandle in dirtyTransforms.items():
+            if hashCode in changedTransforms or not transformHandle.isValid():
+                continue
+            changedTransforms[hashCode] = transformHandle
+            transformIter = om2.MItDag(om2.MItDag.kDepthFirst, om2.MFn.kTransform)
+            transformIter.reset(transformHandle.object(), om2.MItDag.kDepthFirst, om2.MFn.kTransform)
+            transformIter.next()
+            while not transformIter.isDone():
+                childHandle = om2.MObjectHandle(transformIter.currentItem())
+                if childHandle.hashCode() in self._transforms:
+                    changedTransforms[childHandle.hashCode()] = childHandle
+                transformIter.next()
+
+        return [om2.MDagPath.getAPathTo(transformHandle.object()) for transformHandle in changedTransforms.values()]
+
+
+    def _trackTransform(self, transformHandle):
+        '''
+        Tracks an MRT transform, with a node dirty callback for it.
+        '''
+        hashCode = transformHandle.hashCode()
+
+        if hashCode in self._transforms:
+            return
+
+        self._transforms[hashCode] = transformHandle
+        self._dirtyCallbackIds[hashCode] = om2.MNodeMessage.addNodeDirtyCallback(transformHandle.object(),
+                                                                                    self._transformDirtyCallback)
+
+
+    def _untrackTransforms(self):
+        '''
+        Removes all the tracked transforms, with their node dirty callbacks.
+        '''
+        if self._dirtyCallbackIds:
+            om2.MMessage.removeCallbacks(list(self._dirtyCallbackIds.values()))
+
+        self._transforms = {}
+        self._dirtyCallbackIds = {}
+        self._dirtyTransforms = {}
+
+
+    def _resetCallback(self, *args):
+        '''
+        Called by the maya API scene callbacks, to search the scene for the MRT transforms for the next query.
+        '''
+        self._untrackTransforms()
+        self._addedTransforms = {}
+        self._searchScene = True
+
+
+    def _transformAddedCallback(self, node, *args):
+        '''
+        Called by the maya API callback for a transform added (including joints, and the transforms restored by
+        undo / redo).
+        '''
+        if not self._searchScene:
+            transformHandle = om2.MObjectHandle(node)
+            self._addedTransforms[transformHandle.hashCode()] = transformHandle
+
+
+    def _transformRemovedCallback(self, node, *args):
+        '''
+        Called by the maya API callback for a transform removed, to stop tracking it.
+        '''
+        hashCode = om2.MObjectHandle(node).hashCode()
+
+        self._addedTransforms.pop(hashCode, None)
+        self._dirtyTransforms.pop(hashCode, None)
+
+        if hashCode in self._transforms:
+            del self._transforms[hashCode]
+            om2.MMessage.removeCallback(self._dirtyCallbackIds.pop(hashCode))
+
+
+    def _transformDirtyCallback(self, node, *args):
+        '''
+        Called by the maya API node dirty callback for a tracked transform.
+        '''
+        transformHandle = om2.MObjectHandle(node)
+        self._dirtyTransforms[transformHandle.hashCode()] = transformHandle
+
+
+class MRTHierarchySnapshot(object):
+    '''
+    Snapshot of the joint hierarchy from a character root joint, walked once from the DAG. It has the names of
+    the joints below the root joint ("joints", as partial DAG path names), the hierarchy tree list string
+    ("treeString", see mrt_functions.returnHierarchyTreeListStringForCustomControlRigging()) and a signature
+    for the tree string ("signature", as its sha1 hex digest).
+    '''
+    def __init__(self, rootJoint):
+
+        self.rootJoint = rootJoint
+
+        selectionList = om2.MSelectionList()
+        selectionList.add(rootJoint)
+        rootPath = selectionList.getDagPath(0)
+        rootName = rootPath.partialPathName()
+
+        # Direct joint children (in DAG order), the number of joints below (including those under non-joint
+        # children), and the function set (or the node type attribute value, when read) for each joint, by name.
+        self._jointChildren = {}
+        self._descendantCounts = {}
+        self._nodeTypes = {}
+
+        self.joints = []
+
+        # Walk the DAG below the root joint depth first, with the (name, is joint) for the children of each node.
+        visited = []
+        stack = [rootPath]
+        while stack:
+            dagPath = stack.pop()
+            name = dagPath.partialPathName()
+
+            childPaths = []
+            for i in range(dagPath.childCount()):
+                childPath = om2.MDagPath(dagPath)
+                childPath.push(dagPath.child(i))
+                childPaths.append(childPath)
+            stack.extend(reversed(childPaths))
+
+            children = [(childPath.partialPathName(), childPath.hasFn(om2.MFn.kJoint)) for childPath in childPaths]
+            visited.append((name, children))
+            self._jointChildren[name] = [childName for (childName, isJoint) in children if isJoint]
+
+            if dagPath.hasFn(om2.MFn.kJoint):
+                self._nodeTypes[name] = om2.MFnDependencyNode(dagPath.node())
+                if name != rootName:
+                    self.joints.append(name)
+
+        # Count the joints below each node, from the last visited (the children are counted before their parent).
+        for name, children in reversed(visited):
+            self._descendantCounts[name] = sum([self._descendantCounts[childName] + isJoint \
+                                                                        for (childName, isJoint) in children])
+
+        self.treeString = self._returnTreeString(rootName)
+        self.signature = hashlib.sha1(self.treeString.encode('utf-8')).hexdigest()
+
+
+    def returnTreeString(self, prefix=''):
+        '''
+        Returns the hierarchy tree list string, with a prefix for each line.
+        '''
+        if not prefix:
+            return self.treeString
+
+        return ''.join([prefix+line for line in self.treeString.splitlines(True)])
+
+
+    def _returnJointLine(self, joint, prefix):
+        '''
+        Returns the line for a joint in the tree string, with its node type and joint type.
+        '''
+        nodeType = self._nodeTypes[joint]
+        if isinstance(nodeType, om2.MFnDependencyNode):
+            nodeType = nodeType.findPlug('inheritedNodeType', False).asString()
+            self._nodeTypes[joint] = nodeType
+
+        return '%s<%s>%s\n' % (prefix, nodeType, mnames.CHARACTER_JOINT_TYPE_RE.split(joint)[1])
+
+
+    def _returnTreeString(self, joint, prefix=''):
+        '''
+        Returns the tree string from a joint, as returnHierarchyTreeListStringForCustomControlRigging() did from
+        the scene. A joint chain is added line by line, and at a joint with multiple children, the tree string
+        for each child is added, ordered by the number of joints below the child.
+        '''
+        treeString = self._returnJointLine(joint, prefix)
+
+        children = self._jointChildren[joint]
+
+        while children:
+
+            prefix = prefix + ' ' * 4
+
+            if len(children) == 1:
+                treeString += self._returnJointLine(children[0], prefix)
+                children = self._jointChildren[children[0]]
+            else:
+                # The children are ordered by the number of joints below, and in DAG order for the same number.
+                for child in sorted(children, key=lambda child: self._descendantCounts[child]):
+                    treeString += self._returnTreeString(child, prefix)
+                break
+
+        return treeString
+
+
+class MRTHierarchySnapshotCache(object):
+    '''
+    Cache for the hierarchy snapshots (MRTHierarchySnapshot) by root joint. The cache is cleared by maya API
+    callbacks, for any DAG change (parent / child added, removed or reordered), nodes removed or renamed,
+    undo / redo, and scene changes.
+    '''
+    def __init__(self):
+
+        self._snapshots = {}
+
+        self._callbackIds = []
+
+
+    def addCallbacks(self):
+        '''
+        Adds the maya API callbacks for clearing the cache.
+        '''
+        if self._callbackIds:
+            return
+
+        for message in _sceneMessages:
+            self._callbackIds.append(om2.MSceneMessage.addCallback(getattr(om2.MSceneMessage, message),
+                                                                                            self._clearCallback))
+        for event in _events:
+            self._callbackIds.append(om2.MEventMessage.addEventCallback(event, self._clearCallback))
+
+        self._callbackIds.append(om2.MDagMessage.addAllDagChangesCallback(self._clearCallback))
+        self._callbackIds.append(om2.MDGMessage.addNodeRemovedCallback(self._clearCallback, 'dagNode'))
+
+
+    def removeCallbacks(self):
+        '''
+        Removes the maya API callbacks added by addCallbacks().
+        '''
+        if self._callbackIds:
+            om2.MMessage.removeCallbacks(self._callbackIds)
+        self._callbackIds = []
+
+
+    def returnSnapshot(self, rootJoint):
+        '''
+        Returns the hierarchy snapshot for a root joint, from the cache, or walked from the DAG.
+        '''
+        snapshot = self._snapshots.get(rootJoint)
+
+        if snapshot is None:
+            snapshot = MRTHierarchySnapshot(rootJoint)
+            self._snapshots[rootJoint] = snapshot
+
+        return snapshot
+
+
+    def _clearCallback(self, *args):
+        '''
+        Called by the maya API callbacks, to clear the cache.
+        '''
+        if self._snapshots:
+            self._snapshots = {}
+
+
+class MRTCharacterRegistry(object):
+    '''
+    Registry for the characters in the current scene. The character main groups (the scene assemblies with the
+    "mrtCharacterVersion" attribute) and their auto module collection file ids are found once after the registry
+    is invalidated.
+    '''
+    def __init__(self):
+
+        # Character main groups, and the auto module collection file id by character main group.
+        self._characterGrps = None
+        self._collectionFileIDs = None
+
+        self._callbackIds = []
+
+
+    def addCallbacks(self):
+        '''
+        Adds the maya API callbacks for invalidating the registry.
+        '''
+        if self._callbackIds:
+            return
+
+        for message in _sceneMessages:
+            self._callbackIds.append(om2.MSceneMessage.addCallback(getattr(om2.MSceneMessage, message),
+                                                                                            self._invalidateCallback))
+        for event in _events:
+            self._callbackIds.append(om2.MEventMessage.addEventCallback(event, self._invalidateCallback))
+
+        self._callbackIds.append(om2.MDagMessage.addAllDagChangesCallback(self._invalidateCallback))
+        self._callbackIds.append(om2.MDGMessage.addNodeAddedCallback(self._invalidateCallback, 'transform'))
+        self._callbackIds.append(om2.MDGMessage.addNodeRemovedCallback(self._invalidateCallback, 'transform'))
+
+
+    def removeCallbacks(self):
+        '''
+        Removes the maya API callbacks added by addCallbacks().
+        '''
+        if self._callbackIds:
+            om2.MMessage.removeCallbacks(self._callbackIds)
+        self._callbackIds = []
+
+
+    def invalidate(self):
+        '''
+        Invalidates the registry, so that the characters are found again for the next lookup. It's called after
+        a character main group is created and its attributes are set (which doesn't trigger a callback).
+        '''
+        self._characterGrps = None
+
+
+    def returnCharacterGroups(self):
+        '''
+        Returns a list of the character main groups in the scene.
+        '''
+        self._build()
+
+        return list(self._characterGrps)
+
+
+    def returnCollectionFileID(self, characterGrp):
+        '''
+        Returns the auto module collection file id for a character main group, or None.
+        '''
+        self._build()
+
+        return self._collectionFileIDs.get(characterGrp)
+
+
+    def _build(self):
+        '''
+        Finds the characters in the scene, if the registry has been invalidated.
+        '''
+        if self._characterGrps is not None:
+            return
+
+        self._characterGrps = []
+        self._collectionFileIDs = {}
+
+        for transform in cmds.ls(assemblies=True):
+            if cmds.attributeQuery('mrtCharacterVersion', node=transform, exists=True):
+                self._characterGrps.append(transform)
+                if cmds.attributeQuery('collectionFileID', node=transform, exists=True):
+                    self._collectionFileIDs[transform] = cmds.getAttr(transform+'.collectionFileID')
+
+
+    def _invalidateCallback(self, *args):
+        '''
+        Called by the maya API callbacks, to invalidate the registry.
+        '''
+        self._characterGrps = None
+
+
+def returnModuleRegistry():
+    '''
+    Returns the module registry for the current maya session. It's created, with its callbacks, when it's
+    first used.
+    '''
+    global _registry
+
+    if _registry is None:
+        _registry = MRTModuleRegistry()
+        _registry.addCallbacks()
+
+    return _registry
+
+
+def returnJointIndex():
+    '''
+    Returns the character joint index for the current maya session. It's created, with its callbacks, when it's
+    first used.
+    '''
+    global _jointIndex
+
+    if _jointIndex is None:
+        _jointIndex = MRTJointIndex()
+        _jointIndex.addCallbacks()
+
+    return _jointIndex
+
+
+def returnTransformTracker():
+    '''
+    Returns the MRT transform tracker for the current maya session. It's created, with its callbacks, when it's
+    first used.
+    '''
+    global _transformTracker
+
+    if _transformTracker is None:
+        _transformTracker = MRTTransformTracker()
+        _transformTracker.addCallbacks()
+
+    return _transformTracker
+
+
+def returnHierarchySnapshot(rootJoint):
+    '''
+    Returns the hierarchy snapshot for a character root joint (see MRTHierarchySnapshot), from the hierarchy
+    snapshot cache for the current maya session. The cache is created, with its callbacks, when it's first used.
+    '''
+    global _hierarchySnapshotCache
+
+    if _hierarchySnapshotCache is None:
+        _hierarchySnapshotCache = MRTHierarchySnapshotCache()
+        _hierarchySnapshotCache.addCallbacks()
+
+    return _hierarchySnapshotCache.returnSnapshot(rootJoint)
+
+
+def returnCharacterRegistry():
+    '''
+    Returns the character registry for the current maya session. It's created, with its callbacks, when it's
+    first used.
+    '''
+    global _characterRegistry
+
+    if _characterRegistry is None:
+        _characterRegistry = MRTCharacterRegistry()
+        _characterRegistry.addCallbacks()
+
+    return _characterRegistry
+
+
+def removeModuleRegistry():
+    '''
+    Removes the callbacks for the module registry, the joint index, the transform tracker, the hierarchy
+    snapshot cache and the character registry for the current maya session (for example, before this module
+    is reloaded).
+    '''
+    global _registry, _jointIndex, _transformTracker, _hierarchySnapshotCache, _characterRegistry
+
+    if _registry is not None:
+        _registry.removeCallbacks()
+        _registry = None
+
+    if _jointIndex is not None:
+        _jointIndex.removeCallbacks()
+        _jointIndex = None
+
+    if _transformTracker is not None:
+        _transformTracker.removeCallbacks()
+        _transformTracker = None
+
+    if _hierarchySnapshotCache is not None:
+        _hierarchySnapshotCache.removeCallbacks()
+        _hierarchySnapshotCache = None
+
+    if _characterRegistry is not None:
+        _characterRegistry.removeCallbacks()
+        _characterRegistry = None
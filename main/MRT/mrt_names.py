@@ -0,0 +1,322 @@
+# *************************************************************************************************************
+#
+#    mrt_names.py - Source for parsing the names for MRT module objects and character joints, with precompiled
+#                   patterns. It doesn't depend on maya.
+#
+#    A name is parsed into an MRTName tuple, with the module namespace and the object name (for a module
+#    object), the module type, the user specified name, the node role (for example, "root_node_transform" or
+#    "node_joint"), the node index (for a node with a numbered name) and the mirror flag (for a mirror module).
+#    The parsed names are cached in a bounded LRU cache, since the same names are parsed repeatedly by the
+#    selection callbacks.
+#
+#    It also has the allocators for unique names with a numerical suffix, for the module user specified names
+#    (e.g., "arm" -> "arm_2") and the names in the UI lists (e.g., "collection" -> "collection (2)").
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+__moduleName__ = 'mrt_names'
+
+import re, collections
+
+# Parsed MRT name. The namespace and the object name are None for a character joint, and the module type is None
+# for a character joint (it's stored as the "inheritedNodeType" attribute on the joint).
+MRTName = collections.namedtuple('MRTName', ['namespace', 'nodeName', 'moduleType', 'userName', 'nodeRole',
+                                                                                            'nodeIndex', 'mirror'])
+
+# Matches a name for an object in a module namespace.
+MODULE_OBJECT_RE = re.compile(r'^MRT_\D+__\w+:\w+$')
+
+# Matches a name for an MRT transform, which is updated by mrt_functions.updateAllTransforms().
+TRANSFORM_NAME_RE = re.compile(r'^MRT_[a-zA-Z0-9_:]*(handle|transform|control){1}$')
+
+# Matches the name for a character joint, with its joint type.
+CHARACTER_JOINT_TYPE_RE = re.compile(r'(_root_node_joint|_end_node_joint|_node_\d+_joint)')
+
+# Object names for the module transforms (which can be selected for module operations), with their node roles.
+# A numbered node role has its node index as the last group.
+_moduleTransformRes = [('module_transform', re.compile(r'^module_transform$')),
+                       ('root_node_transform', re.compile(r'^root_node_transform$')),
+                       ('end_node_transform', re.compile(r'^end_node_transform$')),
+                       ('node_transform', re.compile(r'^node_(\d+)_transform$')),
+                       ('spline_adjustCurve_transform', re.compile(r'^spline_(\d+)_adjustCurve_transform$')),
+                       ('splineStartHandleTransform', re.compile(r'^splineStartHandleTransform$')),
+                       ('splineEndHandleTransform', re.compile(r'^splineEndHandleTransform$')),
+                       ('root_node_transform_control', re.compile(r'^root_node_transform_control$')),
+                       ('end_node_transform_control', re.compile(r'^end_node_transform_control$')),
+                       ('node_transform_control', re.compile(r'^node_(1)_transform_control$')),
+                       ('single_orient_repr_transform', re.compile(r'^single_orient_repr_transform$')),
+                       ('orient_repr_transform', re.compile(r'^[_0-9a-z]*transform_orient_repr_transform$'))]
+
+# Node roles for the module transforms.
+MODULE_TRANSFORM_ROLES = frozenset([role for (role, roleRe) in _moduleTransformRes])
+
+# Character joint names, with their node roles (in the order of the joint name types returned by
+# MRT_UI.returnValidFlagForCharacterJoint()) and the user specified name as the first group.
+_characterJointRes = [('node_joint', re.compile(r'^(\w+)_node_(\d+)_joint$')),
+                      ('root_node_joint', re.compile(r'^(\w+)_root_node_joint$')),
+                      ('end_node_joint', re.compile(r'^(\w+)_end_node_joint$'))]
+
+# Node roles for the character joints, with their joint name types.
+CHARACTER_JOINT_ROLES = dict([(role, i+1) for i, (role, roleRe) in enumerate(_characterJointRes)])
+
+# Maximum number of parsed names in the cache.
+CACHE_SIZE = 4096
+
+# Suffix for the user specified name for a mirror module.
+_mirrorSuffix = '_mirror'
+
+
+class MRTNameCache(object):
+    '''
+    Bounded LRU cache for parsed names. When it's full, the least recently used name is removed.
+    '''
+    def __init__(self, maxSize=CACHE_SIZE):
+
+        self.maxSize = maxSize
+
+        # Parsed names, by name, in the order they were last used.
+        self._names = collections.OrderedDict()
+
+
+    def get(self, name):
+        '''
+        Returns a tuple (True, parsed name) for a cached name (which is moved to the end as the most recently
+        used), or (False, None).
+        '''
+        try:
+            parsedName = self._names.pop(name)
+        except KeyError:
+            return False, None
+
+        self._names[name] = parsedName
+
+        return True, parsedName
+
+
+    def set(self, name, parsedName):
+        '''
+        Adds a parsed name to the cache, and removes the least recently used name if the cache is full.
+        '''
+        self._names[name] = parsedName
+
+        if len(self._names) > self.maxSize:
+            self._names.popitem(last=False)
+
+
+    def clear(self):
+        '''
+        Removes all names from the cache.
+        '''
+        self._names.clear()
+
+
+# The caches for the parsed names and the parsed namespaces.
+_nameCache = MRTNameCache()
+_namespaceCache = MRTNameCache()
+
+
+def parseName(name):
+    '''
+    Returns the parsed name (MRTName) for a module object name (with its module namespace) or a character
+    joint name, or None, if it's not an MRT name. The parsed names are cached.
+    '''
+    cached, parsedName = _nameCache.get(name)
+
+    if not cached:
+        parsedName = _parseName(name)
+        _nameCache.set(name, parsedName)
+
+    return parsedName
+
+
+def parseNamespace(namespace):
+    '''
+    Returns the parsed name (MRTName) for a module namespace, with only its module type, user specified name
+    and mirror flag. The parsed namespaces are cached.
+    '''
+    cached, parsedName = _namespaceCache.get(namespace)
+
+    if not cached:
+        parsedName = _parseNamespace(namespace)
+        _namespaceCache.set(namespace, parsedName)
+
+    return parsedName
+
+
+def _parseNamespace(namespace, nodeName=None, nodeRole=None, nodeIndex=None):
+    '''
+    Parses a module namespace, "MRT_<module type>__<user specified name>". The module type is before the first
+    "__", and the user specified name is after the last "__".
+    '''
+    moduleType = namespace.partition('__')[0].partition('_')[2]
+    userName = namespace.rpartition('__')[2].rstrip(':')
+
+    return MRTName(namespace, nodeName, moduleType, userName, nodeRole, nodeIndex, userName.endswith(_mirrorSuffix))
+
+
+def _parseName(name):
+    '''
+    Parses a module object name or a character joint name, without the cache.
+    '''
+    # Module object.
+    if MODULE_OBJECT_RE.match(name):
+        namespace, sep, nodeName = str(name).partition(':')
+
+        nodeRole = nodeIndex = None
+        for role, roleRe in _moduleTransformRes:
+            roleMatch = roleRe.match(nodeName)
+            if roleMatch:
+                nodeRole = role
+                if roleMatch.groups():
+                    nodeIndex = int(roleMatch.group(1))
+                break
+
+        return _parseNamespace(namespace, nodeName, nodeRole, nodeIndex)
+
+    # Character joint.
+    for role, roleRe in _characterJointRes:
+        roleMatch = roleRe.match(name)
+        if roleMatch:
+            userName = roleMatch.group(1)
+            nodeIndex = int(roleMatch.group(2)) if role == 'node_joint' else None
+            return MRTName(None, None, None, userName, role, nodeIndex, userName.endswith(_mirrorSuffix))
+
+    return None
+
+
+def clearCache():
+    '''
+    Removes all parsed names from the caches.
+    '''
+    _nameCache.clear()
+    _namespaceCache.clear()
+
+
+class MRTNameAllocator(object):
+    '''
+    Allocates unique names for module user specified names. A name in use gets a numerical suffix, separated by
+    underscore(s), one more than the highest suffix for its base name, e.g., "arm" or "arm_1" -> "arm_2", with
+    "arm" and "arm_1" in use. The suffix is at least the first suffix, "arm" -> "arm_2" by default, with only
+    "arm" in use. The highest suffix is kept for each base name as the names are added, so that a name is
+    allocated without searching all the names in use.
+    '''
+    # Matches a name with a numerical suffix, with the base name, the separator and the suffix.
+    suffixRe = re.compile(r'^(\w+?)(_+)(\d*)$')
+
+    # Separator for the suffix, for a name without a separator.
+    separator = '_'
+
+    def __init__(self, names=()):
+
+        # Names in use.
+        self._names = set()
+
+        # Highest numerical suffix, by base name.
+        self._highestSuffixes = {}
+
+        for name in names:
+            self.addName(name)
+
+
+    def copy(self):
+        '''
+        Returns a copy of the allocator, e.g., to allocate names which may not be used.
+        '''
+        allocator = self.__class__()
+        allocator._names = set(self._names)
+        allocator._highestSuffixes = dict(self._highestSuffixes)
+
+        return allocator
+
+
+    def addName(self, name):
+        '''
+        Adds a name in use.
+        '''
+        self._names.add(name)
+
+        suffixMatch = self.suffixRe.match(name)
+
+        if suffixMatch and suffixMatch.group(3):
+            baseName, suffix = suffixMatch.group(1), int(suffixMatch.group(3))
+            if suffix > self._highestSuffixes.get(baseName, -1):
+                self._highestSuffixes[baseName] = suffix
+
+
+    def hasName(self, name):
+        '''
+        Checks if a name is in use.
+        '''
+        return name in self._names
+
+
+    def returnUniqueName(self, name, firstSuffix=2):
+        '''
+        Returns the name if it's not in use, or a new name with a numerical suffix. The suffix is one more than the
+        highest suffix in use for the base name, and at least "firstSuffix". The name isn't added as in use.
+        '''
+        if name not in self._names:
+            return name
+
+        baseName, separator = self._returnBaseName(name)
+        suffix = max(self._highestSuffixes.get(baseName, 0) + 1, firstSuffix)
+        uniqueName = self._formatName(baseName, separator, suffix)
+
+        # A name with the suffix may be in use with a different separator.
+        while uniqueName in self._names:
+            suffix += 1
+            uniqueName = self._formatName(baseName, separator, suffix)
+
+        return uniqueName
+
+
+    def allocate(self, name, firstSuffix=2):
+        '''
+        Returns a unique name for a name (see returnUniqueName()), and adds it as in use.
+        '''
+        uniqueName = self.returnUniqueName(name, firstSuffix)
+        self.addName(uniqueName)
+
+        return uniqueName
+
+
+    def _returnBaseName(self, name):
+        '''
+        Returns the base name (without its numerical suffix) and the separator for a new suffix for a name.
+        '''
+        suffixMatch = self.suffixRe.match(name)
+
+        if suffixMatch:
+            return suffixMatch.group(1), suffixMatch.group(2)
+
+        return name, self.separator
+
+
+    def _formatName(self, baseName, separator, suffix):
+        '''
+        Returns a name with a numerical suffix.
+        '''
+        return '%s%s%s' % (baseName, separator, suffix)
+
+
+class MRTListNameAllocator(MRTNameAllocator):
+    '''
+    Allocates unique names for the names in a UI list, e.g., for the module collections. A name in use gets a
+    numerical suffix in brackets, e.g., "collection" -> "collection (2)".
+    '''
+    suffixRe = re.compile(r'^(.+) \(()(\d+)\)$')
+
+    def _returnBaseName(self, name):
+        '''
+        Returns the name as the base name, since the suffix is added to the name in use.
+        '''
+        return name, ''
+
+
+    def _formatName(self, baseName, separator, suffix):
+        '''
+        Returns a name with a numerical suffix in brackets.
+        '''
+        return '%s (%s)' % (baseName, suffix)
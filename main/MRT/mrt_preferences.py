@@ -0,0 +1,256 @@
+# *************************************************************************************************************
+#
+#    mrt_preferences.py - Source for the preferences store used by the MRT UI, for the UI preferences and the
+#                         saved module collection / character template lists. It doesn't depend on maya.
+#
+#    A store is loaded once and read from memory. Modified values are written (flushed) together later,
+#    to a temporary file which is then renamed, so that the file on disk is never partially written. The
+#    file is re-loaded if it's modified by another maya session (checked with its modification time), and
+#    the values modified in this session are kept over it. Since the values are merged by key, the saved
+#    module collection / character template lists are keyed by their file paths, so that a file removed
+#    in one session can't remove a different file saved by another session under the same key.
+#
+#    Can be modified or copied for your own purpose.
+#
+# *************************************************************************************************************
+
+__moduleName__ = 'mrt_preferences'
+
+import os, time
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import mrt_fileFormat as mfile
+
+# Minimum interval in seconds between the checks for the store file modified by another session.
+CHECK_INTERVAL = 1.0
+
+
+class MRTPreferences(object):
+    '''
+    Dict-like store for preference values, saved as a pickled dict at "filePath". If the file doesn't
+    exist, the store starts with a copy of "defaults".
+
+    Modified values are flushed to disk with a deferred call to flush(), requested through "deferFunction"
+    (for maya, maya.utils.executeDeferred), so that the values modified together are written once. If a
+    "deferFunction" isn't passed-in, the values are flushed when they're modified.
+    '''
+    def __init__(self, filePath, defaults=None, deferFunction=None):
+
+        self.filePath = filePath
+        self.deferFunction = deferFunction
+
+        self._data = {}
+
+        # Keys modified (or removed) in this session since the last flush.
+        self._modifiedKeys = set()
+
+        # Clear all values on disk with the next flush.
+        self._cleared = False
+
+        self._flushPending = False
+
+        # Modification time for the store file when it was last read or written, and the last check time.
+        self._fileMtime = None
+        self._lastCheckTime = 0
+
+        if not self._load():
+            self._data = dict(defaults or {})
+            self._cleared = True
+            self._requestFlush()
+
+
+    def __getitem__(self, key):
+
+        self._checkForFileChange()
+
+        return self._data[key]
+
+
+    def __setitem__(self, key, value):
+
+        self._data[key] = value
+        self._modifiedKeys.add(key)
+        self._requestFlush()
+
+
+    def __delitem__(self, key):
+
+        del self._data[key]
+        self._modifiedKeys.add(key)
+        self._requestFlush()
+
+
+    def __contains__(self, key):
+
+        self._checkForFileChange()
+
+        return key in self._data
+
+
+    def __len__(self):
+
+        self._checkForFileChange()
+
+        return len(self._data)
+
+
+    def get(self, key, default=None):
+        '''
+        Returns the value for a key, or "default" if it doesn't exist.
+        '''
+        self._checkForFileChange()
+
+        return self._data.get(key, default)
+
+
+    def setDefault(self, key, value):
+        '''
+        Sets the value for a key if it doesn't exist (for a preference added with a newer MRT version),
+        and returns its value.
+        '''
+        if key not in self:
+            self[key] = value
+
+        return self._data[key]
+
+
+    def update(self, values):
+        '''
+        Sets the values from a dict.
+        '''
+        for (key, value) in values.items():
+            self[key] = value
+
+
+    def replace(self, values):
+        '''
+        Replaces all the values in the store with the values from a dict.
+        '''
+        self._data = dict(values)
+        self._modifiedKeys.clear()
+        self._cleared = True
+        self._requestFlush()
+
+
+    def returnData(self):
+        '''
+        Returns a copy of all the values in the store, as a dict.
+        '''
+        self._checkForFileChange()
+
+        return dict(self._data)
+
+
+    def flush(self):
+        '''
+        Writes the values modified in this session to disk. The store file is re-loaded first if it's been
+        modified by another session, so that its values for other keys are kept.
+        '''
+        self._flushPending = False
+
+        if not self._modifiedKeys and not self._cleared:
+            return
+
+        data = dict(self._data)
+
+        if not self._cleared:
+            # Merge the modified values over the values currently on disk.
+            diskData = self._returnFileData()
+            if diskData is not None:
+                for key in self._modifiedKeys:
+                    diskData.pop(key, None)
+                    if key in data:
+                        diskData[key] = data[key]
+                data = diskData
+
+        tempFilePath = '%s.%s.tmp' % (self.filePath, os.getpid())
+        tempFile = open(tempFilePath, 'wb')
+        try:
+            pickle.dump(data, tempFile, pickle.HIGHEST_PROTOCOL)
+        finally:
+            tempFile.close()
+
+        mfile.replaceFile(tempFilePath, self.filePath)
+
+        self._data = data
+        self._modifiedKeys.clear()
+        self._cleared = False
+        self._fileMtime = self._returnFileMtime()
+
+
+    def _requestFlush(self):
+        '''
+        Requests a deferred flush, if one isn't already pending.
+        '''
+        if self.deferFunction is None:
+            self.flush()
+            return
+
+        if not self._flushPending:
+            self._flushPending = True
+            self.deferFunction(self.flush)
+
+
+    def _load(self):
+        '''
+        Loads the values from the store file. Returns False if the file can't be read.
+        '''
+        data = self._returnFileData()
+        if data is None:
+            return False
+
+        self._data = data
+        self._fileMtime = self._returnFileMtime()
+
+        return True
+
+
+    def _returnFileData(self):
+        '''
+        Returns the dict from the store file, or None if the file is missing or unreadable.
+        '''
+        try:
+            storeFile = open(self.filePath, 'rb')
+            try:
+                return pickle.load(storeFile)
+            finally:
+                storeFile.close()
+        except Exception:
+            return None
+
+
+    def _returnFileMtime(self):
+        '''
+        Returns the modification time for the store file, or None if it doesn't exist.
+        '''
+        try:
+            return os.stat(self.filePath).st_mtime
+        except OSError:
+            return None
+
+
+    def _checkForFileChange(self):
+        '''
+        Re-loads the store file if it's been modified by another session, keeping the values modified in
+        this session. The file is checked at most once for every CHECK_INTERVAL seconds.
+        '''
+        currentTime = time.time()
+        if currentTime - self._lastCheckTime < CHECK_INTERVAL:
+            return
+        self._lastCheckTime = currentTime
+
+        if self._cleared or self._returnFileMtime() == self._fileMtime:
+            return
+
+        sessionData = self._data
+        if not self._load():
+            return
+
+        for key in self._modifiedKeys:
+            self._data.pop(key, None)
+            if key in sessionData:
+                self._data[key] = sessionData[key]
@@ -20,6 +20,17 @@ copy_list = ['__init__.py',
             'mrt_objects.py',
             'mrt_UI.py',
             'mrt_errorHandle.py',
+            'mrt_fileFormat.py',
+            'mrt_catalog.py',
+            'mrt_manifest.py',
+            'mrt_autoCollections.py',
+            'mrt_preferences.py',
+            'mrt_convertLegacyFiles.py',
+            'mrt_extractionCache.py',
+            'mrt_fileStore.py',
+            'mrt_moduleRegistry.py',
+            'mrt_characterMetadata.py',
+            'mrt_names.py',
             'bone_proxyGeo.ma',
             'elbow_proxyCubeGeo.ma',
             'elbow_proxySphereGeo.ma',